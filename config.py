@@ -1,6 +1,8 @@
 import pyprojroot
 from pymongo import MongoClient
 
+from utils.sqlite_backend import SQLiteDatabase
+
 # Base directory
 BASE_DIR = pyprojroot.here()  # This is the root of the project, detected automatically
 
@@ -9,6 +11,11 @@ UTILS_DIR = BASE_DIR / "utils"
 DATA_DIR = BASE_DIR / "data"
 SNAPSHOTS_DIR = DATA_DIR / "snapshots"
 CMV_DIR = DATA_DIR / "cmv"
+HTTP_CACHE_DIR = DATA_DIR / "http_cache"
+PAGE_ARCHIVE_DIR = DATA_DIR / "page_archive"
+MODELS_DIR = DATA_DIR / "models"
+LLM_BENCHMARK_DIR = DATA_DIR / "llm_benchmark"
+CLASSIFIER_MODEL_PATH = MODELS_DIR / "detect_classifier.npz"
 GRAPHS_DIR = DATA_DIR / "graphs"
 LIQUIDITY_DEPTH_DIR = GRAPHS_DIR / "liquidity_depth"
 TWENTY_FOUR_HOURS_PRICE_DIR = GRAPHS_DIR / "twenty_four_hours_price"
@@ -21,6 +28,10 @@ ALL_TIME_PRICE_DIR = GRAPHS_DIR / "all_time_price"
 MONGO_HOST = "localhost"
 MONGO_PORT = 27017
 
+# Storage Settings
+STORAGE_BACKEND = "mongo"  # Either 'mongo' (local mongod) or 'sqlite' (embedded, single analysis box)
+SQLITE_PATH = DATA_DIR / "bolivian_blue_db.sqlite"
+
 # Newspaper Scraping Settings
 USER_AGENT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 \
@@ -38,17 +49,48 @@ OPINION_URL = "https://www.opinion.com.bo"
 FIDES_URL = "https://www.noticiasfides.com"
 ECONOMY_URL = "https://www.economy.com.bo"
 AHORADIGITAL_URL = "https://www.ahoradigital.net"
+CRAWL_MAX_SOURCES = 6  # Newspapers crawled at the same time
+CRAWL_MAX_PER_HOST = 2  # Requests in flight per host
+ARTICLE_FETCH_WORKERS = 8  # Article bodies fetched at the same time, across all sources
+REQUEST_TIMEOUT = 60  # Seconds before a scraper request is abandoned
+RETRY_MAX_ATTEMPTS = 5  # Attempts per request on 429/5xx responses and broken connections
+RETRY_BASE_DELAY = 1  # Seconds; the backoff doubles with every consecutive failure of a host
+RETRY_MAX_DELAY = 120  # Seconds; cap of the backoff and of Retry-After pauses
+RATE_LIMIT_INITIAL = 2.0  # Requests per second allowed per host at start
+RATE_LIMIT_MIN = 0.1  # Floor of the per-host rate after repeated throttling
+RATE_LIMIT_MAX = 20.0  # Ceiling of the per-host rate
+RATE_LIMIT_INCREASE = 0.1  # Requests per second added to a host's rate after each successful response
+RATE_LIMIT_BURST = 4  # Requests a host may receive back to back
+FEED_MAX_SITEMAPS = 3  # Most recent sitemaps of a sitemap index read during feed discovery
+HTTP_CACHE_MAX_BYTES = 1024 ** 3  # Size of the on-disk HTTP cache before least recently used pages are evicted
+HTTP_CACHE_ARTICLE_MAX_AGE = 30 * 24 * 3600  # Seconds a cached article page is served without revalidation
+PAGE_ARCHIVE_MAX_BYTES = 256 * 1024 ** 2  # Size at which the page archive rolls over to a new file
+NEAR_DUPLICATE_MAX_DISTANCE = 3  # Differing SimHash bits (at most 3) for two articles to be near-duplicates
+NEAR_DUPLICATE_WINDOW_DAYS = 7  # Days apart two near-duplicate articles may be published
 
 # General Variables
 RECORD_INTERVAL = 5  # Interval in minutes to record data
 
+# Retention Settings
+ARCHIVE_DIR = DATA_DIR / "archive"
+# Tiers per collection; a missing key keeps the data forever
+RETENTION_POLICY = {
+    "USDT_BOB_Binance_Books": {"archive_after_days": 30},  # Raw books live in the DB for 30 days, then on disk only
+    "USDT_ARS_Binance_Books": {"archive_after_days": 30},
+    "USDT_BOB_Binance": {"rollup_collection": "USDT_BOB_Binance_Hourly", "expire_after_days": 180},
+    "USDT_ARS_Binance": {"rollup_collection": "USDT_ARS_Binance_Hourly", "expire_after_days": 180},
+}
+
 
 # Class to interact with the config collection in the database
 class DBConfig:
     def __init__(self):
-        client = MongoClient(host=MONGO_HOST, port=MONGO_PORT)
-        db = client.bolivian_blue_db
-        self.collection = db.config
+        if STORAGE_BACKEND == "sqlite":
+            db = SQLiteDatabase(SQLITE_PATH)
+        else:
+            client = MongoClient(host=MONGO_HOST, port=MONGO_PORT)
+            db = client.bolivian_blue_db
+        self.collection = db["config"]
 
     def get_config(self, setting):
         """
@@ -94,6 +136,28 @@ TRADINGVIEW_USERNAME = DBCONFIG.get_config("TRADINGVIEW_CREDENTIALS")["USERNAME"
 TRADINGVIEW_PASSWORD = DBCONFIG.get_config("TRADINGVIEW_CREDENTIALS")["PASSWORD"]
 
 # LLM Settings
-LOCAL_API_URL = "http://localhost:11434/v1"
+OLLAMA_BASE_URL = "http://localhost:11434"  # Native API of the local Ollama server
+LOCAL_API_URL = f"{OLLAMA_BASE_URL}/v1"
 LOCAL_API_KEY = "ollama"
 AI_MODE = "local"  # Either 'local', 'groq', or 'huggingface'
+LLM_FAST_MODEL = "llama3.1:8b-instruct-q4_K_M"  # Ollama model of the detect stage, pinned to an exact tag
+LLM_INTELLIGENT_MODEL = "deepseek-r1:14b-qwen-distill-q4_K_M"  # Ollama model of the extract and combined calls, pinned
+LLM_KEEP_ALIVE = "30m"  # How long Ollama keeps a model, and its prompt cache, loaded after the last request
+LLM_NUM_CTX = 4096  # Context window of every local call; a fixed value avoids model reloads between requests
+LLM_MESSAGE_LAYOUT = "prefix"  # Either 'prefix' (static instructions first, prompt cache friendly) or 'legacy'
+LLM_MAX_IN_FLIGHT = 4  # LLM requests in flight at once; match OLLAMA_NUM_PARALLEL of the local server
+LLM_UPDATE_BATCH_SIZE = 50  # Processed articles written to the database at once
+LLM_MODEL_RESIDENCY = "concurrent"  # Either 'concurrent' (both models loaded, OLLAMA_MAX_LOADED_MODELS >= 2) or 'alternate'
+LLM_EXTRACT_WORKERS = 2  # Extraction requests in flight while detection runs, with 'concurrent' residency
+LLM_PIPELINE_QUEUE_SIZE = 32  # Detected articles waiting for extraction before detection is held back
+LLM_ALTERNATE_WINDOW = 200  # Articles detected between two extraction phases, with 'alternate' residency
+LLM_BENCHMARK_SAMPLE_SIZE = 200  # Human reviewed articles frozen into each benchmark sample set
+PREFILTER_MIN_SCORE = 0  # Keyword score needed to reach the detection LLM (0: off; set it from the recall_report)
+PREFILTER_TFIDF_MIN_SIMILARITY = None  # Similarity to approved articles that also lets one through (None: keywords only)
+PREFILTER_RATE_RANGE = (5.0, 30.0)  # Bs amounts the prefilter treats as plausible dollar quotes
+QUOTE_RULES_MIN_CONFIDENCE = "high"  # Rule-based quotes kept without the extraction LLM: 'high', 'low' or None (off)
+EXTRACT_CONTEXT_TOKENS = 1024  # Token budget of the article text sent to the extraction model per call
+EXTRACT_CONTEXT_NEIGHBOURS = 1  # Paragraphs kept before and after each paragraph mentioning the exchange rate
+LLM_COMBINED_MAX_TOKENS = 0  # Articles up to this length get one combined call (0: off until compare_paths shows parity)
+CLASSIFIER_TARGET_RECALL = 0.99  # Holdout recall kept by the classifier's low threshold (below it: no LLM, negative)
+CLASSIFIER_TARGET_PRECISION = 0.95  # Holdout precision above the classifier's high threshold (above it: no LLM, positive)
@@ -7,6 +7,7 @@ from config import RECORD_INTERVAL, DOLAR_HOY_URL
 from utils.data_processing import aggregate_raw_data
 from utils.data_processing import calculate_daily_averages, calculate_x_period_averages
 from utils.newspaper_processing import newspaper_scraper
+from utils.retention import apply_retention
 from utils.scrapers.binance_request import binance_request
 from utils.scrapers.cmv_request import cmv_request
 from utils.scrapers.newspapers.dolar_hoy_scraper import dolar_hoy_scraper
@@ -31,8 +32,8 @@ def main(debug=False):
         - During working hours (07:00 to 23:59), fetches and processes data at intervals defined by RECORD_INTERVAL.
         - Requests DolarHoy and CMV data at specific times and only once per day.
         - Fetches Binance data for USDT/BOB and USDT/ARS pairs.
-        - Outside working hours, processes TradingView data, updates daily/monthly/quarterly averages,
-          scrapes newspapers, and then exits.
+        - Outside working hours, processes TradingView data, rolls up and expires old tick data, updates
+          daily/monthly/quarterly averages, scrapes newspapers, and then exits.
         - Handles connection errors by retrying after a delay.
     """
     print("\nWelcome to bolivian_blue.\n")
@@ -101,6 +102,10 @@ def main(debug=False):
                     print(f"[main] TradingView request failed: {e}")
                     print("[main] Skipping TradingView data extraction.")
 
+                print("\n[main] Applying retention policy...")
+                apply_retention()
+                print("[main] Retention policy applied successfully.")
+
                 print("\n[main] Updating daily averages...")
                 calculate_daily_averages()
                 print("[main] Updating monthly averages...")
@@ -0,0 +1,303 @@
+import os
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+
+from config import CLASSIFIER_MODEL_PATH, CLASSIFIER_TARGET_RECALL, CLASSIFIER_TARGET_PRECISION
+from utils.article_prefilter import article_text
+from utils.mongo_controller import mongo_controller
+
+"""
+This module contains the CPU classifier that takes over the "detect" stage from the LLM for the articles it is sure
+about.
+
+Articles are represented by signed hashed word unigrams and bigrams (2^18 dimensions, log term frequency, L2
+normalized) and scored by a logistic regression trained with SGD on the history of the detect stage. Training picks
+an uncertainty band on a time-based holdout for the model fitted on the older articles, which is the one saved:
+below the low threshold the recall of CLASSIFIER_TARGET_RECALL is kept, above the high one the precision reaches
+CLASSIFIER_TARGET_PRECISION. Articles scored inside the band are still sent to the LLM. Run this module to retrain
+the model and print its holdout precision and recall.
+"""
+
+HASH_BITS = 18
+EPOCHS = 10
+LEARNING_RATE = 0.5
+L2_PENALTY = 1e-6
+
+
+def featurize(text):
+    """
+    Compute the hashed n-gram features of a normalized text.
+
+    Args:
+        text (str): The normalized text, from `article_text`.
+
+    Returns:
+        tuple: The feature indices and their values (numpy arrays).
+    """
+    words = text.split()
+    grams = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+    counts = {}
+    for gram in grams:
+        code = zlib.crc32(gram.encode("utf-8"))
+        index = code & ((1 << HASH_BITS) - 1)
+        counts[index] = counts.get(index, 0) + (1 if code >> 31 else -1)
+    indices = np.fromiter(counts, dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    values = np.sign(values) * np.log1p(np.abs(values))
+    norm = np.linalg.norm(values)
+    return indices, values / norm if norm else values
+
+
+def sigmoid(value):
+    """
+    Compute the logistic function, clipped to avoid overflows.
+    """
+    return 1 / (1 + np.exp(-np.clip(value, -30, 30)))
+
+
+class ArticleClassifier:
+    def __init__(self, weights=None, bias=0.0, low=0.0, high=1.0):
+        """
+        Initialize a classifier.
+
+        Args:
+            weights (numpy.ndarray, optional): The feature weights. Defaults to zeros.
+            bias (float, optional): The intercept. Defaults to 0.
+            low (float, optional): Probability below which an article is negative. Defaults to 0.
+            high (float, optional): Probability above which an article is positive. Defaults to 1.
+        """
+        self.weights = weights if weights is not None else np.zeros(1 << HASH_BITS)
+        self.bias = bias
+        self.low = low
+        self.high = high
+
+    def probability(self, article):
+        """
+        Score an article.
+
+        Args:
+            article (dict or pandas.Series): The article, with its title, teaser and content.
+
+        Returns:
+            float: The probability that the article mentions the parallel exchange rate.
+        """
+        indices, values = featurize(article_text(article))
+        return float(sigmoid(self.weights[indices] @ values + self.bias))
+
+    def decide(self, article):
+        """
+        Decide the detect stage of an article.
+
+        Args:
+            article (dict or pandas.Series): The article.
+
+        Returns:
+            bool or None: True or False outside the uncertainty band, None inside it (the LLM must decide).
+        """
+        probability = self.probability(article)
+        if probability < self.low:
+            return False
+        if probability > self.high:
+            return True
+        return None
+
+    def fit(self, features, labels, epochs=EPOCHS):
+        """
+        Train the logistic regression with SGD, weighting the classes so both contribute equally.
+
+        Args:
+            features (list): The (indices, values) features of each article.
+            labels (numpy.ndarray): 1 for positive articles, 0 otherwise.
+            epochs (int, optional): Passes over the data. Defaults to EPOCHS.
+        """
+        positives = max(1, int(labels.sum()))
+        class_weights = {1: len(labels) / (2 * positives), 0: len(labels) / (2 * max(1, len(labels) - positives))}
+        rng = np.random.default_rng(0)
+        step = 0
+        for _ in range(epochs):
+            for position in rng.permutation(len(features)):
+                indices, values = features[position]
+                label = labels[position]
+                rate = LEARNING_RATE / (1 + step * 1e-4)
+                error = (sigmoid(self.weights[indices] @ values + self.bias) - label) * class_weights[int(label)]
+                self.weights[indices] -= rate * (error * values + L2_PENALTY * self.weights[indices])
+                self.bias -= rate * error
+                step += 1
+
+    def save(self, path=CLASSIFIER_MODEL_PATH, **metadata):
+        """
+        Save the model.
+
+        Args:
+            path (Path, optional): The model file. Defaults to CLASSIFIER_MODEL_PATH.
+            **metadata: Extra values stored with the model.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, low=self.low, high=self.high, **metadata)
+
+    @classmethod
+    def load(cls, path=CLASSIFIER_MODEL_PATH):
+        """
+        Load a saved model.
+
+        Args:
+            path (Path, optional): The model file. Defaults to CLASSIFIER_MODEL_PATH.
+
+        Returns:
+            ArticleClassifier or None: The model, or None if none has been trained yet.
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as model:
+            return cls(model["weights"], float(model["bias"]), float(model["low"]), float(model["high"]))
+
+
+def precision_recall(probabilities, labels, threshold):
+    """
+    Compute the precision and recall of a threshold.
+
+    Args:
+        probabilities (numpy.ndarray): The predicted probabilities.
+        labels (numpy.ndarray): The true labels.
+        threshold (float): Articles scored above it are positive.
+
+    Returns:
+        tuple: The precision and recall (1 when undefined).
+    """
+    predicted = probabilities > threshold
+    true_positives = np.sum(predicted & (labels == 1))
+    precision = true_positives / predicted.sum() if predicted.any() else 1.0
+    recall = true_positives / labels.sum() if labels.any() else 1.0
+    return float(precision), float(recall)
+
+
+def choose_band(probabilities, labels, target_recall=CLASSIFIER_TARGET_RECALL,
+                target_precision=CLASSIFIER_TARGET_PRECISION):
+    """
+    Choose the uncertainty band of the classifier on holdout predictions.
+
+    Args:
+        probabilities (numpy.ndarray): The holdout probabilities.
+        labels (numpy.ndarray): The holdout labels.
+        target_recall (float, optional): Recall kept by the low threshold. Defaults to CLASSIFIER_TARGET_RECALL.
+        target_precision (float, optional): Precision reached above the high threshold. Defaults to
+            CLASSIFIER_TARGET_PRECISION.
+
+    Returns:
+        tuple: The low and high thresholds.
+    """
+    candidates = np.unique(np.concatenate([[0.0, 1.0], probabilities]))
+    low = max([threshold for threshold in candidates
+               if precision_recall(probabilities, labels, threshold)[1] >= target_recall], default=0.0)
+    high = min([threshold for threshold in candidates
+                if threshold >= low and precision_recall(probabilities, labels, threshold)[0] >= target_precision],
+               default=1.0)
+    return float(low), float(high)
+
+
+def load_training_articles():
+    """
+    Load the articles whose detect stage was decided by the LLM or a reviewer, oldest first.
+
+    Returns:
+        list: The articles as dicts, with a "label" key: 1 if they went to the extraction stage or were approved.
+    """
+    articles = mongo_controller.db["USD_BOB_Parallel"].find(
+        {"first_stage_processed": True, "prefiltered": None, "detected_by": {"$ne": "classifier"}},
+        {"timestamp": 1, "title": 1, "teaser": 1, "content": 1, "second_stage_processed": 1, "human_approved": 1})
+    articles = sorted(articles, key=lambda article: article["timestamp"])
+    for article in articles:
+        article["label"] = int(article.get("second_stage_processed") is not None or
+                               article.get("human_approved") is True)
+    return articles
+
+
+def train_classifier(holdout=0.2, path=CLASSIFIER_MODEL_PATH):
+    """
+    Train the detect classifier on the labelled history, report its holdout metrics and save it.
+
+    The model is fitted on the older articles and evaluated on the most recent `holdout` share, where its
+    uncertainty band is chosen; that same model is saved, so the band matches the scores it produces.
+
+    Args:
+        holdout (float, optional): Share of the most recent articles used for evaluation. Defaults to 0.2.
+        path (Path, optional): The model file. Defaults to CLASSIFIER_MODEL_PATH.
+
+    Returns:
+        dict: The holdout metrics, or None if there are not enough labelled articles.
+    """
+    print("\n[article_classifier] Loading labelled articles...")
+    articles = load_training_articles()
+    labels = np.array([article["label"] for article in articles])
+    if len(articles) < 100 or labels.sum() < 10:
+        print(f"[article_classifier] Not enough labelled articles ({len(articles)}, {labels.sum()} positive).")
+        return None
+    features = [featurize(article_text(article)) for article in articles]
+    split = int(len(articles) * (1 - holdout))
+    classifier = ArticleClassifier()
+    classifier.fit(features[:split], labels[:split])
+    probabilities = np.array([float(sigmoid(classifier.weights[indices] @ values + classifier.bias))
+                              for indices, values in features[split:]])
+    holdout_labels = labels[split:]
+    low, high = choose_band(probabilities, holdout_labels)
+    precision, recall = precision_recall(probabilities, holdout_labels, 0.5)
+    automated = (probabilities < low) | (probabilities > high)
+    negatives = probabilities < low
+    positives = probabilities > high
+    metrics = {
+        "articles": len(articles),
+        "holdout": len(holdout_labels),
+        "precision": precision,
+        "recall": recall,
+        "low": low,
+        "high": high,
+        "automated": float(automated.mean()),
+        "missed": int(np.sum(negatives & (holdout_labels == 1))),
+        "band_precision": float(holdout_labels[positives].mean()) if positives.any() else 1.0
+    }
+    print(f"[article_classifier] Holdout of {metrics['holdout']}/{metrics['articles']} articles: "
+          f"precision {precision:.3f}, recall {recall:.3f} at 0.5.")
+    print(f"[article_classifier] Uncertainty band [{low:.4f}, {high:.4f}]: {metrics['automated']:.1%} of the articles "
+          f"decided without the LLM, {metrics['missed']} positives rejected, "
+          f"{metrics['band_precision']:.3f} precision above the band.")
+    classifier.low, classifier.high = low, high
+    classifier.save(path, trained_at=datetime.now(timezone.utc).isoformat(), articles=split)
+    print(f"[article_classifier] Model saved to {path}.")
+    return metrics
+
+
+def classify_articles(articles, classifier=None):
+    """
+    Decide the detect stage of the articles the classifier is sure about.
+
+    Decided articles are stored with `detected_by` set to "classifier", so they are never used for training.
+
+    Args:
+        articles (pandas.DataFrame): The articles waiting for the detection stage.
+        classifier (ArticleClassifier, optional): The model. Defaults to the saved one.
+
+    Returns:
+        pandas.DataFrame: The articles inside the uncertainty band, which still need the detection LLM. All of them
+            if no model has been trained yet.
+    """
+    classifier = classifier or ArticleClassifier.load()
+    if classifier is None or articles.empty:
+        return articles
+    undecided = []
+    updates = []
+    for _, article in articles.iterrows():
+        decision = classifier.decide(article)
+        undecided.append(decision is None)
+        if decision is not None:
+            updates.append((article["_id"], {"first_stage_processed": True,
+                                             "second_stage_processed": False if decision else None,
+                                             "detected_by": "classifier"}))
+    mongo_controller.update_data_batch(collection="USD_BOB_Parallel", updates=updates)
+    print(f"[article_classifier] Decided {len(updates)}/{len(articles)} articles without an LLM call.")
+    return articles[undecided]
+
+
+if __name__ == "__main__":
+    train_classifier()
@@ -0,0 +1,130 @@
+import math
+import re
+
+from config import EXTRACT_CONTEXT_TOKENS, EXTRACT_CONTEXT_NEIGHBOURS
+from utils.article_prefilter import keyword_score, normalize_text
+
+"""
+This module builds the context sent to the extraction model: instead of the whole article, only the paragraphs that
+mention the exchange rate (keyword rules of the prefilter, or decimal amounts), plus their neighbours, within a token
+budget. Articles whose relevant paragraphs do not fit are split into several chunks, processed separately and merged
+with `merge_extractions`.
+"""
+
+CHARS_PER_TOKEN = 3.5  # Rough length of a token of Spanish text for the local models
+GAP_MARKER = "[...]"
+DECIMAL_PATTERN = re.compile(r"\d+[.,]\d{1,2}\b")
+HINT_PRIORITY = {"exact": 0, "above": 1, "below": 1, None: 2}
+
+
+def estimate_tokens(text):
+    """
+    Estimate the number of tokens of a text.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The estimated token count.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def is_relevant(paragraph):
+    """
+    Check whether a paragraph may mention the exchange rate.
+
+    Args:
+        paragraph (str): The paragraph.
+
+    Returns:
+        bool: True if it matches a prefilter keyword rule or contains a decimal amount.
+    """
+    return keyword_score(normalize_text(paragraph)) > 0 or DECIMAL_PATTERN.search(paragraph) is not None
+
+
+def relevant_windows(paragraphs, neighbours):
+    """
+    Group the relevant paragraphs and their neighbours into contiguous windows.
+
+    Args:
+        paragraphs (list): The paragraphs of the article.
+        neighbours (int): Paragraphs kept before and after each relevant one.
+
+    Returns:
+        list: The windows, as lists of paragraphs, in article order. The whole article is a single window when no
+            paragraph is relevant.
+    """
+    selected = set()
+    for index, paragraph in enumerate(paragraphs):
+        if is_relevant(paragraph):
+            selected.update(range(max(0, index - neighbours), min(len(paragraphs), index + neighbours + 1)))
+    if not selected:
+        return [paragraphs]
+    windows = []
+    previous = None
+    for index in sorted(selected):
+        if previous is None or index != previous + 1:
+            windows.append([])
+        windows[-1].append(paragraphs[index])
+        previous = index
+    return windows
+
+
+def build_context_chunks(content, budget=EXTRACT_CONTEXT_TOKENS, neighbours=EXTRACT_CONTEXT_NEIGHBOURS):
+    """
+    Build the trimmed contents sent to the extraction model for an article.
+
+    Windows are packed in article order into chunks of at most `budget` estimated tokens, separated by a gap
+    marker. A window larger than the budget is split by paragraphs, and a paragraph larger than the budget is cut.
+
+    Args:
+        content (str): The content of the article, one paragraph per line.
+        budget (int, optional): Token budget of each chunk. Defaults to EXTRACT_CONTEXT_TOKENS.
+        neighbours (int, optional): Paragraphs kept around each relevant one. Defaults to EXTRACT_CONTEXT_NEIGHBOURS.
+
+    Returns:
+        list: The chunk contents, at least one.
+    """
+    paragraphs = [paragraph.strip() for paragraph in (content or "").split("\n") if paragraph.strip()]
+    if not paragraphs:
+        return [content or ""]
+    max_chars = int(budget * CHARS_PER_TOKEN)
+    chunks = [[]]
+    used = 0
+    for window in relevant_windows(paragraphs, neighbours):
+        pieces = [paragraph[:max_chars] for paragraph in window]
+        if chunks[-1]:
+            pieces = [GAP_MARKER] + pieces
+        for piece in pieces:
+            tokens = estimate_tokens(piece)
+            if chunks[-1] and used + tokens > budget:
+                chunks.append([])
+                used = 0
+                if piece == GAP_MARKER:
+                    continue
+            chunks[-1].append(piece)
+            used += tokens
+    return ["\n".join(chunk) for chunk in chunks if chunk]
+
+
+def merge_extractions(results):
+    """
+    Merge the extraction results of the chunks of an article.
+
+    An exact quote wins over a bound, which wins over an estimate; between equals, the earliest chunk wins.
+
+    Args:
+        results (list): The (hint_type, quote) pair of each chunk, or None for chunks whose answer failed.
+
+    Returns:
+        tuple or None: The merged (hint_type, quote) pair, (None, None) if no chunk found a quote, or None if every
+            chunk failed.
+    """
+    answered = [result for result in results if result is not None]
+    if not answered:
+        return None
+    quoted = [result for result in answered if result[1] is not None]
+    if not quoted:
+        return None, None
+    return min(quoted, key=lambda result: HINT_PRIORITY.get(result[0], 2))
@@ -0,0 +1,252 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+
+import pandas as pd
+
+from config import PREFILTER_MIN_SCORE, PREFILTER_TFIDF_MIN_SIMILARITY, PREFILTER_RATE_RANGE
+from utils.mongo_controller import mongo_controller
+
+"""
+This module contains the lexical prefilter run ahead of the detection LLM, so articles that clearly do not talk
+about the dollar never reach the model.
+
+An article scores the weights of the keyword rules its title, teaser and content match (accents and case are
+ignored). Articles scoring below PREFILTER_MIN_SCORE are marked as processed without an LLM call, unless, when
+PREFILTER_TFIDF_MIN_SIMILARITY is set, their TF-IDF similarity to the human approved articles reaches it. Run this
+module to print the recall of each threshold against the `human_approved` labels before changing it.
+"""
+
+KEYWORD_RULES = [
+    (re.compile(r"\bdolar(es)?\b|\busd\b|\bus\$"), 2),
+    (re.compile(r"\btipos? de cambio\b"), 2),
+    (re.compile(r"\bparalelo\b|\bmercado (negro|informal)\b|\bdolar blue\b"), 1),
+    (re.compile(r"\bdivisas?\b|\bmoneda extranjera\b|\bcasas? de cambio\b|\b(libre)?cambistas?\b"), 1),
+    (re.compile(r"\busdt\b|\bbinance\b|\btether\b|\bcriptomonedas?\b|\bp2p\b"), 1)
+]
+RATE_WEIGHT = 2  # Weight of a Bs amount within PREFILTER_RATE_RANGE
+RATE_PATTERN = re.compile(r"(?:\bbs\.?|\bbolivianos)\s*(\d{1,2}(?:[.,]\d{1,2})?)(?![.,]?\d)|"
+                          r"(?<!\d[.,])\b(\d{1,2}(?:[.,]\d{1,2})?)\s*(?:bs\b|bolivianos\b)")
+
+
+def normalize_text(text):
+    """
+    Lowercase a text and remove its accents.
+
+    Args:
+        text (str or None): The text.
+
+    Returns:
+        str: The normalized text ("" for None).
+    """
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def article_text(article):
+    """
+    Join the title, teaser and content of an article into a normalized text.
+
+    Args:
+        article (dict or pandas.Series): The article.
+
+    Returns:
+        str: The normalized text.
+    """
+    parts = [article.get(field) for field in ("title", "teaser", "content")]
+    return normalize_text(" ".join(part for part in parts if isinstance(part, str)))
+
+
+def keyword_score(text):
+    """
+    Score a normalized text with the keyword rules.
+
+    Args:
+        text (str): The normalized text, from `article_text`.
+
+    Returns:
+        int: The sum of the weights of the matched rules.
+    """
+    score = sum(weight for pattern, weight in KEYWORD_RULES if pattern.search(text))
+    for match in RATE_PATTERN.finditer(text):
+        amount = float((match.group(1) or match.group(2)).replace(",", "."))
+        if PREFILTER_RATE_RANGE[0] <= amount <= PREFILTER_RATE_RANGE[1]:
+            score += RATE_WEIGHT
+            break
+    return score
+
+
+class TfidfScorer:
+    """
+    Cosine similarity of a text to the TF-IDF centroid of a set of relevant articles.
+    """
+
+    def __init__(self, relevant_texts, background_texts):
+        """
+        Fit the document frequencies on every text and the centroid on the relevant ones.
+
+        Args:
+            relevant_texts (list): Normalized texts of the relevant articles.
+            background_texts (list): Normalized texts of the other articles.
+        """
+        documents = [Counter(re.findall(r"[a-z]{3,}", text)) for text in relevant_texts + background_texts]
+        frequencies = Counter(term for document in documents for term in document)
+        self.idf = {term: math.log((1 + len(documents)) / (1 + count)) + 1 for term, count in frequencies.items()}
+        self.centroid = Counter()
+        for document in documents[:len(relevant_texts)]:
+            for term, weight in self.vector(document).items():
+                self.centroid[term] += weight / len(relevant_texts)
+
+    def vector(self, terms):
+        """
+        Build the L2-normalized TF-IDF vector of a bag of terms. Terms unseen when fitting are ignored.
+
+        Args:
+            terms (Counter): The term counts.
+
+        Returns:
+            dict: The weight of each term.
+        """
+        vector = {term: (1 + math.log(count)) * self.idf[term] for term, count in terms.items() if term in self.idf}
+        norm = math.sqrt(sum(weight ** 2 for weight in vector.values())) or 1
+        return {term: weight / norm for term, weight in vector.items()}
+
+    def similarity(self, text):
+        """
+        Compute the similarity of a text to the relevant articles.
+
+        Args:
+            text (str): The normalized text.
+
+        Returns:
+            float: The cosine similarity, between 0 and 1.
+        """
+        vector = self.vector(Counter(re.findall(r"[a-z]{3,}", text)))
+        norm = math.sqrt(sum(weight ** 2 for weight in self.centroid.values())) or 1
+        return sum(weight * self.centroid.get(term, 0) for term, weight in vector.items()) / norm
+
+
+def load_labelled_articles():
+    """
+    Load the articles already through the detection stage, with their keyword score.
+
+    Returns:
+        pandas.DataFrame: The articles, with a "text" and "score" column, a "relevant" column (human approved) and
+            a "detected" column (sent to the extraction stage by the LLM). Prefiltered articles are left out.
+    """
+    articles = mongo_controller.query_data(_mode="all", collection="USD_BOB_Parallel",
+                                           _filter={"first_stage_processed": True, "prefiltered": None},
+                                           projection={"timestamp": 1, "title": 1, "teaser": 1, "content": 1,
+                                                       "second_stage_processed": 1, "human_approved": 1},
+                                           sort=1)
+    if articles.empty:
+        return articles
+    articles["text"] = articles.apply(article_text, axis=1)
+    articles["score"] = articles["text"].apply(keyword_score)
+    articles["relevant"] = articles["human_approved"] == True  # noqa: E712 (element-wise comparison)
+    articles["detected"] = articles["second_stage_processed"].notna()
+    return articles
+
+
+def build_tfidf_scorer(articles=None):
+    """
+    Fit a TF-IDF scorer on the labelled articles.
+
+    Args:
+        articles (pandas.DataFrame, optional): The articles, from `load_labelled_articles`. Defaults to loading them.
+
+    Returns:
+        TfidfScorer or None: The scorer, or None if no article has been approved yet.
+    """
+    if articles is None:
+        articles = load_labelled_articles()
+    if articles.empty or not articles["relevant"].any():
+        return None
+    return TfidfScorer(articles.loc[articles["relevant"], "text"].tolist(),
+                       articles.loc[~articles["relevant"], "text"].tolist())
+
+
+def prefilter_articles(articles, min_score=PREFILTER_MIN_SCORE, min_similarity=PREFILTER_TFIDF_MIN_SIMILARITY):
+    """
+    Mark the clearly irrelevant articles as processed, without an LLM call.
+
+    Rejected articles are stored with `first_stage_processed` True, `second_stage_processed` None and `prefiltered`
+    True, so they can be found and sent back to the LLM if the rules change.
+
+    Args:
+        articles (pandas.DataFrame): The articles waiting for the detection stage.
+        min_score (int, optional): Keyword score needed to reach the LLM. Defaults to PREFILTER_MIN_SCORE.
+        min_similarity (float, optional): TF-IDF similarity that also lets an article through, or None to use the
+            keyword rules alone. Defaults to PREFILTER_TFIDF_MIN_SIMILARITY.
+
+    Returns:
+        pandas.DataFrame: The articles that still need the detection LLM.
+    """
+    if articles.empty or min_score <= 0:
+        return articles
+    scorer = build_tfidf_scorer() if min_similarity is not None else None
+    keep = []
+    rejected = []
+    for _, article in articles.iterrows():
+        text = article_text(article)
+        passed = keyword_score(text) >= min_score or (scorer is not None and scorer.similarity(text) >= min_similarity)
+        keep.append(passed)
+        if not passed:
+            rejected.append((article["_id"], {"first_stage_processed": True, "second_stage_processed": None,
+                                              "prefiltered": True}))
+    mongo_controller.update_data_batch(collection="USD_BOB_Parallel", updates=rejected)
+    print(f"[article_prefilter] Skipped {len(rejected)}/{len(articles)} articles without an LLM call.")
+    return articles[keep]
+
+
+def recall_report(scores=range(0, 7), similarities=(None, 0.05, 0.1, 0.15, 0.2), holdout=0.2):
+    """
+    Print, for each threshold, the share of approved and LLM-detected articles the prefilter would let through,
+    and the share of LLM calls it would save.
+
+    Every figure is measured on the most recent `holdout` share of the labelled articles, and the TF-IDF scorer is
+    fitted on the older ones, so the approved articles used for fitting are not counted in the recall.
+
+    Args:
+        scores (iterable, optional): The keyword score thresholds. Defaults to 0 to 6.
+        similarities (iterable, optional): The TF-IDF similarity thresholds, None for keywords alone. Defaults to
+            (None, 0.05, 0.1, 0.15, 0.2).
+        holdout (float, optional): Share of the most recent articles kept for measuring. Defaults to 0.2.
+
+    Returns:
+        pandas.DataFrame: One row per threshold pair.
+    """
+    articles = load_labelled_articles()
+    if articles.empty or not articles["relevant"].any():
+        print("[article_prefilter] No human approved articles to measure the recall against.")
+        return pd.DataFrame()
+    split = int(len(articles) * (1 - holdout))
+    scorer = build_tfidf_scorer(articles.iloc[:split])
+    evaluated = articles.iloc[split:].copy()
+    if scorer is not None:
+        evaluated["similarity"] = evaluated["text"].apply(scorer.similarity)
+    rows = []
+    for min_similarity in similarities:
+        if min_similarity is not None and scorer is None:
+            continue
+        for min_score in scores:
+            passed = evaluated["score"] >= min_score
+            if min_similarity is not None:
+                passed |= evaluated["similarity"] >= min_similarity
+            rows.append({
+                "min_score": min_score,
+                "min_similarity": min_similarity,
+                "approved_recall": passed[evaluated["relevant"]].mean(),
+                "detected_recall": passed[evaluated["detected"]].mean(),
+                "skipped": 1 - passed.mean()
+            })
+    report = pd.DataFrame(rows)
+    print(f"\n[article_prefilter] Measured on {len(evaluated)} articles ({int(evaluated['relevant'].sum())} approved, "
+          f"{int(evaluated['detected'].sum())} detected by the LLM):")
+    print(report.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    return report
+
+
+if __name__ == "__main__":
+    recall_report()
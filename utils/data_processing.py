@@ -7,6 +7,10 @@ from tqdm import tqdm
 
 from config import UTILS_DIR
 from utils.mongo_controller import mongo_controller
+from utils.retention import tick_averages
+
+# Heavy per-tick fields stored in USDT_{fiat}_Binance_Books, apart from the slim metrics in USDT_{fiat}_Binance
+BOOK_FIELDS = ["sell_raw_data", "buy_raw_data", "sell_liquidity_depth", "buy_liquidity_depth"]
 
 
 def aggregate_raw_data(timestamp, fiat, sell_raw_data, buy_raw_data, raw=True, _id=None):
@@ -15,7 +19,8 @@ def aggregate_raw_data(timestamp, fiat, sell_raw_data, buy_raw_data, raw=True, _
 
     This function filters out blocked users (for BOB fiat), removes outliers, computes VWAP (Volume Weighted Average Price),
     quoted spread, sell and buy volumes within a threshold, and liquidity depth. The processed data is either saved to the
-    database or returned as a dictionary.
+    database or returned as a dictionary. When saved, the scalar metrics go to USDT_{fiat}_Binance and the raw ads and
+    liquidity depth go to USDT_{fiat}_Binance_Books, linked by timestamp.
 
     Args:
         timestamp (datetime): The timestamp for the data aggregation.
@@ -85,12 +90,127 @@ def aggregate_raw_data(timestamp, fiat, sell_raw_data, buy_raw_data, raw=True, _
     }
 
     if raw:
-        mongo_controller.save_data(collection=f"USDT_{fiat}_Binance", data=data_dict)
+        metrics_doc, books_doc = split_book_fields(data_dict)
+        mongo_controller.save_data(collection=f"USDT_{fiat}_Binance_Books", data=books_doc)
+        mongo_controller.save_data(collection=f"USDT_{fiat}_Binance", data=metrics_doc)
     else:
         data_dict["_id"] = _id
     return data_dict
 
 
+def split_book_fields(data_dict):
+    """
+    Split an aggregated Binance document into its slim metrics document and its order book document.
+
+    Args:
+        data_dict (dict): A document as returned by `aggregate_raw_data`.
+
+    Returns:
+        tuple: The metrics document (without book fields) and the books document (timestamp and book fields only).
+    """
+    metrics_doc = {key: value for key, value in data_dict.items() if key not in BOOK_FIELDS}
+    books_doc = {"timestamp": data_dict["timestamp"]}
+    for field in BOOK_FIELDS:
+        if field in data_dict:
+            books_doc[field] = data_dict[field]
+    return metrics_doc, books_doc
+
+
+def query_binance_data(fiat, _mode="all", _filter=None, projection=None, sort=None, limit=0, with_books=True):
+    """
+    Query Binance tick data, joining the order books back onto the metrics when requested.
+
+    This is the compatibility read path for code written against the former single-collection schema. It works on
+    a partially migrated collection: documents that still embed their books are returned as they are, and the
+    others are completed from USDT_{fiat}_Binance_Books by timestamp.
+
+    Args:
+        fiat (str): The fiat currency (e.g., "BOB", "ARS").
+        _mode (str, optional): Either "one" or "all". Defaults to "all".
+        _filter (dict, optional): Filter on the metrics collection. Defaults to None.
+        projection (dict, optional): Projection on the metrics collection. Defaults to None.
+        sort (int, optional): Sort direction on timestamp. Defaults to None.
+        limit (int, optional): Maximum number of documents. Defaults to 0 (no limit).
+        with_books (bool, optional): If True, the book fields are joined in. Defaults to True.
+
+    Returns:
+        dict or list or None: A single document for "one", a list of documents for "all".
+    """
+    if _mode == "one":
+        documents = mongo_controller.query_data(_mode="all", collection=f"USDT_{fiat}_Binance", _filter=_filter,
+                                                projection=projection, sort=sort, limit=1, _datatype="cursor")
+    else:
+        documents = mongo_controller.query_data(_mode="all", collection=f"USDT_{fiat}_Binance", _filter=_filter,
+                                                projection=projection, sort=sort, limit=limit, _datatype="cursor")
+    documents = list(documents)
+    if with_books:
+        missing = [document["timestamp"] for document in documents
+                   if "timestamp" in document and not any(field in document for field in BOOK_FIELDS)]
+        if missing:
+            books = mongo_controller.query_data(_mode="all", collection=f"USDT_{fiat}_Binance_Books",
+                                                _filter={"timestamp": {"$in": missing}},
+                                                projection={"_id": 0}, _datatype="cursor")
+            books = {book["timestamp"]: book for book in books}
+            for document in documents:
+                book = books.get(document.get("timestamp"))
+                if book is not None and not any(field in document for field in BOOK_FIELDS):
+                    for field in BOOK_FIELDS:
+                        if field in book:
+                            document[field] = book[field]
+    if _mode == "one":
+        return documents[0] if documents else None
+    return documents
+
+
+def migrate_binance_books(fiat):
+    """
+    Move the raw ads and liquidity depth out of USDT_{fiat}_Binance into USDT_{fiat}_Binance_Books.
+
+    The migration runs online, one bucket (or day) at a time, while the collector keeps writing new ticks in the
+    split format. Only documents that still embed their books are touched, so it can be interrupted and re-run.
+    Within a window, the books are written first, then the slim metrics, and the old documents are deleted last,
+    so a crash never loses the raw data.
+
+    Args:
+        fiat (str): The fiat currency (e.g., "BOB", "ARS") to migrate.
+
+    Returns:
+        int: The number of documents migrated.
+    """
+    metrics_collection = f"USDT_{fiat}_Binance"
+    books_collection = f"USDT_{fiat}_Binance_Books"
+    migrated = 0
+    for time_range in reprocessing_windows(fiat):
+        legacy_filter = {**time_range, "sell_raw_data": {"$exists": True}}
+        legacy_docs = list(mongo_controller.query_data(_mode="all", collection=metrics_collection,
+                                                       _filter=legacy_filter, _datatype="cursor"))
+        if not legacy_docs:
+            continue
+        timestamps = [document["timestamp"] for document in legacy_docs]
+        existing_books = mongo_controller.query_data(_mode="all", collection=books_collection,
+                                                     _filter={"timestamp": {"$in": timestamps}},
+                                                     projection={"timestamp": 1}, _datatype="cursor")
+        existing_books = {book["timestamp"] for book in existing_books}
+        new_books = []
+        new_metrics = []
+        for document in legacy_docs:
+            metrics_doc, books_doc = split_book_fields(document)
+            metrics_doc.pop("_id", None)
+            if document["timestamp"] not in existing_books:
+                new_books.append(books_doc)
+            new_metrics.append(metrics_doc)
+        if new_books:
+            mongo_controller.db[books_collection].insert_many(new_books)
+        # Remove slim copies left behind by an interrupted run before writing them again
+        mongo_controller.db[metrics_collection].delete_many({"timestamp": {"$in": timestamps},
+                                                             "sell_raw_data": {"$exists": False}})
+        mongo_controller.db[metrics_collection].insert_many(new_metrics)
+        mongo_controller.db[metrics_collection].delete_many(legacy_filter)
+        migrated += len(legacy_docs)
+    print(f"[data_processing] Migrated {migrated} {fiat} documents to the split schema.")
+    return migrated
+
+
 def compute_vwap(df):
     """
     Compute the Volume Weighted Average Price (VWAP) for a given DataFrame.
@@ -156,13 +276,19 @@ def compute_rel_vol(timestamp, fiat, current_volume):
         float: The ratio of current volume to the historical average sell volume.
                Returns 1 if there is no historical data.
     """
-    data_df = mongo_controller.query_data(_mode="all", collection=f"USDT_{fiat}_Binance",
-                                          _filter={
-                                              "timestamp": {"$gte": timestamp - timedelta(weeks=208)},
-                                          }, sort=1)
-    if data_df.empty:
+    data_chunks = mongo_controller.query_data(_mode="all", collection=f"USDT_{fiat}_Binance",
+                                              _filter={
+                                                  "timestamp": {"$gte": timestamp - timedelta(weeks=208)},
+                                              }, sort=1, _datatype="chunks", dtypes={"sell_volume": "float64"})
+    # Accumulate the mean chunk by chunk, so the four-year window is never held in memory at once
+    volume_sum = 0
+    volume_count = 0
+    for chunk in data_chunks:
+        volume_sum += chunk["sell_volume"].sum()
+        volume_count += chunk["sell_volume"].count()
+    if volume_count == 0:
         return 1
-    avg_vol = data_df["sell_volume"].mean()
+    avg_vol = volume_sum / volume_count
     rel_vol = current_volume / avg_vol
     return rel_vol
 
@@ -247,19 +373,12 @@ def calculate_daily_averages():
 
         # Process USDT_BOB_Binance and USDT_ARS_Binance
         for collection in ["USDT_BOB_Binance", "USDT_ARS_Binance"]:
-            current_date_data = mongo_controller.query_data(_mode="all", collection=collection,
-                                                            _filter={"timestamp": {
-                                                                "$gte": start_of_day_lpz,
-                                                                "$lt": end_of_day_lpz
-                                                            }}, sort=1)
-            if not current_date_data.empty and len(current_date_data) > 5:
+            # Ticks past the retention window only survive as hourly rollups, merged hour by hour
+            averages = tick_averages(collection, start_of_day_lpz, end_of_day_lpz)
+            if averages["count"] > 5:
                 daily_average_doc[collection] = {
-                    'sell_vwap': round(float(current_date_data['sell_vwap'].mean()), 2),
-                    'buy_vwap': round(float(current_date_data['buy_vwap'].mean()), 2),
-                    'sell_volume': round(float(current_date_data['sell_volume'].mean()),
-                                         2) if 'sell_volume' in current_date_data.columns else None,
-                    'buy_volume': round(float(current_date_data['buy_volume'].mean()),
-                                        2) if 'buy_volume' in current_date_data.columns else None
+                    metric: round(averages[metric], 2) if averages[metric] is not None else None
+                    for metric in ['sell_vwap', 'buy_vwap', 'sell_volume', 'buy_volume']
                 }
                 daily_average_doc[collection]['spread'] = compute_spread(daily_average_doc[collection]['sell_vwap'],
                                                                          daily_average_doc[collection]['buy_vwap'])
@@ -603,8 +722,8 @@ def review_processed_data(fiat):
     """
     Review and reprocess previously stored raw data for a given fiat currency.
 
-    This function iterates over all time buckets in the MongoDB time-series collection for the specified fiat,
-    retrieves the raw documents within each bucket, re-aggregates the data using `aggregate_raw_data`, and
+    This function iterates over all time buckets in the MongoDB time-series collection for the specified fiat
+    (or over days on the SQLite backend), retrieves the raw documents within each bucket, re-aggregates the data using `aggregate_raw_data`, and
     replaces the old documents with the newly processed ones.
 
     Args:
@@ -613,26 +732,65 @@ def review_processed_data(fiat):
     Returns:
         None
     """
-    bucket_collection = f"system.buckets.USDT_{fiat}_Binance"
-    total_buckets = mongo_controller.db[bucket_collection].count_documents({})
-    for bucket in tqdm(mongo_controller.db[bucket_collection].find().sort({"_id": -1}), total=total_buckets,
-                       desc="Processing data", unit="bucket"):
-        min_ts = bucket["control"]["min"]["timestamp"]
-        max_ts = bucket["control"]["max"]["timestamp"]
-        time_range = {"timestamp": {"$gte": min_ts, "$lte": max_ts}}
-        raw_docs = mongo_controller.query_data(_mode="all", collection=f"USDT_{fiat}_Binance",
-                                               _filter=time_range, _datatype="cursor",
-                                               projection={"_id": 1, "timestamp": 1, "sell_raw_data": 1,
-                                                           "buy_raw_data": 1})
-        raw_docs = list(raw_docs)
-        new_batch = []
+    for time_range in reprocessing_windows(fiat):
+        raw_docs = query_binance_data(fiat=fiat, _filter=time_range,
+                                      projection={"_id": 1, "timestamp": 1, "sell_raw_data": 1, "buy_raw_data": 1})
+        new_metrics = []
+        new_books = []
         for row in raw_docs:
-            new_batch.append(aggregate_raw_data(timestamp=row["timestamp"], fiat=fiat,
-                                                sell_raw_data=row["sell_raw_data"], buy_raw_data=row["buy_raw_data"],
-                                                raw=False, _id=row["_id"]))
-        if new_batch:
-            mongo_controller.db[f"USDT_{fiat}_Binance"].delete_many(time_range)
-            mongo_controller.db[f"USDT_{fiat}_Binance"].insert_many(new_batch)
+            if row.get("sell_raw_data") is None or row.get("buy_raw_data") is None:
+                continue  # No order book stored for this tick, nothing to reprocess
+            metrics_doc, books_doc = split_book_fields(
+                aggregate_raw_data(timestamp=row["timestamp"], fiat=fiat, sell_raw_data=row["sell_raw_data"],
+                                   buy_raw_data=row["buy_raw_data"], raw=False, _id=row["_id"]))
+            new_metrics.append(metrics_doc)
+            new_books.append(books_doc)
+        if new_metrics:
+            reprocessed_range = {"timestamp": {"$in": [document["timestamp"] for document in new_metrics]}}
+            mongo_controller.db[f"USDT_{fiat}_Binance"].delete_many(reprocessed_range)
+            mongo_controller.db[f"USDT_{fiat}_Binance"].insert_many(new_metrics)
+            mongo_controller.db[f"USDT_{fiat}_Binance_Books"].delete_many(reprocessed_range)
+            mongo_controller.db[f"USDT_{fiat}_Binance_Books"].insert_many(new_books)
+
+
+def reprocessing_windows(fiat):
+    """
+    Yield the time-range filters used to reprocess a Binance collection, newest first.
+
+    On MongoDB the ranges follow the internal time-series buckets, so each range decompresses a single bucket. The
+    ranges are snapshotted before the first one is yielded, so the caller may rewrite the collection while iterating.
+    The embedded SQLite backend has no buckets, so the collection is walked one day at a time instead.
+
+    Args:
+        fiat (str): The fiat currency (e.g., "BOB", "ARS").
+
+    Yields:
+        dict: A filter on the "timestamp" field.
+    """
+    if mongo_controller.backend == "sqlite":
+        collection = f"USDT_{fiat}_Binance"
+        first = mongo_controller.query_data(_mode="all", collection=collection, projection={"timestamp": 1},
+                                            sort=1, limit=1, _datatype="cursor")
+        last = mongo_controller.query_data(_mode="all", collection=collection, projection={"timestamp": 1},
+                                           sort=-1, limit=1, _datatype="cursor")
+        first, last = list(first), list(last)
+        if not first:
+            return
+        day_start = last[0]["timestamp"].replace(hour=0, minute=0, second=0, microsecond=0)
+        first_day = first[0]["timestamp"].replace(hour=0, minute=0, second=0, microsecond=0)
+        total_days = (day_start - first_day).days + 1
+        for _ in tqdm(range(total_days), total=total_days, desc="Processing data", unit="day"):
+            yield {"timestamp": {"$gte": day_start, "$lt": day_start + timedelta(days=1)}}
+            day_start -= timedelta(days=1)
+        return
+    # The bucket ranges are read up front: callers rewrite the collection, which creates and removes buckets under
+    # a live cursor, so buckets could be visited twice or skipped
+    bucket_collection = f"system.buckets.USDT_{fiat}_Binance"
+    buckets = mongo_controller.db[bucket_collection].find(
+        {}, {"control.min.timestamp": 1, "control.max.timestamp": 1}).sort({"_id": -1})
+    ranges = [(bucket["control"]["min"]["timestamp"], bucket["control"]["max"]["timestamp"]) for bucket in buckets]
+    for min_ts, max_ts in tqdm(ranges, total=len(ranges), desc="Processing data", unit="bucket"):
+        yield {"timestamp": {"$gte": min_ts, "$lte": max_ts}}
 
 
 def compute_bob_parallel_curve():
@@ -678,6 +836,9 @@ if __name__ == "__main__":
 
     # print("[data_processing] Starting a review of processed data...")
     # review_processed_data(fiat="BOB")
+    # print("[data_processing] Splitting order books from tick metrics...")
+    # migrate_binance_books(fiat="BOB")
+    # migrate_binance_books(fiat="ARS")
     print("[data_processing] Starting daily averages calculation...")
     calculate_daily_averages()
     # print("[data_processing] Starting quarterly averages calculation...")
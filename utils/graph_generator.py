@@ -7,6 +7,7 @@ import pytz
 import seaborn as sns
 
 import config
+from utils.data_processing import query_binance_data
 from utils.mongo_controller import mongo_controller
 
 # Define the La Paz timezone
@@ -212,18 +213,14 @@ def liquidity_depth_chart(timestamp, fiat):
     if save_path.exists():
         return save_path
 
-    # Query the buy and sell liquidity depth data from the price record
-    buy_liquidity_depth_df = mongo_controller.query_data(_mode="one", collection=f"USDT_{fiat}_Binance",
-                                                         _filter={"timestamp": timestamp})["buy_liquidity_depth"]
-    sell_liquidity_depth_df = mongo_controller.query_data(_mode="one", collection=f"USDT_{fiat}_Binance",
-                                                          _filter={"timestamp": timestamp})["sell_liquidity_depth"]
+    # Query the buy and sell liquidity depth data from the price record and its order book
+    price_record = query_binance_data(fiat=fiat, _mode="one", _filter={"timestamp": timestamp})
 
-    buy_liquidity_depth_df = pd.DataFrame(buy_liquidity_depth_df)
-    sell_liquidity_depth_df = pd.DataFrame(sell_liquidity_depth_df)
+    buy_liquidity_depth_df = pd.DataFrame(price_record["buy_liquidity_depth"])
+    sell_liquidity_depth_df = pd.DataFrame(price_record["sell_liquidity_depth"])
 
     # Retrieve the buy VWAP and calculate the upper and lower bounds for filtering
-    sell_vwap = mongo_controller.query_data(_mode="one", collection=f"USDT_{fiat}_Binance",
-                                            _filter={"timestamp": timestamp})["sell_vwap"]
+    sell_vwap = price_record["sell_vwap"]
     sell_upper_bound = sell_vwap + (sell_vwap * 0.1)
     buy_lower_bound = sell_vwap - (sell_vwap * 0.1)
 
@@ -0,0 +1,334 @@
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from config import LLM_BENCHMARK_DIR, LLM_BENCHMARK_SAMPLE_SIZE, LLM_MESSAGE_LAYOUT, LLM_NUM_CTX
+from utils.llm_processing import LLMProcessing
+from utils.mongo_controller import mongo_controller
+
+"""
+This module benchmarks the LLM stages on a frozen sample of human reviewed articles, so the cost and the accuracy of
+a model or prompt change can be compared with earlier runs.
+
+Sample sets are copies of the articles (title, date, content and review labels) saved as
+LLM_BENCHMARK_DIR/sample_sets/v<version>.json, so later edits to the database do not change them. Every run is saved
+as LLM_BENCHMARK_DIR/runs/<time>.json with the models, the prompt versions, the message layout and the metrics of
+each stage. The LLM result cache is bypassed. Answers are streamed, so the time to the first token of each call is
+measured; comparing runs with both values of LLM_MESSAGE_LAYOUT shows the effect of Ollama's prompt cache.
+`compare_paths` measures the single combined call against the two-stage path on the short articles of a sample set.
+"""
+
+QUOTE_TOLERANCE = 0.005  # Bs; an extracted quote within it of the reviewed one is correct
+
+
+def sample_set_path(version):
+    """
+    Get the file of a sample set version.
+    """
+    return LLM_BENCHMARK_DIR / "sample_sets" / f"v{version:03d}.json"
+
+
+def create_sample_set(size=LLM_BENCHMARK_SAMPLE_SIZE, seed=0):
+    """
+    Freeze a random sample of the human reviewed articles as a new sample set version.
+
+    Args:
+        size (int, optional): Number of articles. Defaults to LLM_BENCHMARK_SAMPLE_SIZE.
+        seed (int, optional): Seed of the sampling. Defaults to 0.
+
+    Returns:
+        int: The version of the new sample set.
+    """
+    reviewed = list(mongo_controller.db["USD_BOB_Parallel"].find(
+        {"human_approved": {"$in": [True, False]}, "duplicate_of": None},
+        {"timestamp": 1, "title": 1, "content": 1, "human_approved": 1, "quote": 1, "hint_type": 1}))
+    reviewed.sort(key=lambda article: str(article["_id"]))
+    articles = random.Random(seed).sample(reviewed, min(size, len(reviewed)))
+    articles.sort(key=lambda article: article["timestamp"])
+    version = 1
+    while os.path.exists(sample_set_path(version)):
+        version += 1
+    os.makedirs(sample_set_path(version).parent, exist_ok=True)
+    with open(sample_set_path(version), "w", encoding="utf-8") as sample_file:
+        json.dump({
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "seed": seed,
+            "articles": [{
+                "_id": str(article["_id"]),
+                "timestamp": str(article["timestamp"]),
+                "title": article["title"],
+                "content": article["content"],
+                "human_approved": article["human_approved"],
+                "quote": article.get("quote"),
+                "hint_type": article.get("hint_type")
+            } for article in articles]
+        }, sample_file, ensure_ascii=False, indent=1)
+    print(f"[llm_benchmark] Saved sample set v{version:03d} with {len(articles)} articles "
+          f"({sum(article['human_approved'] is True for article in articles)} approved).")
+    return version
+
+
+def load_sample_set(version=None):
+    """
+    Load a sample set.
+
+    Args:
+        version (int, optional): The version to load. Defaults to the latest one.
+
+    Returns:
+        dict: The sample set, or None if there is none.
+    """
+    if version is None:
+        versions = sorted((LLM_BENCHMARK_DIR / "sample_sets").glob("v*.json"))
+        if not versions:
+            return None
+        path = versions[-1]
+    else:
+        path = sample_set_path(version)
+    with open(path, "r", encoding="utf-8") as sample_file:
+        return json.load(sample_file)
+
+
+def is_correct(article, _mode, result):
+    """
+    Compare a stage result with the human review of an article.
+
+    Args:
+        article (dict): The sample article.
+        _mode (str): "detect", "extract", "combined" or "two_stage".
+        result: The result of `LLMProcessing.process_article`, or of `process_two_stage`.
+
+    Returns:
+        bool: For detect, whether the flag matches the approval; for extract, whether the hint type and the quote
+            (within QUOTE_TOLERANCE) match the reviewed ones; for both paths, whether the detection is right and, for
+            approved articles, the extraction too.
+    """
+    if _mode in ("combined", "two_stage"):
+        detected = result is not None and result[0] is True
+        if not is_correct(article, "detect", detected):
+            return False
+        return not detected or is_correct(article, "extract", result[1:])
+    if _mode == "detect":
+        return result is True if article["human_approved"] is True else result is not True
+    if result is None:
+        return False
+    hint_type, quote = result
+    if article["quote"] is None or quote is None:
+        return article["quote"] is None and quote is None
+    return hint_type == article["hint_type"] and abs(quote - article["quote"]) <= QUOTE_TOLERANCE
+
+
+def process_two_stage(llm_processing, article):
+    """
+    Process an article through the detect stage, then the extract stage if it is flagged.
+
+    Args:
+        llm_processing (LLMProcessing): The LLM client.
+        article (dict): The sample article.
+
+    Returns:
+        tuple: The (detected, hint_type, quote) triple, like the combined call.
+    """
+    if llm_processing.process_article(article=article, _mode="detect") is not True:
+        return False, None, None
+    result = llm_processing.process_article(article=article, _mode="extract")
+    return (True, *result) if result is not None else None
+
+
+def benchmark_stage(llm_processing, articles, _mode, workers):
+    """
+    Run a stage over the sample articles and measure it.
+
+    Args:
+        llm_processing (LLMProcessing): The LLM client, with its call log enabled.
+        articles (list): The sample articles.
+        _mode (str): "detect", "extract", "combined" or "two_stage" (detect, then extract if flagged).
+        workers (int): Requests in flight at once.
+
+    Returns:
+        dict: Throughput, latency, JSON failure and accuracy metrics of the stage, and its results.
+    """
+    stages = ("detect", "extract") if _mode == "two_stage" else (_mode,)
+
+    def timed(article):
+        started = time.perf_counter()
+        if _mode == "two_stage":
+            result = process_two_stage(llm_processing, article)
+        else:
+            result = llm_processing.process_article(article=article, _mode=_mode)
+        return result, time.perf_counter() - started
+
+    llm_processing.call_log = []
+    for stage in stages:
+        llm_processing.stats.pop(stage, None)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(timed, articles))
+    elapsed = time.perf_counter() - started
+    calls = [call for call in llm_processing.call_log if call["stage"] in stages]
+    latencies = [seconds for _, seconds in outcomes]
+    first_tokens = [call["first_token_seconds"] for call in calls]
+    call_stats = llm_processing.call_stats()
+    stats = {key: sum(call_stats.get(stage, {}).get(key, 0) for stage in stages)
+             for key in ("calls", "corrections", "failures")}
+    stats["failure_rate"] = max((call_stats.get(stage, {}).get("failure_rate", 0.0) for stage in stages), default=0.0)
+    return {
+        "articles": len(articles),
+        "seconds": elapsed,
+        "articles_per_s": len(articles) / elapsed if elapsed else 0.0,
+        "output_tokens_per_s": sum(call["output_tokens"] for call in calls) / elapsed if elapsed else 0.0,
+        "input_tokens_per_article": sum(call["input_tokens"] for call in calls) / max(1, len(articles)),
+        "p50_latency": float(np.percentile(latencies, 50)) if latencies else 0.0,
+        "p95_latency": float(np.percentile(latencies, 95)) if latencies else 0.0,
+        "p50_first_token": float(np.percentile(first_tokens, 50)) if first_tokens else 0.0,
+        "p95_first_token": float(np.percentile(first_tokens, 95)) if first_tokens else 0.0,
+        "json_failure_rate": (stats["corrections"] + stats["failures"]) / max(1, stats["calls"]),
+        "gave_up_rate": stats.get("failure_rate", 0.0),
+        "accuracy": float(np.mean([is_correct(article, _mode, result)
+                                   for article, (result, _) in zip(articles, outcomes)])) if articles else 0.0,
+        "results": [list(result) if isinstance(result, tuple) else result for result, _ in outcomes]
+    }
+
+
+def run_benchmark(detect_model=None, extract_model=None, version=None, stages=("detect", "extract"), workers=1):
+    """
+    Benchmark the LLM stages on a sample set and save the run.
+
+    Detect runs on every sample article; extract runs on the approved ones, as if they had been flagged.
+
+    Args:
+        detect_model (str, optional): The Ollama model of the detect stage. Defaults to the one of LLMProcessing.
+        extract_model (str, optional): The Ollama model of the extract stage. Defaults to the one of LLMProcessing.
+        version (int, optional): The sample set version. Defaults to the latest one, created if there is none.
+        stages (tuple, optional): The stages to run. Defaults to ("detect", "extract").
+        workers (int, optional): Requests in flight at once. Defaults to 1.
+
+    Returns:
+        dict: The saved run.
+    """
+    sample_set = load_sample_set(version)
+    if sample_set is None:
+        sample_set = load_sample_set(create_sample_set())
+    llm_processing = LLMProcessing(mode="local", use_cache=False)
+    if detect_model:
+        llm_processing.use_model("detect", detect_model)
+    if extract_model:
+        llm_processing.use_model("extract", extract_model)
+    run = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "sample_set": sample_set["version"],
+        "workers": workers,
+        "message_layout": LLM_MESSAGE_LAYOUT,
+        "num_ctx": LLM_NUM_CTX,
+        "models": {"detect": llm_processing.fast_model, "extract": llm_processing.intelligent_model},
+        "prompt_versions": {stage: LLMProcessing.prompt_version(stage) for stage in stages},
+        "stages": {}
+    }
+    for stage in stages:
+        articles = sample_set["articles"]
+        if stage == "extract":
+            articles = [article for article in articles if article["human_approved"] is True]
+        print(f"\n[llm_benchmark] Running {stage} with {run['models'][stage]} on {len(articles)} articles...")
+        run["stages"][stage] = benchmark_stage(llm_processing, articles, stage, workers)
+    save_run(run)
+    return run
+
+
+def compare_paths(version=None, workers=1):
+    """
+    Benchmark the combined call against the two-stage path on the short articles of a sample set and save the run.
+
+    Both paths run on the sample articles short enough for `LLMProcessing.use_combined`. Besides the accuracy of each
+    path, the share of articles where both give the same detection and quote is reported.
+
+    Args:
+        version (int, optional): The sample set version. Defaults to the latest one, created if there is none.
+        workers (int, optional): Requests in flight at once. Defaults to 1.
+
+    Returns:
+        dict: The saved run.
+    """
+    sample_set = load_sample_set(version)
+    if sample_set is None:
+        sample_set = load_sample_set(create_sample_set())
+    llm_processing = LLMProcessing(mode="local", use_cache=False)
+    articles = [article for article in sample_set["articles"] if llm_processing.use_combined(article)]
+    run = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "sample_set": sample_set["version"],
+        "workers": workers,
+        "message_layout": LLM_MESSAGE_LAYOUT,
+        "num_ctx": LLM_NUM_CTX,
+        "models": {"combined": llm_processing.intelligent_model,
+                   "two_stage": f"{llm_processing.fast_model}+{llm_processing.intelligent_model}"},
+        "prompt_versions": {"combined": LLMProcessing.prompt_version("combined"),
+                            "two_stage": f"{LLMProcessing.prompt_version('detect')[:6]}"
+                                         f"+{LLMProcessing.prompt_version('extract')[:6]}"},
+        "stages": {}
+    }
+    for path in ("combined", "two_stage"):
+        print(f"\n[llm_benchmark] Running the {path} path on {len(articles)} short articles...")
+        run["stages"][path] = benchmark_stage(llm_processing, articles, path, workers)
+
+    def outcome(result):
+        return tuple(result) if result is not None and result[0] is True else (False, None, None)
+
+    agreeing = [outcome(combined) == outcome(two_stage) for combined, two_stage
+                in zip(run["stages"]["combined"]["results"], run["stages"]["two_stage"]["results"])]
+    run["agreement"] = sum(agreeing) / len(agreeing) if agreeing else 0.0
+    print(f"[llm_benchmark] The combined and two-stage paths agree on {run['agreement']:.1%} of the short articles.")
+    save_run(run)
+    return run
+
+
+def save_run(run):
+    """
+    Save a benchmark run and print the runs of its sample set.
+
+    Args:
+        run (dict): The run.
+    """
+    runs_dir = LLM_BENCHMARK_DIR / "runs"
+    os.makedirs(runs_dir, exist_ok=True)
+    with open(runs_dir / f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}.json", "w", encoding="utf-8") as run_file:
+        json.dump(run, run_file, indent=1)
+    compare_runs(run["sample_set"])
+
+
+def compare_runs(version=None):
+    """
+    Print the saved runs of a sample set, oldest first.
+
+    Args:
+        version (int, optional): The sample set version. Defaults to every version.
+
+    Returns:
+        list: The runs.
+    """
+    runs = []
+    for path in sorted((LLM_BENCHMARK_DIR / "runs").glob("*.json")):
+        with open(path, "r", encoding="utf-8") as run_file:
+            run = json.load(run_file)
+        if version is None or run["sample_set"] == version:
+            runs.append(run)
+    print(f"\n[llm_benchmark] {'Run':<20}{'Set':>5}{'Stage':>10}  {'Model':<20}{'Prompt':<14}{'Art/s':>7}{'Tok/s':>8}"
+          f"{'p50 (s)':>9}{'p95 (s)':>9}{'TTFT (s)':>10}{'JSON fail':>11}{'Accuracy':>10}")
+    for run in runs:
+        for stage, metrics in run["stages"].items():
+            print(f"[llm_benchmark] {run['created_at'][:19]:<20}{run['sample_set']:>5}{stage:>10}  "
+                  f"{run['models'][stage]:<20}{run['prompt_versions'][stage]:<14}{metrics['articles_per_s']:>7.2f}"
+                  f"{metrics['output_tokens_per_s']:>8.1f}{metrics['p50_latency']:>9.2f}{metrics['p95_latency']:>9.2f}"
+                  f"{metrics.get('p50_first_token', float('nan')):>10.2f}"
+                  f"{metrics['json_failure_rate']:>11.1%}{metrics['accuracy']:>10.1%}")
+    return runs
+
+
+if __name__ == "__main__":
+    run_benchmark()
+    compare_paths()
@@ -0,0 +1,118 @@
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+from utils.mongo_controller import mongo_controller
+
+"""
+This module contains the persistent cache of LLM results, stored in the LLM_Cache collection.
+
+A result is keyed by the SHA-256 of the exact input sent to the model, the stage ("detect" or "extract"), the model
+name and the prompt version (a hash of the stage's prompts), so re-running a stage on unchanged articles costs no
+inference, while changing a prompt or a model only recomputes what depends on it.
+"""
+
+
+def text_hash(text):
+    """
+    Hash a text.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        str: The hex SHA-256 of the text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, collection="LLM_Cache"):
+        """
+        Initialize the cache and its hit counters.
+
+        Args:
+            collection (str, optional): The collection holding the results. Defaults to "LLM_Cache".
+        """
+        self.collection = collection
+        self.lock = threading.Lock()
+        self.hits = {}
+        self.misses = {}
+
+    @staticmethod
+    def key(content_hash, stage, model, prompt_version):
+        """
+        Build the key of a cached result.
+
+        Args:
+            content_hash (str): The hash of the model input.
+            stage (str): "detect" or "extract".
+            model (str): The model name.
+            prompt_version (str): The hash of the prompts of the stage.
+
+        Returns:
+            str: The cache key.
+        """
+        return text_hash(f"{content_hash}|{stage}|{model}|{prompt_version}")
+
+    def lookup(self, content_hash, stage, model, prompt_version):
+        """
+        Get a cached result, counting the hit or miss.
+
+        Args:
+            content_hash (str): The hash of the model input.
+            stage (str): "detect" or "extract".
+            model (str): The model name.
+            prompt_version (str): The hash of the prompts of the stage.
+
+        Returns:
+            The cached result, or None on a miss.
+        """
+        entry = mongo_controller.db[self.collection].find_one({"_id": self.key(content_hash, stage, model,
+                                                                               prompt_version)})
+        with self.lock:
+            counter = self.misses if entry is None else self.hits
+            counter[stage] = counter.get(stage, 0) + 1
+        return None if entry is None else entry["result"]
+
+    def store(self, content_hash, stage, model, prompt_version, result):
+        """
+        Store a result, replacing any previous one with the same key.
+
+        Args:
+            content_hash (str): The hash of the model input.
+            stage (str): "detect" or "extract".
+            model (str): The model name.
+            prompt_version (str): The hash of the prompts of the stage.
+            result: The result, a JSON compatible value other than None.
+        """
+        _id = self.key(content_hash, stage, model, prompt_version)
+        mongo_controller.replace_data(collection=self.collection, _id=_id,
+                                      data={
+                                          "_id": _id,
+                                          "content_hash": content_hash,
+                                          "stage": stage,
+                                          "model": model,
+                                          "prompt_version": prompt_version,
+                                          "result": result,
+                                          "created_at": datetime.now(timezone.utc)
+                                      })
+
+    def stats(self):
+        """
+        Get the hit rate of each stage since the cache was created.
+
+        Returns:
+            dict: Per stage, the number of hits, misses and the hit rate.
+        """
+        with self.lock:
+            stages = set(self.hits) | set(self.misses)
+            report = {}
+            for stage in sorted(stages):
+                hits = self.hits.get(stage, 0)
+                misses = self.misses.get(stage, 0)
+                report[stage] = {"hits": hits, "misses": misses, "hit_rate": hits / (hits + misses)}
+            return report
+
+
+llm_cache = LLMCache()
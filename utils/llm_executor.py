@@ -0,0 +1,278 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from tqdm import tqdm
+
+from config import LLM_MAX_IN_FLIGHT, LLM_UPDATE_BATCH_SIZE, LLM_EXTRACT_WORKERS, LLM_PIPELINE_QUEUE_SIZE, \
+    LLM_MODEL_RESIDENCY, LLM_ALTERNATE_WINDOW
+from utils.mongo_controller import mongo_controller
+
+"""
+This module runs the LLM stages over a batch of newspaper articles with several requests in flight at once, so the
+model server never waits for the database or for the next prompt to be built.
+
+At most `max_in_flight` articles are submitted at any time (backpressure): a new article is only handed to the pool
+when a previous one completes. Results are turned into document updates and written in batches of `batch_size`.
+
+`run_llm_pipeline` chains the detect and extract stages. Articles flagged by detect are first given to an optional
+rule-based extractor, and only the ones it cannot resolve reach the extraction model. How the two models share the
+box is set by LLM_MODEL_RESIDENCY:
+    - "concurrent": both models stay loaded; articles flagged by detect go straight to a bounded queue consumed by
+      LLM_EXTRACT_WORKERS extraction workers, so a new article is extracted minutes after it is detected.
+    - "alternate": a single model is loaded at a time; detect runs over windows of LLM_ALTERNATE_WINDOW articles,
+      then its model is unloaded and the positives of the window are extracted, and so on.
+"""
+
+
+class UpdateBuffer:
+    def __init__(self, collection="USD_BOB_Parallel", batch_size=LLM_UPDATE_BATCH_SIZE):
+        """
+        Initialize a thread-safe buffer of document updates.
+
+        Args:
+            collection (str, optional): The collection holding the articles. Defaults to "USD_BOB_Parallel".
+            batch_size (int, optional): Number of updates written at once. Defaults to LLM_UPDATE_BATCH_SIZE.
+        """
+        self.collection = collection
+        self.batch_size = batch_size
+        self.updates = []
+        self.lock = threading.Lock()
+
+    def add(self, _id, data):
+        """
+        Queue an update, writing the batch once it is full.
+
+        Args:
+            _id: The _id of the article.
+            data (dict): The fields to set.
+        """
+        with self.lock:
+            self.updates.append((_id, data))
+            if len(self.updates) < self.batch_size:
+                return
+            updates, self.updates = self.updates, []
+        mongo_controller.update_data_batch(collection=self.collection, updates=updates)
+
+    def flush(self):
+        """
+        Write the queued updates.
+        """
+        with self.lock:
+            updates, self.updates = self.updates, []
+        mongo_controller.update_data_batch(collection=self.collection, updates=updates)
+
+
+def run_llm_stage(llm_processing, articles, _mode, build_update, max_in_flight=LLM_MAX_IN_FLIGHT,
+                  batch_size=LLM_UPDATE_BATCH_SIZE, collection="USD_BOB_Parallel", buffer=None, handoff=None):
+    """
+    Process articles concurrently with an LLM and store the results.
+
+    Articles whose request fails are reported and left untouched, so the next run picks them up again. Pending
+    updates are written even if the stage is interrupted.
+
+    Args:
+        llm_processing (LLMProcessing): The LLM client.
+        articles (pandas.DataFrame): The articles to process.
+        _mode (str): "detect", "extract" or "combined", passed to `LLMProcessing.process_article`.
+        build_update (callable): Turns the result of `process_article` into the fields to set on the article.
+        max_in_flight (int, optional): Maximum number of requests in flight. Defaults to LLM_MAX_IN_FLIGHT.
+        batch_size (int, optional): Number of updates written at once. Defaults to LLM_UPDATE_BATCH_SIZE.
+        collection (str, optional): The collection holding the articles. Defaults to "USD_BOB_Parallel".
+        buffer (UpdateBuffer, optional): A buffer shared with other stages, flushed by its owner. Defaults to a
+            buffer of its own, flushed when the stage ends.
+        handoff (callable, optional): Called with each processed article and its update; if it returns True, the
+            update is taken over by the next stage instead of being written. Defaults to None.
+
+    Returns:
+        int: The number of articles processed successfully.
+    """
+    own_buffer = buffer is None
+    buffer = buffer if buffer is not None else UpdateBuffer(collection=collection, batch_size=batch_size)
+    processed = 0
+    rows = (article for _, article in articles.iterrows())
+    in_flight = {}
+    progress = tqdm(total=len(articles), unit="article", desc="Analyzing articles")
+    executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=f"llm-{_mode}")
+    try:
+        exhausted = False
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < max_in_flight:
+                article = next(rows, None)
+                if article is None:
+                    exhausted = True
+                    break
+                future = executor.submit(llm_processing.process_article, article=article, _mode=_mode)
+                in_flight[future] = article
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                article = in_flight.pop(future)
+                progress.update(1)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"\n[llm_executor] Failed to process article #{article['_id']}: {type(e).__name__}: {e}")
+                    continue
+                processed += 1
+                update = build_update(result)
+                if handoff is None or not handoff(article, update):
+                    buffer.add(article["_id"], update)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        progress.close()
+        if own_buffer:
+            buffer.flush()
+    return processed
+
+
+def resolve_with_rules(article, update, rule_update):
+    """
+    Complete the detection update of a flagged article with the rule-based extraction, if the rules resolve it.
+
+    Args:
+        article (pandas.Series): The article flagged by the detect stage.
+        update (dict): Its detection update, completed in place.
+        rule_update (callable or None): The rule-based extraction.
+
+    Returns:
+        bool: True if the article no longer needs the extraction model.
+    """
+    rules = rule_update(article) if rule_update is not None else None
+    if rules is None:
+        return False
+    update.update(rules)
+    return True
+
+
+def run_llm_pipeline(llm_processing, detect_articles, extract_articles, detection_update, extraction_update,
+                     residency=LLM_MODEL_RESIDENCY, rule_update=None):
+    """
+    Run the detect and extract stages, feeding the articles flagged by detect to extraction as they come.
+
+    Args:
+        llm_processing (LLMProcessing): The LLM client.
+        detect_articles (pandas.DataFrame): The articles waiting for the detect stage.
+        extract_articles (pandas.DataFrame): The articles already flagged, waiting for the extract stage.
+        detection_update (callable): Turns a detection result into the fields to set on the article.
+        extraction_update (callable): Turns an extraction result into the fields to set on the article.
+        residency (str, optional): "concurrent" or "alternate", see the module docstring. Defaults to
+            LLM_MODEL_RESIDENCY.
+        rule_update (callable, optional): Turns a flagged article into its second-stage fields without the LLM, or
+            returns None if the extraction model is needed. Defaults to None.
+
+    Returns:
+        dict: The number of articles processed by each stage, and by the rules.
+    """
+    if residency == "alternate":
+        return run_alternating(llm_processing, detect_articles, extract_articles, detection_update,
+                               extraction_update, rule_update=rule_update)
+    buffer = UpdateBuffer()
+    handoff_queue = queue.Queue(maxsize=LLM_PIPELINE_QUEUE_SIZE)
+    stop = threading.Event()
+    counts_lock = threading.Lock()
+    processed = {"detect": 0, "extract": 0, "rules": 0}
+
+    def extract_worker():
+        while True:
+            item = handoff_queue.get()
+            if item is None:
+                return
+            if stop.is_set():
+                continue
+            article, update = item
+            try:
+                result = llm_processing.process_article(article=article, _mode="extract")
+            except Exception as e:
+                print(f"\n[llm_executor] Failed to extract article #{article['_id']}: {type(e).__name__}: {e}")
+                continue
+            # The detection update of a flagged article is written together with its extraction, so a slower
+            # detect batch can never reset second_stage_processed after the extraction
+            buffer.add(article["_id"], {**update, **extraction_update(result)})
+            with counts_lock:
+                processed["extract"] += 1
+
+    def feed_backlog():
+        for _, article in extract_articles.iterrows():
+            if stop.is_set():
+                return
+            handoff_queue.put((article, {}))
+
+    def handoff(article, update):
+        if update.get("second_stage_processed") is not False:
+            return False
+        if resolve_with_rules(article, update, rule_update):
+            with counts_lock:
+                processed["rules"] += 1
+            return False
+        handoff_queue.put((article, update))
+        return True
+
+    workers = [threading.Thread(target=extract_worker, name=f"llm-extract-{index}", daemon=True)
+               for index in range(LLM_EXTRACT_WORKERS)]
+    feeder = threading.Thread(target=feed_backlog, name="llm-extract-backlog", daemon=True)
+    for thread in workers + [feeder]:
+        thread.start()
+    try:
+        processed["detect"] = run_llm_stage(llm_processing, detect_articles, "detect", detection_update,
+                                            buffer=buffer, handoff=handoff)
+        feeder.join()
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        for _ in workers:
+            handoff_queue.put(None)
+        for thread in workers:
+            thread.join()
+        buffer.flush()
+    return processed
+
+
+def run_alternating(llm_processing, detect_articles, extract_articles, detection_update, extraction_update,
+                    window=LLM_ALTERNATE_WINDOW, rule_update=None):
+    """
+    Run the detect and extract stages with a single model loaded at a time.
+
+    The extraction backlog is processed first; then detect runs over windows of `window` articles, each followed
+    by the extraction of the articles it flagged. A model is unloaded before the other one is used.
+
+    Args:
+        llm_processing (LLMProcessing): The LLM client.
+        detect_articles (pandas.DataFrame): The articles waiting for the detect stage.
+        extract_articles (pandas.DataFrame): The articles already flagged, waiting for the extract stage.
+        detection_update (callable): Turns a detection result into the fields to set on the article.
+        extraction_update (callable): Turns an extraction result into the fields to set on the article.
+        window (int, optional): Articles detected between two extraction phases. Defaults to LLM_ALTERNATE_WINDOW.
+        rule_update (callable, optional): Turns a flagged article into its second-stage fields without the LLM, or
+            returns None if the extraction model is needed. Defaults to None.
+
+    Returns:
+        dict: The number of articles processed by each stage, and by the rules.
+    """
+    processed = {"detect": 0, "extract": 0, "rules": 0}
+    if not extract_articles.empty:
+        processed["extract"] += run_llm_stage(llm_processing, extract_articles, "extract", extraction_update)
+        llm_processing.unload_model("extract")
+    for start in range(0, len(detect_articles), window):
+        flagged = []
+
+        def collect(article, update):
+            if update.get("second_stage_processed") is not False:
+                return False
+            if resolve_with_rules(article, update, rule_update):
+                processed["rules"] += 1
+            else:
+                flagged.append(article["_id"])
+            return False
+
+        batch = detect_articles.iloc[start:start + window]
+        processed["detect"] += run_llm_stage(llm_processing, batch, "detect", detection_update, handoff=collect)
+        if not flagged:
+            continue
+        llm_processing.unload_model("detect")
+        processed["extract"] += run_llm_stage(llm_processing, batch[batch["_id"].isin(flagged)], "extract",
+                                              extraction_update)
+        llm_processing.unload_model("extract")
+    return processed
@@ -1,10 +1,42 @@
+import json
+import threading
+import time
+
+import requests
 from langchain.globals import set_verbose, set_debug
 from langchain_ollama import ChatOllama
 
+from config import LLM_COMBINED_MAX_TOKENS, LLM_FAST_MODEL, LLM_INTELLIGENT_MODEL, LLM_KEEP_ALIVE, LLM_NUM_CTX, \
+    LLM_MESSAGE_LAYOUT, OLLAMA_BASE_URL
+from utils.article_context import build_context_chunks, merge_extractions, estimate_tokens
+from utils.llm_cache import llm_cache, text_hash
 from utils.llm_prompts import detect_exchange_rate_prompt_es, extract_exchange_rate_prompt_es, correct_detection_es, \
-    correct_extraction_es, reassurance_detection_es, reassurance_extraction_es
+    correct_extraction_es, reassurance_detection_es, reassurance_extraction_es, combined_exchange_rate_prompt_es, \
+    correct_combined_es, reassurance_combined_es
 from utils.services import check_ollama, extract_json_response
 
+DETECT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "mentions_parallel_exchange_rate": {"type": "boolean"}
+    },
+    "required": ["mentions_parallel_exchange_rate"]
+}
+EXTRACT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "quote": {"type": ["number", "null"]},
+        "hint_type": {"type": ["string", "null"], "enum": ["exact", "above", "below", None]}
+    },
+    "required": ["quote", "hint_type"]
+}
+COMBINED_SCHEMA = {
+    "type": "object",
+    "properties": {**DETECT_SCHEMA["properties"], **EXTRACT_SCHEMA["properties"]},
+    "required": DETECT_SCHEMA["required"] + EXTRACT_SCHEMA["required"]
+}
+HINT_TYPES = ("exact", "above", "below", None)
+
 
 class LLMProcessing:
     """
@@ -12,17 +44,23 @@ class LLMProcessing:
     of exchange rate mentions. Supports both local and remote modes.
     """
 
-    def __init__(self, mode):
+    def __init__(self, mode, use_cache=True):
         """
         Initialize the LLMProcessing class.
 
         Args:
             mode (str): The mode of operation, either "local" or "remote".
+            use_cache (bool, optional): If True, results are read from and stored in the LLM result cache. Defaults
+                to True.
         """
         self.mode = mode
+        self.use_cache = use_cache
+        self.stats_lock = threading.Lock()
+        self.stats = {}  # Per stage: inputs sent to the model, model calls, correction rounds and parse failures
+        self.call_log = None  # When set to a list, every model call appends its stage, durations and token counts
         if self.mode == "local":
-            self.fast_model = "llama3.1:8b"
-            self.intelligent_model = "deepseek-r1:14b"
+            self.fast_model = LLM_FAST_MODEL
+            self.intelligent_model = LLM_INTELLIGENT_MODEL
             if check_ollama() == 1:
                 print("[main] Ollama is not running. Please start the Ollama service.")
                 retry = input("[main] Do you want to retry? (y/n): ").lower()
@@ -31,8 +69,9 @@ class LLMProcessing:
                         raise ConnectionError("[main] Ollama is still not running. Exiting program.")
                 else:
                     raise ConnectionError("[main] Exiting program.")
-            self.fast_llm = ChatOllama(model=self.fast_model, temperature=0)
-            self.intelligent_llm = ChatOllama(model=self.intelligent_model, temperature=0)
+            self.fast_llm = self.local_llm(self.fast_model, DETECT_SCHEMA)
+            self.intelligent_llm = self.local_llm(self.intelligent_model, EXTRACT_SCHEMA)
+            self.combined_llm = self.local_llm(self.intelligent_model, COMBINED_SCHEMA)
             self.settings = None
             self.limits = None
         else:  # Mixed
@@ -40,13 +79,247 @@ class LLMProcessing:
         set_debug(False)
         set_verbose(False)
 
-    def process_article(self, article, _mode, attempt=1, messages=None):
+    @staticmethod
+    def local_llm(model, schema):
         """
-        Process an article to detect or extract exchange rate information using LLMs.
+        Create the client of a local Ollama model.
+
+        The answers are constrained to the JSON schema of the stage by Ollama's structured outputs. Every client uses
+        the same context window and keep-alive, so Ollama never reloads a model between requests and keeps reusing
+        the cached prompt prefix of the stage.
+
+        Args:
+            model (str): The Ollama model name.
+            schema (dict): The JSON schema of the answers.
+
+        Returns:
+            ChatOllama: The client.
+        """
+        return ChatOllama(model=model, base_url=OLLAMA_BASE_URL, temperature=0, format=schema, num_ctx=LLM_NUM_CTX,
+                          keep_alive=LLM_KEEP_ALIVE)
+
+    @staticmethod
+    def prompt_version(_mode):
+        """
+        Get the version of the prompts of a stage, which changes whenever any of them, its schema or the message
+        layout is edited.
+
+        Args:
+            _mode (str): The operation mode, either "detect", "extract" or "combined".
+
+        Returns:
+            str: The first 12 hex digits of the hash of the stage's prompts.
+        """
+        if _mode == "detect":
+            prompts = [detect_exchange_rate_prompt_es, reassurance_detection_es, correct_detection_es,
+                       json.dumps(DETECT_SCHEMA, sort_keys=True)]
+        elif _mode == "combined":
+            prompts = [combined_exchange_rate_prompt_es, reassurance_combined_es, correct_combined_es,
+                       json.dumps(COMBINED_SCHEMA, sort_keys=True)]
+        else:
+            prompts = [extract_exchange_rate_prompt_es, reassurance_extraction_es, correct_extraction_es,
+                       json.dumps(EXTRACT_SCHEMA, sort_keys=True)]
+        return text_hash("\n".join(prompts + [LLM_MESSAGE_LAYOUT]))[:12]
+
+    def cache_key(self, article, _mode):
+        """
+        Get the arguments identifying the result of an article in the LLM result cache.
+
+        Args:
+            article (dict): The article data containing 'title', 'timestamp', and 'content'.
+            _mode (str): The operation mode, either "detect", "extract" or "combined".
+
+        Returns:
+            tuple: The input hash, stage, model name and prompt version.
+        """
+        model = self.fast_model if _mode == "detect" else self.intelligent_model
+        return text_hash(self.article_message(article)), _mode, model, self.prompt_version(_mode)
+
+    @staticmethod
+    def article_message(article):
+        """
+        Build the user message presenting an article to the model.
+
+        Args:
+            article (dict): The article data containing 'title', 'timestamp', and 'content'.
+
+        Returns:
+            str: The message content.
+        """
+        return f"Titulo: {article['title']}\nDate:{article['timestamp']}\nContenido:\n{article['content']}"
+
+    def build_messages(self, article, instructions, reassurance):
+        """
+        Build the first messages of a stage for an article.
+
+        With the "prefix" LLM_MESSAGE_LAYOUT, the instructions and the format reminder form a single system message
+        that is identical for every article of the stage, followed by the article, so Ollama can reuse the evaluated
+        prompt prefix across calls. The "legacy" layout puts the reminder after the article.
 
         Args:
             article (dict): The article data containing 'title', 'timestamp', and 'content'.
+            instructions (str): The instructions of the stage.
+            reassurance (str): The reminder of the answer format of the stage.
+
+        Returns:
+            list: The messages.
+        """
+        if LLM_MESSAGE_LAYOUT == "legacy":
+            return [
+                {"role": "system", "content": instructions},
+                {"role": "user", "content": self.article_message(article)},
+                {"role": "system", "content": reassurance}
+            ]
+        return [
+            {"role": "system", "content": f"{instructions.rstrip()}\n{reassurance}"},
+            {"role": "user", "content": self.article_message(article)}
+        ]
+
+    @staticmethod
+    def use_combined(article):
+        """
+        Check whether an article is short enough for the combined detect and extract call.
+
+        Args:
+            article (dict): The article data containing 'content'.
+
+        Returns:
+            bool: True if its content fits in LLM_COMBINED_MAX_TOKENS (0 disables the combined call).
+        """
+        return 0 < estimate_tokens(article["content"] or "") <= LLM_COMBINED_MAX_TOKENS
+
+    def use_model(self, _mode, model):
+        """
+        Replace the local model of a stage.
+
+        Args:
             _mode (str): The operation mode, either "detect" or "extract".
+            model (str): The Ollama model name.
+        """
+        if _mode == "detect":
+            self.fast_model = model
+            self.fast_llm = self.local_llm(model, DETECT_SCHEMA)
+        else:
+            self.intelligent_model = model
+            self.intelligent_llm = self.local_llm(model, EXTRACT_SCHEMA)
+            self.combined_llm = self.local_llm(model, COMBINED_SCHEMA)
+
+    def unload_model(self, _mode):
+        """
+        Ask Ollama to unload the model of a stage from memory, so the other model has the box to itself.
+
+        Args:
+            _mode (str): The operation mode, either "detect" or "extract".
+        """
+        if self.mode != "local":
+            return
+        model = self.fast_model if _mode == "detect" else self.intelligent_model
+        try:
+            requests.post(f"{OLLAMA_BASE_URL}/api/generate", json={"model": model, "keep_alive": 0}, timeout=30)
+        except requests.exceptions.RequestException as e:
+            print(f"[llm_processing] Failed to unload {model}: {e}")
+
+    @staticmethod
+    def parse_answer(data, _mode):
+        """
+        Validate a parsed answer against the schema of its stage.
+
+        Args:
+            data (dict or None): The JSON answer of the model.
+            _mode (str): The operation mode, either "detect", "extract" or "combined".
+
+        Returns:
+            bool or tuple or None: The detection flag, the (hint_type, quote) pair, or the (detected, hint_type, quote)
+                triple, or None if the answer does not match the schema.
+        """
+        if not isinstance(data, dict):
+            return None
+        if _mode in ("detect", "combined"):
+            detected = data.get("mentions_parallel_exchange_rate")
+            if not isinstance(detected, bool):
+                return None
+            if _mode == "detect":
+                return detected
+            extraction = LLMProcessing.parse_answer(data, "extract")
+            return None if extraction is None else (detected, *extraction)
+        hint_type = data.get("hint_type", None)
+        quote = data.get("quote", None)
+        if hint_type not in HINT_TYPES:
+            return None
+        try:
+            quote = float(quote) if quote is not None else None
+        except (TypeError, ValueError):
+            return None
+        return hint_type, quote
+
+    def count(self, _mode, event):
+        """
+        Increment a per-stage call counter.
+
+        Args:
+            _mode (str): The operation mode, either "detect" or "extract".
+            event (str): "articles", "calls", "corrections" or "failures".
+        """
+        with self.stats_lock:
+            counters = self.stats.setdefault(_mode, {"articles": 0, "calls": 0, "corrections": 0, "failures": 0})
+            counters[event] += 1
+
+    def call_stats(self):
+        """
+        Get the model call statistics of each stage.
+
+        Returns:
+            dict: Per stage, the counters plus the calls per article and the correction and parse failure rates.
+        """
+        with self.stats_lock:
+            report = {}
+            for stage, counters in self.stats.items():
+                articles = counters["articles"] or 1
+                report[stage] = {**counters,
+                                 "calls_per_article": counters["calls"] / articles,
+                                 "correction_rate": counters["corrections"] / articles,
+                                 "failure_rate": counters["failures"] / articles}
+            return report
+
+    def process_article(self, article, _mode):
+        """
+        Process an article to detect or extract exchange rate information using LLMs.
+
+        For extraction, the content is first trimmed to the paragraphs around exchange rate mentions, within
+        EXTRACT_CONTEXT_TOKENS; articles whose relevant paragraphs do not fit are processed in several chunks whose
+        results are merged. The "combined" mode detects and extracts in a single call, for short articles (see
+        `use_combined`).
+
+        Args:
+            article (dict): The article data containing 'title', 'timestamp', and 'content'.
+            _mode (str): The operation mode, either "detect", "extract" or "combined".
+
+        Returns:
+            bool or tuple or None:
+                - For "detect" mode: Returns True/False if the parallel exchange rate is mentioned.
+                - For "extract" mode: Returns a tuple (hint_type, quote) if extraction is successful, otherwise None.
+                - For "combined" mode: Returns a tuple (detected, hint_type, quote) if successful, otherwise None.
+        """
+        if _mode in ("detect", "combined"):
+            return self.query_model(article, _mode)
+        results = []
+        for chunk in build_context_chunks(article["content"]):
+            chunk_article = {"title": article["title"], "timestamp": article["timestamp"], "content": chunk}
+            results.append(self.query_model(chunk_article, _mode))
+        return merge_extractions(results)
+
+    def query_model(self, article, _mode, attempt=1, messages=None):
+        """
+        Ask the model of a stage about an article.
+
+        Answers are requested with the JSON schema of the stage, so they normally parse on the first call; an answer
+        that still does not match the schema gets a correction round, up to 3 calls in total. Results are served
+        from the LLM result cache when the same input was already processed with the same model and prompts. Only
+        successfully parsed answers are cached.
+
+        Args:
+            article (dict): The article data containing 'title', 'timestamp', and 'content'.
+            _mode (str): The operation mode, either "detect", "extract" or "combined".
             attempt (int, optional): The current attempt number for processing. Defaults to 1.
             messages (list, optional): The message history for the LLM. Defaults to None.
 
@@ -54,52 +327,66 @@ class LLMProcessing:
             bool or tuple or None:
                 - For "detect" mode: Returns True/False if the parallel exchange rate is mentioned.
                 - For "extract" mode: Returns a tuple (hint_type, quote) if extraction is successful, otherwise None.
+                - For "combined" mode: Returns a tuple (detected, hint_type, quote) if successful, otherwise None.
         """
         if _mode == "detect":
             instructions = detect_exchange_rate_prompt_es
             correction = correct_detection_es
             reassurance = reassurance_detection_es
+        elif _mode == "combined":
+            instructions = combined_exchange_rate_prompt_es
+            correction = correct_combined_es
+            reassurance = reassurance_combined_es
         else:
             instructions = extract_exchange_rate_prompt_es
             correction = correct_extraction_es
             reassurance = reassurance_extraction_es
         if attempt == 1:
-            messages = [
-                {
-                    "role": "system",
-                    "content": instructions
-                },
-                {
-                    "role": "user",
-                    "content": f"Titulo: {article['title']}\nDate:{article['timestamp']}\nContenido:\n{article['content']}"
-                },
-                {
-                    "role": "system",
-                    "content": reassurance
-                }
-            ]
-        elif attempt > 3:
-            # print("Exceeded")
+            if self.use_cache:
+                cached = llm_cache.lookup(*self.cache_key(article, _mode))
+                if cached is not None:
+                    return cached if _mode == "detect" else tuple(cached)
+            self.count(_mode, "articles")
+            messages = self.build_messages(article, instructions, reassurance)
+        self.count(_mode, "calls")
+        if _mode == "detect":
+            llm = self.fast_llm
+        elif _mode == "combined":
+            llm = self.combined_llm
+        else:
+            llm = self.intelligent_llm
+        if self.call_log is None:
+            response = llm.invoke(messages)
+        else:
+            # The answer is streamed to measure the time to the first token, which mostly depends on the part of
+            # the prompt Ollama could not serve from its prompt cache
+            started = time.perf_counter()
+            response = None
+            first_token = None
+            for chunk in llm.stream(messages):
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                response = chunk if response is None else response + chunk
+            usage = getattr(response, "usage_metadata", None) or {}
+            self.call_log.append({"stage": _mode, "seconds": time.perf_counter() - started,
+                                  "first_token_seconds": first_token or 0.0,
+                                  "input_tokens": usage.get("input_tokens", 0),
+                                  "output_tokens": usage.get("output_tokens", 0)})
+        result = self.parse_answer(extract_json_response(response.content), _mode)
+        if result is not None:  # Successfully extracted data
+            if self.use_cache:
+                llm_cache.store(*self.cache_key(article, _mode), result=result if _mode == "detect" else list(result))
+            return result
+        elif attempt >= 3:
+            # The third answer failed too: give up without another correction round
+            self.count(_mode, "failures")
             if _mode == "detect":
                 return False
             else:
                 return None
-        if _mode == "detect":
-            response = self.fast_llm.invoke(messages)
-        else:
-            response = self.intelligent_llm.invoke(messages)
-        data = extract_json_response(response.content)
-        if data is not None:  # Successfully extracted data
-            if _mode == "detect":
-                return data.get("mentions_parallel_exchange_rate", False)
-            else:  # extract mode
-                hint_type = data.get("hint_type", None)
-                quote = data.get("quote", None)
-                if quote is not None:
-                    quote = float(quote)
-                return hint_type, quote
         else:
+            self.count(_mode, "corrections")
             messages.append({"role": "assistant", "content": response.content})
             messages.append({"role": "user", "content": correction})
             attempt += 1
-            return self.process_article(article, _mode=_mode, attempt=attempt, messages=messages)
\ No newline at end of file
+            return self.query_model(article, _mode=_mode, attempt=attempt, messages=messages)
\ No newline at end of file
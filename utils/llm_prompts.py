@@ -118,3 +118,70 @@ Asegúrate de que la respuesta esté en el formato:
 }
 ```
 """
+
+combined_exchange_rate_prompt_es = """
+Eres un asistente que extrae el precio del dólar paralelo en Bolivia a partir de artículos de periódicos.
+Tu tarea es leer el artículo proporcionado y determinar:
+
+1. Si se menciona el tipo de cambio paralelo en Bolivia, ya sea de manera explícita o implícita, como 'mentions_parallel_exchange_rate' (true o false). Es mejor tener un falso positivo, que a un falso negativo.
+2. Si se menciona explícitamente, y de forma exacta, extraer el valor numérico de ese tipo de cambio (float) como 'quote', y 'hint_type': 'exact'.
+3. Si menciona que el precio está por encima de un valor, o por debajo de un valor, extraer ese valor (float) como 'quote' y 'hint_type': 'above' o 'below'.
+4. Si es un porcentaje, dado que no es un tipo de cambio exacto, 'quote' y 'hint_type' deben ser `null`.
+5. Si se menciona un estimado, o un numero no muy exacto, proporcionar ese numero como 'quote' y 'hint_type': null.
+
+**Importante:** Devuelve tu respuesta **solo** en el siguiente formato JSON sin ningún texto adicional o explicaciones:
+
+```json
+{
+  "mentions_parallel_exchange_rate": <true o false>,
+  "quote": <float o null>,
+  "hint_type": <"exact", "above", "below", null>
+}
+```
+
+Ejemplo de una respuesta correcta:
+
+```json
+{
+  "mentions_parallel_exchange_rate": true,
+  "quote": 10.05,
+  "hint_type": "exact"
+}
+```
+
+Si el tipo de cambio paralelo no se menciona, la respuesta debe ser:
+
+```json
+{
+  "mentions_parallel_exchange_rate": false,
+  "quote": null,
+  "hint_type": null
+}
+```
+"""
+
+correct_combined_es = """
+La respuesta anterior no estaba en el formato JSON correcto. Por favor, reformula tu respuesta para que coincida exactamente con la siguiente estructura JSON:
+
+```json
+{
+  "mentions_parallel_exchange_rate": <true o false>,
+  "quote": <float o null>,
+  "hint_type": <"exact", "above", "below", null>
+}
+```
+
+Asegúrate de que no haya texto adicional antes o después del objeto JSON.
+"""
+
+reassurance_combined_es = """
+Asegúrate de que la respuesta esté en el formato:
+
+```json
+{
+  "mentions_parallel_exchange_rate": <true o false>,
+  "quote": <float o null>,
+  "hint_type": <"exact", "above", "below", null>
+}
+```
+"""
@@ -1,36 +1,58 @@
 import pandas as pd
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from pymongo.errors import ConnectionFailure
 
 import config
+from utils.sqlite_backend import SQLiteDatabase
+
+COLLECTION_TYPES = {
+    "config": "default",
+    "USDT_BOB_Binance": "timeseries",
+    "USDT_BOB_Other": "default",
+    "USDT_ARS_Binance": "timeseries",
+    "USDT_BOB_Binance_Books": "timeseries",
+    "USDT_ARS_Binance_Books": "timeseries",
+    "USDT_BOB_Binance_Hourly": "timeseries",
+    "USDT_ARS_Binance_Hourly": "timeseries",
+    "USDT_ARS_TradingView": "timeseries",
+    "USD_BOB_Parallel": "default",
+    "USD_ARS_Parallel": "timeseries",
+    "USD_ARS_Official": "timeseries",
+    "Daily_Averages": "default",
+    "Monthly_Averages": "default",
+    "Quarterly_Averages": "default",
+    "USD_BOB_Tarjeta": "timeseries",
+    "LLM_Cache": "default"
+}
+TIMESERIES_OPTIONS = {"timeField": "timestamp", "metaField": "metadata", "granularity": "minutes"}
 
 
 class MongoController:
     """
     Controller class for managing MongoDB operations, including connection,
     collection creation, and CRUD operations for the 'bolivian_blue_db' database.
+
+    The same interface is served by the embedded SQLite backend when config.STORAGE_BACKEND is "sqlite".
     """
 
-    def __init__(self):
+    def __init__(self, backend=None):
         """
         Initialize the MongoController by connecting to MongoDB, checking the connection,
         and ensuring required collections exist.
+
+        Args:
+            backend (str, optional): Either "mongo" or "sqlite". Defaults to config.STORAGE_BACKEND.
         """
-        self.client = MongoClient(host=config.MONGO_HOST, port=config.MONGO_PORT)
-        self.is_running()
-        self.db = self.client.bolivian_blue_db
-        self.create_collection(collection_name="config", collection_type="default")
-        self.create_collection(collection_name="USDT_BOB_Binance", collection_type="timeseries")
-        self.create_collection(collection_name="USDT_BOB_Other", collection_type="default")
-        self.create_collection(collection_name="USDT_ARS_Binance", collection_type="timeseries")
-        self.create_collection(collection_name="USDT_ARS_TradingView", collection_type="timeseries")
-        self.create_collection(collection_name="USD_BOB_Parallel", collection_type="default")
-        self.create_collection(collection_name="USD_ARS_Parallel", collection_type="timeseries")
-        self.create_collection(collection_name="USD_ARS_Official", collection_type="timeseries")
-        self.create_collection(collection_name="Daily_Averages", collection_type="default")
-        self.create_collection(collection_name="Monthly_Averages", collection_type="default")
-        self.create_collection(collection_name="Quarterly_Averages", collection_type="default")
-        self.create_collection(collection_name="USD_BOB_Tarjeta", collection_type="timeseries")
+        self.backend = backend if backend is not None else config.STORAGE_BACKEND
+        if self.backend == "sqlite":
+            self.client = None
+            self.db = SQLiteDatabase(config.SQLITE_PATH)
+        else:
+            self.client = MongoClient(host=config.MONGO_HOST, port=config.MONGO_PORT)
+            self.is_running()
+            self.db = self.client.bolivian_blue_db
+        for collection_name, collection_type in COLLECTION_TYPES.items():
+            self.create_collection(collection_name=collection_name, collection_type=collection_type)
 
     def is_running(self):
         """
@@ -66,14 +88,7 @@ class MongoController:
         if collection_name not in self.db.list_collection_names():
             if collection_type == "timeseries":
                 print(f"\n[mongo_controller] Creating timeseries collection {collection_name}...")
-                self.db.create_collection(
-                    collection_name,
-                    timeseries={
-                        "timeField": "timestamp",
-                        "metaField": "metadata",
-                        "granularity": "minutes",
-                    },
-                )
+                self.db.create_collection(collection_name, timeseries=dict(TIMESERIES_OPTIONS))
             elif collection_type == "default":
                 print(f"\n[mongo_controller] Creating default collection {collection_name}...")
                 self.db.create_collection(collection_name)
@@ -93,7 +108,8 @@ class MongoController:
         self.db[collection].insert_one(data)
         return 0
 
-    def query_data(self, _mode, collection, _filter=None, projection=None, sort=None, limit=0, _datatype="df"):
+    def query_data(self, _mode, collection, _filter=None, projection=None, sort=None, limit=0, _datatype="df",
+                   chunk_size=10000, batch_size=None, dtypes=None):
         """
         Query data from a specified MongoDB collection.
 
@@ -104,25 +120,93 @@ class MongoController:
             projection (dict, optional): Fields to include or exclude.
             sort (tuple, optional): A tuple specifying the field and order to sort the results by. Defaults to None.
             limit (int, optional): The maximum number of documents to return. Defaults to 0 (no limit).
-            _datatype (str, optional): The format of the returned data. Can be "df" for a pandas DataFrame or "cursor" for a MongoDB cursor. Defaults to "df".
+            _datatype (str, optional): The format of the returned data. Can be "df" for a pandas DataFrame, "cursor" for
+                a MongoDB cursor or "chunks" for a generator of pandas DataFrames. Defaults to "df".
+            chunk_size (int, optional): Number of rows per DataFrame when _datatype is "chunks". Defaults to 10000.
+            batch_size (int, optional): Number of documents the server returns per cursor round trip. Defaults to
+                None (server default). When _datatype is "chunks" it defaults to chunk_size.
+            dtypes (dict, optional): Mapping of column name to dtype. When _datatype is "chunks", only these columns
+                are extracted from each document (dotted names reach into sub-documents) and cast to the given type.
 
         Returns:
-            dict or pandas.DataFrame or pymongo.cursor.Cursor:
+            dict or pandas.DataFrame or pymongo.cursor.Cursor or generator:
                 If _mode is "one", returns a single document (dict).
                 If _mode is "all" and _datatype is "df", returns a pandas DataFrame.
                 If _mode is "all" and _datatype is "cursor", returns a MongoDB cursor.
+                If _mode is "all" and _datatype is "chunks", returns a generator of pandas DataFrames with at most
+                chunk_size rows each.
         """
         if _filter is None:
             _filter = dict()
         if _mode == "one":
             return self.db[collection].find_one(_filter, projection)
         else:  # _mode == "all"
+            if _datatype == "chunks" and projection is None and dtypes is not None:
+                # Only ask the server for the columns that will be extracted
+                projection = {column: 1 for column in dtypes}
             result_cursor = self.db[collection].find(_filter, projection).sort("timestamp", sort).limit(limit)
+            if _datatype == "chunks" and batch_size is None:
+                batch_size = chunk_size
+            if batch_size is not None:
+                result_cursor = result_cursor.batch_size(batch_size)
             if _datatype == "df":
                 return pd.DataFrame(list(result_cursor))
+            elif _datatype == "chunks":
+                return self._iterate_chunks(result_cursor, chunk_size=chunk_size, dtypes=dtypes)
             else:  # _datatype == "cursor"
                 return result_cursor
 
+    @staticmethod
+    def _iterate_chunks(cursor, chunk_size, dtypes=None):
+        """
+        Consume a cursor and yield its documents as DataFrames of at most chunk_size rows.
+
+        Only one chunk of raw documents is held in memory at a time. If dtypes is given, each chunk is built
+        column by column from the requested fields only, so heavy fields that were not asked for are never copied.
+
+        Args:
+            cursor (pymongo.cursor.Cursor): The cursor to consume.
+            chunk_size (int): Maximum number of rows per DataFrame.
+            dtypes (dict, optional): Mapping of column name to dtype.
+
+        Yields:
+            pandas.DataFrame: The next chunk of results.
+        """
+        batch = []
+        for document in cursor:
+            batch.append(document)
+            if len(batch) == chunk_size:
+                yield MongoController._build_chunk(batch, dtypes)
+                batch = []
+        if batch:
+            yield MongoController._build_chunk(batch, dtypes)
+
+    @staticmethod
+    def _build_chunk(documents, dtypes=None):
+        """
+        Build a DataFrame from a list of documents, optionally extracting and casting only the given columns.
+
+        Args:
+            documents (list): The documents of the chunk.
+            dtypes (dict, optional): Mapping of column name to dtype.
+
+        Returns:
+            pandas.DataFrame: The chunk as a DataFrame.
+        """
+        if dtypes is None:
+            return pd.DataFrame(documents)
+        columns = {}
+        for column, dtype in dtypes.items():
+            path = column.split(".")
+            values = []
+            for document in documents:
+                value = document
+                for key in path:
+                    value = value.get(key) if isinstance(value, dict) else None
+                values.append(value)
+            columns[column] = pd.Series(values).astype(dtype)
+        return pd.DataFrame(columns)
+
     def update_data(self, collection, _id, data):
         """
         Update a single document in a collection by its _id.
@@ -139,6 +223,23 @@ class MongoController:
             }
         )
 
+    def update_data_batch(self, collection, updates):
+        """
+        Update several documents of a collection by their _id in a single round trip.
+
+        Args:
+            collection (str): Name of the collection.
+            updates (list): (_id, data) pairs, data being the fields to update.
+        """
+        if not updates:
+            return
+        operations = [({"_id": _id}, {"$set": data}, False) for _id, data in updates]
+        if self.backend == "sqlite":
+            self.db[collection].bulk_update(operations)
+        else:
+            self.db[collection].bulk_write([UpdateOne(_filter, update, upsert=upsert)
+                                            for _filter, update, upsert in operations], ordered=False)
+
     def delete_data(self, collection, _id):
         """
         Delete a single document from a collection by its _id.
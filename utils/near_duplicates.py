@@ -0,0 +1,222 @@
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import Counter
+from datetime import timedelta
+
+from tqdm import tqdm
+
+from config import NEAR_DUPLICATE_MAX_DISTANCE, NEAR_DUPLICATE_WINDOW_DAYS
+from utils.mongo_controller import mongo_controller
+
+"""
+This module detects near-duplicate newspaper articles, such as the copies of a wire story republished by several
+outlets, so the LLM stages only run once per story.
+
+Each article gets a 64-bit SimHash of its content (word 3-gram shingles), stored as 16 hex digits in `simhash`.
+The hash is also split into four 16-bit bands stored in `simhash_bands`: two hashes within
+NEAR_DUPLICATE_MAX_DISTANCE (< 4) differing bits share at least one band, so candidates are found with an exact
+band lookup. An article whose hash is close to an earlier representative published within NEAR_DUPLICATE_WINDOW_DAYS
+gets `duplicate_of` set to the representative's _id; the LLM results of the representative are then copied to it.
+"""
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 10  # Shorter contents do not hash reliably and are never clustered
+PROPAGATED_FIELDS = ["first_stage_processed", "second_stage_processed", "hint_type", "quote", "human_approved",
+                     "exchange_rate"]
+
+cluster_lock = threading.Lock()
+
+
+def shingles(text):
+    """
+    Split a text into normalized word shingles: lowercase, without accents nor punctuation.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        Counter: The number of occurrences of each shingle.
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    words = re.findall(r"\w+", text)
+    return Counter(" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+
+
+def simhash(text):
+    """
+    Compute the SimHash of a text.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int or None: The 64-bit hash, or None if the text has fewer than MIN_SHINGLES shingles.
+    """
+    features = shingles(text or "")
+    if len(features) < MIN_SHINGLES:
+        return None
+    weights = [0] * SIMHASH_BITS
+    for feature, count in features.items():
+        feature_hash = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if feature_hash >> bit & 1 else -count
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if weights[bit] > 0)
+
+
+def hamming_distance(first, second):
+    """
+    Count the differing bits of two hashes.
+
+    Args:
+        first (int): The first hash.
+        second (int): The second hash.
+
+    Returns:
+        int: The Hamming distance.
+    """
+    return bin(first ^ second).count("1")
+
+
+def simhash_fields(content):
+    """
+    Compute the SimHash fields stored with an article.
+
+    Args:
+        content (str): The content of the article.
+
+    Returns:
+        dict: The "simhash" hex digest and its "simhash_bands" ({"b0": ..., "b3": ...}), both None if the content is
+            too short.
+    """
+    value = simhash(content)
+    if value is None:
+        return {"simhash": None, "simhash_bands": None}
+    digest = f"{value:016x}"
+    width = SIMHASH_BITS // SIMHASH_BANDS // 4
+    bands = {f"b{i}": digest[i * width:(i + 1) * width] for i in range(SIMHASH_BANDS)}
+    return {"simhash": digest, "simhash_bands": bands}
+
+
+def find_representative(fields, timestamp, exclude_id=None):
+    """
+    Find the representative of the cluster an article belongs to.
+
+    Args:
+        fields (dict): The SimHash fields of the article, from `simhash_fields`.
+        timestamp (datetime): The publication date of the article.
+        exclude_id (optional): The _id of the article itself, when it is already stored. Defaults to None.
+
+    Returns:
+        The _id of the closest representative published within NEAR_DUPLICATE_WINDOW_DAYS (the earliest one on
+            ties), or None if the article is not a near-duplicate.
+    """
+    if fields["simhash"] is None:
+        return None
+    window = timedelta(days=NEAR_DUPLICATE_WINDOW_DAYS)
+    candidates = mongo_controller.db["USD_BOB_Parallel"].find(
+        {
+            "timestamp": {"$gte": timestamp - window, "$lte": timestamp + window},
+            "duplicate_of": None,
+            "$or": [{f"simhash_bands.{band}": value} for band, value in fields["simhash_bands"].items()]
+        },
+        {"_id": 1, "timestamp": 1, "simhash": 1}
+    )
+    value = int(fields["simhash"], 16)
+    best = None
+    for candidate in candidates:
+        if candidate["_id"] == exclude_id or not candidate.get("simhash"):
+            continue
+        distance = hamming_distance(value, int(candidate["simhash"], 16))
+        if distance > NEAR_DUPLICATE_MAX_DISTANCE:
+            continue
+        key = (distance, candidate["timestamp"])
+        if best is None or key < best[0]:
+            best = (key, candidate["_id"])
+    return best[1] if best else None
+
+
+def save_article(data):
+    """
+    Store a new article in the USD_BOB_Parallel collection, clustered with its near-duplicates.
+
+    The lookup and the insertion happen under a lock, so two copies of a story crawled at the same time by
+    different sources do not both become representatives.
+
+    Args:
+        data (dict): The article document, with its "timestamp" and "content".
+
+    Returns:
+        The _id of the representative the article was attached to, or None if it is a representative itself.
+    """
+    fields = simhash_fields(data["content"])
+    with cluster_lock:
+        representative = find_representative(fields, data["timestamp"])
+        mongo_controller.save_data(collection="USD_BOB_Parallel",
+                                   data={**data, **fields, "duplicate_of": representative})
+    return representative
+
+
+def sync_duplicates():
+    """
+    Copy the LLM and review results of every representative to its near-duplicates.
+
+    Returns:
+        int: The number of duplicates updated.
+    """
+    collection = mongo_controller.db["USD_BOB_Parallel"]
+    projection = {"_id": 1, "duplicate_of": 1, **{field: 1 for field in PROPAGATED_FIELDS}}
+    duplicates = list(collection.find({"duplicate_of": {"$ne": None}}, projection))
+    if not duplicates:
+        return 0
+    representative_ids = list({duplicate["duplicate_of"] for duplicate in duplicates})
+    representatives = {representative["_id"]: representative
+                       for representative in collection.find({"_id": {"$in": representative_ids}}, projection)}
+    updated = 0
+    for duplicate in duplicates:
+        representative = representatives.get(duplicate["duplicate_of"])
+        if representative is None:
+            continue
+        data = {field: representative[field] for field in PROPAGATED_FIELDS
+                if field in representative and duplicate.get(field) != representative[field]}
+        if data:
+            mongo_controller.update_data(collection="USD_BOB_Parallel", _id=duplicate["_id"], data=data)
+            updated += 1
+    return updated
+
+
+def cluster_existing_articles():
+    """
+    Compute the SimHash of the stored articles that have none, oldest first, and cluster them.
+
+    Articles already sent through the LLM keep their own results and only become candidate representatives; the
+    pending ones are attached to a representative when they are near-duplicates.
+
+    Returns:
+        int: The number of articles attached to a representative.
+    """
+    print("\n[near_duplicates] Clustering stored articles...")
+    collection = mongo_controller.db["USD_BOB_Parallel"]
+    articles = list(collection.find({"simhash": {"$exists": False}},
+                                    {"_id": 1, "timestamp": 1, "content": 1, "first_stage_processed": 1}))
+    articles.sort(key=lambda article: article["timestamp"])
+    attached = 0
+    for article in tqdm(articles, unit="article"):
+        fields = simhash_fields(article.get("content"))
+        representative = None
+        if article.get("first_stage_processed") is False:
+            representative = find_representative(fields, article["timestamp"], exclude_id=article["_id"])
+        mongo_controller.update_data(collection="USD_BOB_Parallel", _id=article["_id"],
+                                     data={**fields, "duplicate_of": representative})
+        attached += representative is not None
+    print(f"[near_duplicates] Attached {attached}/{len(articles)} articles to a representative.")
+    return attached
+
+
+if __name__ == "__main__":
+    cluster_existing_articles()
+    print(f"[near_duplicates] Synced {sync_duplicates()} duplicates.")
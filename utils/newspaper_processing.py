@@ -1,15 +1,19 @@
 from datetime import datetime, timedelta
 
-from tqdm import tqdm
-
 from config import DBCONFIG, AI_MODE
+from utils.article_classifier import classify_articles
+from utils.article_prefilter import prefilter_articles
+from utils.llm_cache import llm_cache
+from utils.llm_executor import run_llm_pipeline, run_llm_stage
 from utils.llm_processing import LLMProcessing
 from utils.mongo_controller import mongo_controller
-from utils.scrapers.newspapers.scraper_master import scraper_master
+from utils.near_duplicates import sync_duplicates
+from utils.quote_rules import apply_quote_rules, rule_update
+from utils.scrapers.newspapers.crawl_executor import crawl_sources
+from utils.scrapers.newspapers.sources import NEWSPAPER_SOURCES
 from utils.services import highlight_numbers
 
-newspapers = ["el_deber", "el_diario", "los_tiempos", "red_uno", "economy", "ahoradigital", "oxigeno", "opinion",
-              "fides", "erbol", "brujula"]
+newspapers = list(NEWSPAPER_SOURCES)
 
 
 def newspaper_scraper(debug=False):
@@ -18,15 +22,18 @@ def newspaper_scraper(debug=False):
 
     - For each newspaper in the `newspapers` list:
         - If the initial complete scrape is required (`from_zero` is True), performs a full scrape from a fixed start date.
-        - If a partial scrape is required (`from_zero` is "partial"), resumes scraping from the same fixed start date.
+        - If a partial scrape is required (`from_zero` is "partial"), resumes scraping towards the same fixed start
+          date, from the source's crawl checkpoint.
         - Otherwise, performs a regular update by determining the latest timestamp in the database and scraping new data since then.
     - Updates the configuration state after an initial complete scrape.
-    - Calls `scraper_master` for each newspaper with the appropriate timestamp limit.
+    - Crawls all newspapers concurrently through `crawl_sources`, which calls `scraper_master` for each of them
+      with the appropriate timestamp limit.
 
     Args:
         debug (bool): If True, enables debug mode for the scraper.
     """
     initial_complete_scrape = DBCONFIG.get_config(setting="newspaper_initial_complete_scrape")
+    jobs = {}
     for newspaper in newspapers:
         from_zero = initial_complete_scrape.get(newspaper, True)
         if from_zero is True:  # Initial complete scrape
@@ -45,62 +52,115 @@ def newspaper_scraper(debug=False):
                                                           limit=10)
             timestamp_limit = timestamp_limit["timestamp"].max() - timedelta(days=2)
             print(f"Timestamp Limit: {timestamp_limit}")
-        scraper_master(source=newspaper, timestamp_limit=timestamp_limit, debug=debug)
+        jobs[newspaper] = timestamp_limit
+    crawl_sources(jobs, debug=debug)
 
 
 def newspaper_llm_processing():
     """
     Processes newspaper articles in two LLM stages:
 
+    Only the representative of each cluster of near-duplicate articles goes through the LLM; its results are
+    copied to the other articles of the cluster by `sync_duplicates` once both stages are done.
+
     1. First-stage processing:
         - Fetches articles from the 'USD_BOB_Parallel' collection that have not been processed in the first stage.
+        - Marks the articles rejected by the lexical prefilter as processed, without an LLM call.
+        - Lets the trained classifier decide the articles outside its uncertainty band, without an LLM call.
         - For each article, uses LLMProcessing to detect relevant information.
         - Updates the article as first-stage processed and sets the second-stage flag based on detection result.
 
     2. Second-stage processing:
-        - Fetches articles that have not been processed in the second stage.
-        - For each article, uses LLMProcessing to extract 'hint_type' and 'quote'.
+        - Takes the articles flagged by the first stage as they are detected, plus those flagged in earlier runs.
+        - Fills 'hint_type' and 'quote' with the rule-based extractor when it finds a single unambiguous quote.
+        - For each remaining article, uses LLMProcessing to extract 'hint_type' and 'quote'.
         - Updates the article as second-stage processed and stores the extracted information.
 
-    Prints progress and summary information for both stages.
+    When LLM_COMBINED_MAX_TOKENS is set, articles short enough for `LLMProcessing.use_combined` go through both stages
+    in a single combined call first (off by default: it sends irrelevant articles to the extraction model too).
+    The other ones run both stages as a pipeline through `run_llm_pipeline`, with the model residency policy of
+    LLM_MODEL_RESIDENCY. Updates are written in batches. Prints progress and summary information for both stages.
     """
-    print("\n[newspaper_processing] Starting newspaper LLM first-stage processing...")
-    total_processed_articles = 0
-    articles = mongo_controller.query_data(_mode="all", collection="USD_BOB_Parallel",
-                                           _filter={"first_stage_processed": False}, sort=1)
+    print("\n[newspaper_processing] Starting newspaper LLM processing...")
+    detect_articles = mongo_controller.query_data(_mode="all", collection="USD_BOB_Parallel",
+                                                  _filter={"first_stage_processed": False, "duplicate_of": None},
+                                                  sort=1)
+    detect_articles = prefilter_articles(detect_articles)
+    detect_articles = classify_articles(detect_articles)
+    extract_articles = mongo_controller.query_data(_mode="all", collection="USD_BOB_Parallel",
+                                                   _filter={"second_stage_processed": False, "duplicate_of": None},
+                                                   sort=1)
+    extract_articles = apply_quote_rules(extract_articles)
+    print(f"[newspaper_processing] {len(detect_articles)} articles to detect, {len(extract_articles)} flagged articles "
+          f"to extract.")
     llm_processing = LLMProcessing(mode=AI_MODE)
-    for idx, article in tqdm(articles.iterrows(), total=len(articles), unit="article", desc="Analyzing articles"):
-        result = llm_processing.process_article(article=article, _mode="detect")
-        # print(f"Result: {result}")
-        if result is True:
-            second_stage = False
-        else:
-            second_stage = None
-        mongo_controller.update_data(collection="USD_BOB_Parallel",
-                                     _id=article["_id"],
-                                     data={"first_stage_processed": True, "second_stage_processed": second_stage})
-    if len(articles) > 0:
-        print(f"[newspaper_processing] Successfully processed {len(articles)} articles in the first stage.")
-    else:
-        print("[newspaper_processing] No new articles to process in the first stage.")
-    total_processed_articles += len(articles)
-    print("\n[newspaper_processing] Starting newspaper LLM second-stage processing...")
-    articles = mongo_controller.query_data(_mode="all", collection="USD_BOB_Parallel",
-                                           _filter={"second_stage_processed": False}, sort=1)
-    for idx, article in tqdm(articles.iterrows(), total=len(articles), unit="article", desc="Analyzing articles"):
-        hint_type, quote = llm_processing.process_article(article=article, _mode="extract")
-        mongo_controller.update_data(collection="USD_BOB_Parallel",
-                                     _id=article["_id"],
-                                     data={"second_stage_processed": True,
-                                           "hint_type": hint_type,
-                                           "quote": quote,
-                                           "human_approved": None})
-    if len(articles) > 0:
-        print(f"[newspaper_processing] Successfully processed {len(articles)} articles in the second stage.")
-    else:
-        print("[newspaper_processing] No new articles to process in the second stage.")
-    total_processed_articles += len(articles)
+    combined_articles = detect_articles.iloc[0:0]
+    if not detect_articles.empty:
+        short = detect_articles.apply(llm_processing.use_combined, axis=1)
+        combined_articles, detect_articles = detect_articles[short], detect_articles[~short]
+    processed_combined = 0
+    if not combined_articles.empty:
+        print(f"[newspaper_processing] {len(combined_articles)} short articles go through a single combined call.")
+        processed_combined = run_llm_stage(llm_processing, combined_articles, "combined", combined_update)
+    processed = run_llm_pipeline(llm_processing, detect_articles, extract_articles, detection_update,
+                                 extraction_update, rule_update=rule_update)
+    print(f"[newspaper_processing] Successfully processed {processed_combined}/{len(combined_articles)} articles in "
+          f"a combined call, {processed['detect']}/{len(detect_articles)} in the first stage and "
+          f"{processed['extract']} in the second stage ({processed['rules']} more quotes extracted by the rules).")
+    total_processed_articles = processed_combined + processed["detect"] + processed["extract"] + processed["rules"]
     print(f"\n[newspaper_processing] Processed {total_processed_articles} articles in total.")
+    for stage, stats in llm_cache.stats().items():
+        print(f"[newspaper_processing] LLM cache ({stage}): {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate).")
+    for stage, stats in llm_processing.call_stats().items():
+        print(f"[newspaper_processing] LLM calls ({stage}): {stats['calls_per_article']:.2f} per article, "
+              f"{stats['correction_rate']:.1%} correction rounds, {stats['failure_rate']:.1%} parse failures.")
+    print(f"[newspaper_processing] Copied the results to {sync_duplicates()} near-duplicate articles.")
+
+
+def detection_update(result):
+    """
+    Build the first-stage update of an article from its detection result.
+
+    Args:
+        result (bool): Whether the article mentions the parallel exchange rate.
+
+    Returns:
+        dict: The fields to set on the article.
+    """
+    return {"first_stage_processed": True, "second_stage_processed": False if result is True else None,
+            "detected_by": "llm"}
+
+
+def extraction_update(result):
+    """
+    Build the second-stage update of an article from its extraction result.
+
+    Args:
+        result (tuple or None): The (hint_type, quote) pair, or None if the extraction failed.
+
+    Returns:
+        dict: The fields to set on the article.
+    """
+    hint_type, quote = result if result is not None else (None, None)
+    return {"second_stage_processed": True, "hint_type": hint_type, "quote": quote, "human_approved": None,
+            "extracted_by": "llm"}
+
+
+def combined_update(result):
+    """
+    Build the update of an article from its combined detection and extraction result.
+
+    Args:
+        result (tuple or None): The (detected, hint_type, quote) triple, or None if the answer failed, which is
+            handled as a rejection, like a failed detection.
+
+    Returns:
+        dict: The fields to set on the article.
+    """
+    if result is None or result[0] is not True:
+        return detection_update(False)
+    return {**detection_update(True), **extraction_update(result[1:])}
 
 
 def newspaper_reviewing():
@@ -108,7 +168,8 @@ def newspaper_reviewing():
             Allows manual review and approval of newspaper articles processed by the LLM.
 
             - Fetches articles from the 'USD_BOB_Parallel' collection that have completed second-stage processing
-              but have not yet been human approved.
+              but have not yet been human approved. Near-duplicates are skipped and receive the decision on their
+              representative.
             - Iterates through each article, displaying its content and extracted information.
             - Every 10 articles, prompts the user to continue or stop reviewing.
             - For each article, the user can:
@@ -125,7 +186,8 @@ def newspaper_reviewing():
             """
             print("\n[newspaper_processing] Starting manual newspaper review...")
             articles = mongo_controller.query_data(_mode="all", collection="USD_BOB_Parallel",
-                                                   _filter={"second_stage_processed": True, "human_approved": None}, sort=1)
+                                                   _filter={"second_stage_processed": True, "human_approved": None,
+                                                            "duplicate_of": None}, sort=1)
             total_articles = len(articles)
             print(f"[newspaper_processing] Found {total_articles} articles to review.")
             counter = 0
@@ -145,6 +207,8 @@ def newspaper_reviewing():
                 print("\n-----")
                 print(f"Hint Type: {article['hint_type']}")
                 print(f"Quote: {article['quote']}")
+                if article.get('extracted_by', None) == "rules":
+                    print(f"Extracted by the rules ({article['quote_confidence']} confidence)")
                 if article.get('exchange_rate', None):
                     print(f"Previously found exchange rate: {article['exchange_rate']}")
                 while True:
@@ -173,6 +237,7 @@ def newspaper_reviewing():
                         print("Invalid input. Please try again.")
             if total_articles > 0:
                 print(f"\n[newspaper_processing] Reviewed {counter}/{len(articles)} articles.")
+                sync_duplicates()
 
 
 if __name__ == "__main__":
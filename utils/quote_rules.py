@@ -0,0 +1,237 @@
+import re
+
+from config import PREFILTER_RATE_RANGE, QUOTE_RULES_MIN_CONFIDENCE
+from utils.article_prefilter import normalize_text
+from utils.mongo_controller import mongo_controller
+
+"""
+This module contains the deterministic quote extractor run before the extraction LLM. Many relevant articles state
+the parallel rate in stock phrases such as "Bs 13,50", "a 14 bolivianos" or "por encima de los Bs 10"; those are
+read with rules instead of a model call.
+
+Bs amounts within PREFILTER_RATE_RANGE (digits with a comma or dot decimal, or Spanish number words) are collected
+from the title and content, with the cue words before them ("por encima de", "menos de", "alrededor de"...) giving
+the hint type. Only the amounts close to a mention of the parallel market count: in the same sentence gives a "high"
+confidence, within PROXIMITY_CHARS a "low" one. The quote is used only when all of them agree on a single
+(hint_type, quote) pair; ranges, several quotes and official rates are left to the LLM. Run this module to print the
+agreement of the rules with the human approved quotes.
+"""
+
+PROXIMITY_CHARS = 150  # Distance to a parallel market mention within which an amount is a "low" confidence candidate
+QUOTE_TOLERANCE = 0.005  # Bs; a rule quote within it of the reviewed one agrees with it
+OFFICIAL_RATES = (6.86, 6.96)  # The official buy and sell rates, never taken as a parallel quote
+CONFIDENCE_LEVELS = {"high": 2, "low": 1}
+
+UNITS = ["cero", "uno", "dos", "tres", "cuatro", "cinco", "seis", "siete", "ocho", "nueve", "diez", "once", "doce",
+         "trece", "catorce", "quince", "dieciseis", "diecisiete", "dieciocho", "diecinueve", "veinte", "veintiuno",
+         "veintidos", "veintitres", "veinticuatro", "veinticinco", "veintiseis", "veintisiete", "veintiocho",
+         "veintinueve", "treinta"]
+NUMBER_WORDS = {**{word: value for value, word in enumerate(UNITS)}, "un": 1, "veintiun": 21,
+                **{f"veinte y {UNITS[value]}": 20 + value for value in range(1, 10)}}
+TENS = {"treinta": 30, "cuarenta": 40, "cincuenta": 50, "sesenta": 60, "setenta": 70, "ochenta": 80, "noventa": 90}
+CENTS_WORDS = {**NUMBER_WORDS, **TENS,
+               **{f"{tens} y {UNITS[value]}": TENS[tens] + value for tens in TENS for value in range(1, 10)}}
+NUMBER_WORD = "|".join(sorted(map(re.escape, NUMBER_WORDS), key=len, reverse=True))
+CENTS_WORD = "|".join(sorted(map(re.escape, CENTS_WORDS), key=len, reverse=True))
+DIGITS = r"\d{1,2}(?:[.,]\d{1,2})?"
+AMOUNT = rf"(?P<number>{DIGITS})|(?P<words>(?:{NUMBER_WORD})(?: con (?:\d{{1,2}}|{CENTS_WORD})(?: centavos)?)?)"
+AMOUNT_PATTERN = re.compile(rf"\bbs\.?\s*(?:{AMOUNT})(?![.,]?\d)\b|"
+                            rf"(?<!\d[.,])\b(?:{AMOUNT.replace('?P<', '?P<after_')})\s*(?:bs\b|bolivianos\b)")
+UNIT_SUFFIX = re.compile(r"\s*(?:mil\b|millones\b|%|por ciento\b)")
+PARALLEL_PATTERN = re.compile(r"\bparalelo\b|\bmercado (?:negro|informal)\b|\bdolar blue\b|\b(?:libre)?cambistas?\b|"
+                              r"\busdt\b|\bbinance\b|\bp2p\b")
+OFFICIAL_PATTERN = re.compile(r"\boficial\b|\bbanco central\b|\bbcb\b")
+ARTICLES = r"(?:\s+(?:de|a|los|las|el|la|unos|unas))*\s*(?:bs\.?\s*)?$"
+HINT_CUES = [
+    (re.compile(rf"(?:por encima|arriba|mas alla) de{ARTICLES}|\b(?:mas|mayor(?:es)?) de{ARTICLES}|"
+                rf"\bsuper(?:a|an|aba|aban|o|aron|ior(?:es)?)\b{ARTICLES}|\bsobre{ARTICLES}"), "above"),
+    (re.compile(rf"(?:por )?debajo de{ARTICLES}|\b(?:menos|menor(?:es)?) de{ARTICLES}|\binferior(?:es)? a{ARTICLES}"),
+     "below"),
+    (re.compile(rf"\b(?:alrededor|cerca|en torno) (?:de|a){ARTICLES}|\b(?:aproximadamente|casi|unos|unas|"
+                rf"aprox\.?){ARTICLES}"), None)
+]
+SENTENCE_BREAK = re.compile(r"(?<=[.!?;])\s+(?!\d)|\n+")
+
+
+def parse_amount(match, prefix=""):
+    """
+    Read the Bs amount of a match of AMOUNT_PATTERN.
+
+    Args:
+        match (re.Match): The match.
+        prefix (str, optional): "" for amounts written after "Bs", "after_" for amounts followed by the currency.
+
+    Returns:
+        float: The amount.
+    """
+    number = match.group(f"{prefix}number")
+    if number is not None:
+        return float(number.replace(",", "."))
+    words = match.group(f"{prefix}words").split(" con ")
+    cents = 0
+    if len(words) > 1:
+        cents = words[1].replace(" centavos", "")
+        cents = int(cents) if cents.isdigit() else CENTS_WORDS[cents]
+    return NUMBER_WORDS[words[0]] + cents / 100
+
+
+def hint_of(prefix):
+    """
+    Read the hint type given by the cue words right before an amount.
+
+    Args:
+        prefix (str): The normalized text before the amount.
+
+    Returns:
+        str or None: "above", "below", "exact", or None for an estimate.
+    """
+    for pattern, hint_type in HINT_CUES:
+        if pattern.search(prefix):
+            return hint_type
+    return "exact"
+
+
+def find_candidates(text):
+    """
+    Collect the parallel rate candidates of a text.
+
+    Args:
+        text (str): The title and content of an article.
+
+    Returns:
+        list: The (hint_type, quote, confidence) triple of each plausible Bs amount close to a parallel market
+            mention, plus a (None, None, None) entry for every plausible amount far from any mention.
+    """
+    text = normalize_text(text)
+    mentions = [match.start() for match in PARALLEL_PATTERN.finditer(text)]
+    sentences = []
+    start = 0
+    for separator in SENTENCE_BREAK.finditer(text):
+        sentences.append((start, separator.start()))
+        start = separator.end()
+    sentences.append((start, len(text)))
+    candidates = []
+    for match in AMOUNT_PATTERN.finditer(text):
+        prefix = "" if match.group("number") is not None or match.group("words") is not None else "after_"
+        quote = parse_amount(match, prefix)
+        if not PREFILTER_RATE_RANGE[0] <= quote <= PREFILTER_RATE_RANGE[1] or quote in OFFICIAL_RATES:
+            continue
+        if UNIT_SUFFIX.match(text, match.end()):
+            continue
+        sentence_start, sentence_end = next((start, end) for start, end in sentences if end >= match.start())
+        sentence = text[sentence_start:sentence_end]
+        if PARALLEL_PATTERN.search(sentence):
+            confidence = "high"
+        elif OFFICIAL_PATTERN.search(sentence):
+            continue
+        elif any(abs(mention - match.start()) <= PROXIMITY_CHARS for mention in mentions):
+            confidence = "low"
+        else:
+            candidates.append((None, None, None))
+            continue
+        hint_type = hint_of(text[max(sentence_start, match.start() - 40):match.start()])
+        candidates.append((hint_type, round(quote, 2), confidence))
+    return candidates
+
+
+def extract_quote(article):
+    """
+    Extract the parallel rate of an article with the rules.
+
+    Args:
+        article (dict or pandas.Series): The article, with its title and content.
+
+    Returns:
+        tuple or None: The (hint_type, quote, confidence) triple if every candidate agrees on a single quote, or
+            None if there is no candidate or they are ambiguous. The confidence is "high" only if every candidate is
+            in a sentence mentioning the parallel market.
+    """
+    parts = [article.get(field) for field in ("title", "content")]
+    candidates = find_candidates("\n".join(part for part in parts if isinstance(part, str)))
+    quotes = {(hint_type, quote) for hint_type, quote, confidence in candidates if confidence is not None}
+    if len(quotes) != 1:
+        return None
+    hint_type, quote = quotes.pop()
+    confidence = "high" if all(candidate[2] == "high" for candidate in candidates) else "low"
+    return hint_type, quote, confidence
+
+
+def rule_update(article, min_confidence=QUOTE_RULES_MIN_CONFIDENCE):
+    """
+    Build the second-stage update of an article from the rules, if they are confident enough.
+
+    Args:
+        article (dict or pandas.Series): The article flagged by the detection stage.
+        min_confidence (str, optional): "high", "low", or None to disable the rules. Defaults to
+            QUOTE_RULES_MIN_CONFIDENCE.
+
+    Returns:
+        dict or None: The fields to set on the article, or None if it needs the extraction LLM.
+    """
+    if min_confidence is None:
+        return None
+    result = extract_quote(article)
+    if result is None or CONFIDENCE_LEVELS[result[2]] < CONFIDENCE_LEVELS[min_confidence]:
+        return None
+    hint_type, quote, confidence = result
+    return {"second_stage_processed": True, "hint_type": hint_type, "quote": quote, "human_approved": None,
+            "extracted_by": "rules", "quote_confidence": confidence}
+
+
+def apply_quote_rules(articles, min_confidence=QUOTE_RULES_MIN_CONFIDENCE):
+    """
+    Extract the quote of the flagged articles the rules are sure about.
+
+    Args:
+        articles (pandas.DataFrame): The articles waiting for the extraction stage.
+        min_confidence (str, optional): "high", "low", or None to disable the rules. Defaults to
+            QUOTE_RULES_MIN_CONFIDENCE.
+
+    Returns:
+        pandas.DataFrame: The articles that still need the extraction LLM.
+    """
+    if articles.empty or min_confidence is None:
+        return articles
+    remaining = []
+    updates = []
+    for _, article in articles.iterrows():
+        update = rule_update(article, min_confidence)
+        remaining.append(update is None)
+        if update is not None:
+            updates.append((article["_id"], update))
+    mongo_controller.update_data_batch(collection="USD_BOB_Parallel", updates=updates)
+    print(f"[quote_rules] Extracted {len(updates)}/{len(articles)} quotes without an LLM call.")
+    return articles[remaining]
+
+
+def agreement_report():
+    """
+    Print how often the rules agree with the quotes of the human approved articles, by confidence.
+
+    Returns:
+        dict: Per confidence, the number of articles resolved by the rules and how many agree with the review.
+    """
+    articles = list(mongo_controller.db["USD_BOB_Parallel"].find(
+        {"human_approved": True, "duplicate_of": None}, {"title": 1, "content": 1, "quote": 1, "hint_type": 1}))
+    if not articles:
+        print("[quote_rules] No human approved articles to compare the rules with.")
+        return {}
+    report = {confidence: {"resolved": 0, "agreeing": 0} for confidence in CONFIDENCE_LEVELS}
+    for article in articles:
+        result = extract_quote(article)
+        if result is None:
+            continue
+        hint_type, quote, confidence = result
+        report[confidence]["resolved"] += 1
+        report[confidence]["agreeing"] += int(article.get("quote") is not None and hint_type == article["hint_type"]
+                                              and abs(quote - article["quote"]) <= QUOTE_TOLERANCE)
+    print(f"\n[quote_rules] Measured on {len(articles)} human approved articles:")
+    for confidence, counts in report.items():
+        agreement = counts["agreeing"] / counts["resolved"] if counts["resolved"] else 0.0
+        print(f"[quote_rules] {confidence:>4} confidence: {counts['resolved']} resolved "
+              f"({counts['resolved'] / len(articles):.1%} of the articles), {agreement:.1%} agree with the review.")
+    return report
+
+
+if __name__ == "__main__":
+    agreement_report()
@@ -0,0 +1,274 @@
+import gzip
+import os
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytz
+from bson import json_util
+
+from config import ARCHIVE_DIR, RETENTION_POLICY
+from utils.mongo_controller import mongo_controller
+
+"""
+This module contains the retention subsystem for the tick collections.
+
+Each collection in config.RETENTION_POLICY can define the following tiers:
+    - archive_after_days: documents older than this are written to a compressed archive under ARCHIVE_DIR and then
+      removed from the database (used for the raw order books).
+    - rollup_collection: hourly rollups of the numeric metrics are materialised into this collection and kept forever.
+    - expire_after_days: documents older than this are removed from the database, once their hours are rolled up.
+"""
+
+ROLLUP_METRICS = ["sell_vwap", "buy_vwap", "spread", "sell_volume", "buy_volume"]
+LA_PAZ_TZ = pytz.timezone("America/La_Paz")
+
+
+def apply_retention():
+    """
+    Materialise the hourly rollups and expire or archive old data for every collection with a retention policy.
+
+    Rollups are always materialised before any tick is expired, so the hourly series never has gaps.
+
+    Returns:
+        int: 0 when the retention policy has been applied.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for collection, policy in RETENTION_POLICY.items():
+        if policy.get("rollup_collection"):
+            inserted = materialise_hourly_rollups(collection, policy["rollup_collection"], until=now)
+            print(f"[retention] Materialised {inserted} hourly rollups for {collection}.")
+        if policy.get("archive_after_days") is not None:
+            cutoff = now - timedelta(days=policy["archive_after_days"])
+            archived = archive_and_expire(collection, cutoff)
+            print(f"[retention] Archived and removed {archived} documents older than {cutoff:%Y-%m-%d} "
+                  f"from {collection}.")
+        if policy.get("expire_after_days") is not None:
+            cutoff = now - timedelta(days=policy["expire_after_days"])
+            expired = expire_rolled_up_ticks(collection, cutoff)
+            print(f"[retention] Removed {expired} ticks older than {cutoff:%Y-%m-%d} from {collection}.")
+    return 0
+
+
+def materialise_hourly_rollups(collection, rollup_collection, until):
+    """
+    Compute hourly averages of the tick metrics for every complete hour not yet rolled up.
+
+    Ticks are streamed in chunks, and per-hour sums and counts are accumulated, so memory stays bounded. Each
+    rollup stores the unrounded sum ("<metric>_sum") and number of values ("<metric>_n") of every metric, and the
+    number of ticks it summarises in "count", so rollups can be merged with ticks exactly.
+
+    Args:
+        collection (str): The tick collection.
+        rollup_collection (str): The collection that holds the hourly rollups.
+        until (datetime): Naive UTC datetime; only hours ending before it are rolled up.
+
+    Returns:
+        int: The number of rollup documents inserted.
+    """
+    last_rollup = mongo_controller.query_data(_mode="all", collection=rollup_collection,
+                                              projection={"timestamp": 1}, sort=-1, limit=1, _datatype="cursor")
+    last_rollup = list(last_rollup)
+    end_hour = until.replace(minute=0, second=0, microsecond=0)
+    time_filter = {"$lt": end_hour}
+    if last_rollup:
+        time_filter["$gte"] = last_rollup[0]["timestamp"] + timedelta(hours=1)
+    dtypes = {"timestamp": "datetime64[ns]"}
+    dtypes.update({metric: "float64" for metric in ROLLUP_METRICS})
+    partials = [hourly_stats(chunk) for chunk in mongo_controller.query_data(_mode="all", collection=collection,
+                                                                             _filter={"timestamp": time_filter},
+                                                                             sort=1, _datatype="chunks",
+                                                                             dtypes=dtypes)]
+    if not partials:
+        return 0
+    totals = pd.concat(partials).groupby(level=0).sum(min_count=1)
+    rollups = []
+    for hour, row in totals.iterrows():
+        rollup = {"timestamp": hour.to_pydatetime(), "count": int(row["count"])}
+        for metric in ROLLUP_METRICS:
+            has_values = row[f"{metric}_n"] > 0
+            rollup[metric] = float(row[f"{metric}_sum"] / row[f"{metric}_n"]) if has_values else None
+            rollup[f"{metric}_sum"] = float(row[f"{metric}_sum"]) if has_values else None
+            rollup[f"{metric}_n"] = int(row[f"{metric}_n"])
+        rollups.append(rollup)
+    mongo_controller.db[rollup_collection].insert_many(rollups)
+    return len(rollups)
+
+
+def archive_and_expire(collection, cutoff):
+    """
+    Write every document older than the cutoff to a gzip-compressed JSON-lines archive, then remove it.
+
+    One archive file is written per day, under ARCHIVE_DIR/<collection>/<YYYY-MM-DD>.jsonl.gz. A day is removed
+    from the database only once its archive has been fully written and renamed into place.
+
+    Args:
+        collection (str): The collection to archive.
+        cutoff (datetime): Naive UTC datetime; older documents are archived.
+
+    Returns:
+        int: The number of documents archived.
+    """
+    oldest = list(mongo_controller.query_data(_mode="all", collection=collection, projection={"timestamp": 1},
+                                              sort=1, limit=1, _datatype="cursor"))
+    if not oldest:
+        return 0
+    archive_dir = ARCHIVE_DIR / collection
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = 0
+    day_start = oldest[0]["timestamp"].replace(hour=0, minute=0, second=0, microsecond=0)
+    while day_start < cutoff:
+        day_filter = {"timestamp": {"$gte": day_start, "$lt": min(day_start + timedelta(days=1), cutoff)}}
+        archive_path = archive_dir / f"{day_start:%Y-%m-%d}.jsonl.gz"
+        temp_path = archive_path.with_suffix(".tmp")
+        documents = 0
+        # Append mode keeps what an earlier run already archived for a partially expired day
+        if archive_path.exists():
+            os.replace(archive_path, temp_path)
+        with gzip.open(temp_path, "at", encoding="utf-8") as archive_file:
+            for document in mongo_controller.query_data(_mode="all", collection=collection, _filter=day_filter,
+                                                        sort=1, _datatype="cursor", batch_size=500):
+                archive_file.write(json_util.dumps(document) + "\n")
+                documents += 1
+        os.replace(temp_path, archive_path)
+        if documents:
+            mongo_controller.db[collection].delete_many(day_filter)
+            archived += documents
+        day_start += timedelta(days=1)
+    return archived
+
+
+def la_paz_midnight(moment):
+    """
+    Floor a naive UTC datetime to the start of its day in La Paz.
+
+    Args:
+        moment (datetime): Naive UTC datetime.
+
+    Returns:
+        datetime: The naive UTC datetime of the La Paz midnight at or before it.
+    """
+    local = moment.replace(tzinfo=timezone.utc).astimezone(LA_PAZ_TZ)
+    midnight = LA_PAZ_TZ.localize(datetime(local.year, local.month, local.day))
+    return midnight.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def expire_rolled_up_ticks(collection, cutoff):
+    """
+    Remove ticks older than the cutoff, as long as they are covered by the hourly rollups.
+
+    The cutoff is floored to a La Paz midnight, so a day is either fully expired or fully kept, and days are never
+    averaged over part of their ticks.
+
+    Ticks that still embed their order book (pre-split schema) are never expired here, so the raw data cannot be
+    lost before `migrate_binance_books` has moved it.
+
+    Args:
+        collection (str): The tick collection.
+        cutoff (datetime): Naive UTC datetime; older ticks are removed.
+
+    Returns:
+        int: The number of ticks removed.
+    """
+    rollup_collection = RETENTION_POLICY[collection].get("rollup_collection")
+    if rollup_collection:
+        last_rollup = list(mongo_controller.query_data(_mode="all", collection=rollup_collection,
+                                                       projection={"timestamp": 1}, sort=-1, limit=1,
+                                                       _datatype="cursor"))
+        if not last_rollup:
+            return 0
+        cutoff = min(cutoff, last_rollup[0]["timestamp"] + timedelta(hours=1))
+    cutoff = la_paz_midnight(cutoff)
+    legacy = mongo_controller.db[collection].count_documents({"timestamp": {"$lt": cutoff},
+                                                              "sell_raw_data": {"$exists": True}})
+    if legacy:
+        print(f"[retention] {legacy} ticks in {collection} still embed their order book and were kept. "
+              f"Run migrate_binance_books first.")
+    result = mongo_controller.db[collection].delete_many({"timestamp": {"$lt": cutoff},
+                                                          "sell_raw_data": {"$exists": False}})
+    return result.deleted_count
+
+
+def hourly_stats(ticks):
+    """
+    Compute the per-hour sums and counts of the tick metrics.
+
+    Args:
+        ticks (pandas.DataFrame): Ticks with a naive UTC "timestamp" column.
+
+    Returns:
+        pandas.DataFrame: One row per hour, with "<metric>_sum", "<metric>_n" and "count" columns.
+    """
+    hours = ticks["timestamp"].dt.floor("h")
+    grouped = ticks.groupby(hours)
+    stats = pd.DataFrame({"count": grouped.size()})
+    for metric in ROLLUP_METRICS:
+        if metric in ticks.columns:
+            stats[f"{metric}_sum"] = grouped[metric].sum(min_count=1)
+            stats[f"{metric}_n"] = grouped[metric].count()
+        else:
+            stats[f"{metric}_sum"] = float("nan")
+            stats[f"{metric}_n"] = 0
+    return stats
+
+
+def rollup_stats(rollups):
+    """
+    Read the per-hour sums and counts of hourly rollup documents.
+
+    Rollups written before sums were stored only hold their (rounded) means, which are re-weighted by "count".
+
+    Args:
+        rollups (pandas.DataFrame): The rollup documents.
+
+    Returns:
+        pandas.DataFrame: One row per hour, with "<metric>_sum", "<metric>_n" and "count" columns.
+    """
+    stats = pd.DataFrame({"count": rollups["count"].to_numpy()}, index=pd.DatetimeIndex(rollups["timestamp"]))
+    missing = pd.Series(float("nan"), index=rollups.index)
+    for metric in ROLLUP_METRICS:
+        means = rollups.get(metric, missing)
+        counts = rollups.get(f"{metric}_n", missing)
+        legacy = counts.isna()
+        sums = rollups.get(f"{metric}_sum", missing)
+        stats[f"{metric}_sum"] = sums.where(~legacy, means * rollups["count"]).to_numpy()
+        stats[f"{metric}_n"] = counts.where(~legacy, rollups["count"].where(means.notna(), 0)).to_numpy()
+    return stats
+
+
+def tick_averages(collection, start, end):
+    """
+    Average the tick metrics of a time range, merging the hourly rollups of the hours whose ticks were expired.
+
+    For every hour, the rollup is used instead of the stored ticks when it covers more ticks than are still
+    stored, so a range spanning the expiry cutoff averages exactly the same ticks as before they were expired.
+
+    Args:
+        collection (str): The tick collection.
+        start (datetime): Start of the range (inclusive).
+        end (datetime): End of the range (exclusive).
+
+    Returns:
+        dict: The number of ticks covered under "count", and the mean of each metric of ROLLUP_METRICS (None when
+            no tick has it).
+    """
+    ticks = mongo_controller.query_data(_mode="all", collection=collection,
+                                        _filter={"timestamp": {"$gte": start, "$lt": end}}, sort=1)
+    stats = hourly_stats(ticks) if not ticks.empty else pd.DataFrame()
+    rollup_collection = RETENTION_POLICY.get(collection, {}).get("rollup_collection")
+    if rollup_collection:
+        rollups = mongo_controller.query_data(_mode="all", collection=rollup_collection,
+                                              _filter={"timestamp": {"$gte": start, "$lt": end}}, sort=1)
+        if not rollups.empty:
+            rolled = rollup_stats(rollups)
+            stored = stats["count"].reindex(rolled.index, fill_value=0) if not stats.empty else 0
+            rolled = rolled[rolled["count"] > stored]
+            stats = pd.concat([stats.drop(rolled.index, errors="ignore"), rolled]) if not stats.empty else rolled
+    averages = {"count": int(stats["count"].sum()) if not stats.empty else 0}
+    for metric in ROLLUP_METRICS:
+        n = stats[f"{metric}_n"].sum() if not stats.empty else 0
+        averages[metric] = float(stats[f"{metric}_sum"].sum() / n) if n > 0 else None
+    return averages
+
+
+if __name__ == "__main__":
+    apply_retention()
@@ -1,9 +1,8 @@
 import json
 
-import requests
-
 import config
 from utils.data_processing import filter_ad
+from utils.scrapers.http_client import post
 
 # Define the endpoint
 url = "https://p2p.binance.com/bapi/c2c/v2/friendly/c2c/adv/search"
@@ -85,8 +84,8 @@ def ads_page_request(timestamp, fiat="BOB", crypto="USDT", trade_type="BUY", deb
         print(f"[binanceRequest] Processing {trade_type.lower()} ads page {page}...")
         # Update the page number in the payload
         payload["page"] = page
-        # Send the POST request
-        response = requests.post(url, json=payload, headers=config.USER_AGENT_HEADERS)
+        # Send the POST request (rate-limited and retried by the shared HTTP client)
+        response = post(url, json=payload)
         # Check the response status
         if response.status_code == 200:
             # Parse the JSON response
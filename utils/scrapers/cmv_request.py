@@ -2,10 +2,10 @@ from datetime import datetime
 
 import pandas as pd
 import pdfplumber
-import requests
 
 import config
 from utils.mongo_controller import mongo_controller
+from utils.scrapers.http_client import fetch
 
 url = "https://backportal.bmsc.com.bo:1443/api/bmsc-portal/reports/547/file"
 
@@ -17,7 +17,7 @@ def cmv_request():
     the results to a MongoDB collection if not already present.
 
     Steps:
-    1. Download the PDF file using a GET request with custom headers.
+    1. Download the PDF file through the shared HTTP client (revalidated against the on-disk cache).
     2. Save the PDF to a directory specified in the config.
     3. Extract the first table from each page of the PDF using pdfplumber.
     4. Convert the extracted data into a pandas DataFrame with columns 'date' and 'cmv'.
@@ -29,7 +29,7 @@ def cmv_request():
     Returns:
         int: 0 on successful completion.
     """
-    response = requests.get(url, headers=config.USER_AGENT_HEADERS)
+    response = fetch(url)
     filename = config.CMV_DIR / f"{datetime.now().strftime("%Y-%m-%d")}_CMV_BMSC.pdf"
     if response.status_code == 200:
         with open(filename, "wb") as f:
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config import HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES
+
+"""
+This module contains the on-disk HTTP cache of the scrapers.
+
+Every successful GET response is stored under HTTP_CACHE_DIR as two files named after the SHA-256 of its URL: the
+body (<key>.body) and its metadata (<key>.json: URL, ETag, Last-Modified, content hash, size, storage time). The
+metadata file's modification time records the last use of the entry, so the least recently used entries are evicted
+first when the cache grows beyond HTTP_CACHE_MAX_BYTES.
+"""
+
+
+class HTTPCache:
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES):
+        """
+        Initialize the cache. The cache directory is created on first write.
+
+        Args:
+            cache_dir (Path, optional): The directory holding the entries. Defaults to HTTP_CACHE_DIR.
+            max_bytes (int, optional): Size above which the least recently used entries are evicted. Defaults to
+                HTTP_CACHE_MAX_BYTES.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.total_bytes = None  # Computed lazily from the directory on first write
+
+    @staticmethod
+    def key(url):
+        """
+        Get the cache key of a URL.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            str: The hex SHA-256 of the URL.
+        """
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def lookup(self, url):
+        """
+        Get the metadata of the cached entry of a URL.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            dict or None: The entry metadata, or None if the URL is not cached.
+        """
+        key = self.key(url)
+        try:
+            with open(self.cache_dir / f"{key}.json", "r", encoding="utf-8") as meta_file:
+                entry = json.load(meta_file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not os.path.exists(self.cache_dir / f"{key}.body"):
+            return None
+        return entry
+
+    def conditional_headers(self, entry):
+        """
+        Build the revalidation headers of a cached entry.
+
+        Args:
+            entry (dict): The entry metadata.
+
+        Returns:
+            dict: The If-None-Match and If-Modified-Since headers the entry supports.
+        """
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def response(self, entry):
+        """
+        Build a response from a cached entry and mark the entry as recently used.
+
+        Args:
+            entry (dict): The entry metadata.
+
+        Returns:
+            requests.Response or None: A 200 response with the cached body, with `from_cache` set to True and
+            `content_hash` set to the body's SHA-256, or None if the body has been evicted meanwhile.
+        """
+        key = self.key(entry["url"])
+        try:
+            with open(self.cache_dir / f"{key}.body", "rb") as body_file:
+                body = body_file.read()
+            os.utime(self.cache_dir / f"{key}.json")
+        except FileNotFoundError:
+            return None
+        response = requests.Response()
+        response.status_code = 200
+        response.url = entry["url"]
+        response._content = body
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response.encoding = entry.get("encoding")
+        response.from_cache = True
+        response.content_hash = entry["content_hash"]
+        return response
+
+    def store(self, url, response):
+        """
+        Store a successful response, replacing any previous entry of the URL.
+
+        Args:
+            url (str): The requested URL.
+            response (requests.Response): The 200 response.
+
+        Returns:
+            dict: The metadata of the new entry.
+        """
+        key = self.key(url)
+        body = response.content
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": hashlib.sha256(body).hexdigest(),
+            "size": len(body),
+            "stored_at": time.time(),
+            "encoding": response.encoding,
+            "headers": {name: value for name, value in response.headers.items()
+                        if name.lower() in ("content-type", "etag", "last-modified")}
+        }
+        response.from_cache = False
+        response.content_hash = entry["content_hash"]
+        with self.lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if self.total_bytes is None:
+                self.total_bytes = self._directory_size()
+            previous = self.lookup(url)
+            # Write to temporary files first, so a crash never leaves a body that does not match its metadata
+            for suffix, content in [(".body", body), (".json", json.dumps(entry).encode("utf-8"))]:
+                temp_path = self.cache_dir / f"{key}{suffix}.tmp"
+                with open(temp_path, "wb") as cache_file:
+                    cache_file.write(content)
+                os.replace(temp_path, self.cache_dir / f"{key}{suffix}")
+            self.total_bytes += entry["size"] - (previous["size"] if previous else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+        return entry
+
+    def refresh(self, entry, response):
+        """
+        Record a successful revalidation (304 Not Modified) of a cached entry.
+
+        Args:
+            entry (dict): The entry metadata.
+            response (requests.Response): The 304 response, whose validators replace the stored ones if present.
+
+        Returns:
+            dict: The updated metadata.
+        """
+        entry["etag"] = response.headers.get("ETag", entry.get("etag"))
+        entry["last_modified"] = response.headers.get("Last-Modified", entry.get("last_modified"))
+        entry["stored_at"] = time.time()
+        key = self.key(entry["url"])
+        with self.lock:
+            temp_path = self.cache_dir / f"{key}.json.tmp"
+            with open(temp_path, "w", encoding="utf-8") as meta_file:
+                json.dump(entry, meta_file)
+            os.replace(temp_path, self.cache_dir / f"{key}.json")
+        return entry
+
+    def _directory_size(self):
+        """
+        Sum the size of the cached bodies.
+
+        Returns:
+            int: The total size in bytes.
+        """
+        return sum(entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.name.endswith(".body"))
+
+    def _evict(self):
+        """
+        Remove the least recently used entries until the cache is below 90% of its maximum size.
+
+        Must be called with the lock held.
+        """
+        entries = []
+        for meta in os.scandir(self.cache_dir):
+            if meta.name.endswith(".json"):
+                body_path = self.cache_dir / meta.name.replace(".json", ".body")
+                size = body_path.stat().st_size if body_path.exists() else 0
+                entries.append((meta.stat().st_mtime, meta.path, body_path, size))
+        entries.sort()
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for _, meta_path, body_path, size in entries:
+            if self.total_bytes <= target:
+                break
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self.total_bytes -= size
+            evicted += 1
+        print(f"[http_cache] Evicted {evicted} entries, {self.total_bytes / 1024 ** 2:.1f} MB in use.")
+
+
+http_cache = HTTPCache()
@@ -0,0 +1,149 @@
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from urllib3.exceptions import ProtocolError
+
+from config import USER_AGENT_HEADERS, CRAWL_MAX_PER_HOST, REQUEST_TIMEOUT, RETRY_MAX_ATTEMPTS
+from utils.scrapers.http_cache import http_cache
+from utils.scrapers.rate_limiter import rate_limiter
+
+"""
+This module contains the shared HTTP layer of the scrapers and the Binance collector: pooled sessions, a per-host
+concurrency cap, adaptive per-host rate limiting with retries, and the on-disk HTTP cache.
+"""
+
+thread_local = threading.local()
+host_slots = {}
+host_slots_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Get the requests session of the current thread, creating it on first use.
+
+    Sessions keep connections alive between requests to the same host. They are not shared between threads.
+
+    Returns:
+        requests.Session: The session of the current thread.
+    """
+    session = getattr(thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(USER_AGENT_HEADERS)
+        thread_local.session = session
+    return session
+
+
+@contextmanager
+def host_slot(url):
+    """
+    Hold one of the CRAWL_MAX_PER_HOST request slots of the URL's host for the duration of the block.
+
+    Args:
+        url (str): The URL about to be requested.
+    """
+    host = urlsplit(url).netloc
+    with host_slots_lock:
+        slot = host_slots.get(host)
+        if slot is None:
+            slot = host_slots[host] = threading.BoundedSemaphore(CRAWL_MAX_PER_HOST)
+    with slot:
+        yield
+
+
+def fetch(url, max_age=0, use_cache=True, **kwargs):
+    """
+    Send a GET request through `send`, with the on-disk HTTP cache.
+
+    Successful responses are stored in the on-disk HTTP cache. A cached page younger than `max_age` is served
+    without any request; an older one is revalidated with its ETag/Last-Modified, and served from disk on a
+    304 Not Modified. Responses carry `from_cache` and `content_hash` (SHA-256 of the body) attributes.
+
+    Args:
+        url (str): The URL to request.
+        max_age (int, optional): Seconds a cached page is served without revalidation. Defaults to 0 (always
+            revalidate).
+        use_cache (bool, optional): If False, the cache is neither read nor written. Defaults to True.
+        **kwargs: Extra arguments passed to requests.Session.request.
+
+    Returns:
+        requests.Response: The response.
+    """
+    # Requests whose URL does not identify the response are not cached
+    use_cache = use_cache and "params" not in kwargs and not kwargs.get("stream")
+    entry = http_cache.lookup(url) if use_cache else None
+    if entry is not None:
+        if max_age and time.time() - entry["stored_at"] < max_age:
+            response = http_cache.response(entry)
+            if response is not None:
+                return response
+        kwargs["headers"] = {**http_cache.conditional_headers(entry), **kwargs.get("headers", {})}
+    response = send("GET", url, **kwargs)
+    if response.status_code == 304 and entry is not None:
+        cached = http_cache.response(http_cache.refresh(entry, response))
+        if cached is not None:
+            return cached
+        # The body was evicted between the lookup and the revalidation
+        kwargs["headers"] = {name: value for name, value in kwargs["headers"].items()
+                             if name not in ("If-None-Match", "If-Modified-Since")}
+        response = send("GET", url, **kwargs)
+    if use_cache and response.status_code == 200:
+        http_cache.store(url, response)
+    return response
+
+
+def post(url, **kwargs):
+    """
+    Send a POST request through `send`. POST responses are never cached.
+
+    Args:
+        url (str): The URL to request.
+        **kwargs: Extra arguments passed to requests.Session.request (e.g. json).
+
+    Returns:
+        requests.Response: The response.
+    """
+    return send("POST", url, **kwargs)
+
+
+def send(method, url, **kwargs):
+    """
+    Send a request through the pooled session of the current thread, with per-host rate limiting and retries.
+
+    Each attempt waits for a token of the host's bucket and one of its CRAWL_MAX_PER_HOST slots. Responses with a
+    429 or 5xx status, and broken connections, slow the host down and are retried up to RETRY_MAX_ATTEMPTS times,
+    after the pause requested by Retry-After or an exponential backoff with jitter.
+
+    Args:
+        method (str): The HTTP method.
+        url (str): The URL to request.
+        **kwargs: Extra arguments passed to requests.Session.request.
+
+    Returns:
+        requests.Response: The last response. It may still have a 429 or 5xx status if every attempt failed.
+
+    Raises:
+        requests.exceptions.RequestException: If the connection failed on every attempt.
+    """
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    for attempt in range(1, RETRY_MAX_ATTEMPTS + 1):
+        rate_limiter.acquire(url)
+        try:
+            with host_slot(url):
+                response = get_session().request(method, url, **kwargs)
+        except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout, ProtocolError) as e:
+            pause = rate_limiter.record(url)
+            if attempt == RETRY_MAX_ATTEMPTS:
+                raise
+            print(f"[http_client] {type(e).__name__} for {url}. Retrying in {pause:.1f}s "
+                  f"({attempt}/{RETRY_MAX_ATTEMPTS})...")
+            continue
+        pause = rate_limiter.record(url, response.status_code, response.headers.get("Retry-After"))
+        if pause == 0 or attempt == RETRY_MAX_ATTEMPTS:
+            return response
+        print(f"[http_client] Status code {response.status_code} for {url}. Retrying in {pause:.1f}s "
+              f"({attempt}/{RETRY_MAX_ATTEMPTS})...")
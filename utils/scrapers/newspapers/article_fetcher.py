@@ -0,0 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from config import ARTICLE_FETCH_WORKERS
+
+# Shared by every source, so the total number of article requests in flight stays bounded during parallel crawls
+article_executor = ThreadPoolExecutor(max_workers=ARTICLE_FETCH_WORKERS, thread_name_prefix="article")
+
+
+def fetch_articles(article_scraper, urls):
+    """
+    Scrape several article pages concurrently and return the results in the order of the given URLs.
+
+    Args:
+        article_scraper (callable): The scraper function of the source, taking a URL.
+        urls (list): The URLs of the articles to scrape.
+
+    Returns:
+        list: The results of `article_scraper` for each URL, in the same order.
+    """
+    if len(urls) <= 1:
+        return [article_scraper(url) for url in urls]
+    return list(article_executor.map(article_scraper, urls))
@@ -0,0 +1,88 @@
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import CRAWL_MAX_SOURCES
+from utils.mongo_controller import mongo_controller
+from utils.scrapers.newspapers.scraper_master import scraper_master
+
+print_lock = threading.Lock()
+
+
+def crawl_sources(jobs, debug=False, max_workers=CRAWL_MAX_SOURCES):
+    """
+    Crawl several newspaper sources concurrently.
+
+    Up to `max_workers` sources run at the same time; requests to any single host are further capped by the
+    shared HTTP client (CRAWL_MAX_PER_HOST). A failing source is reported and does not affect the others, and its
+    crawl state in DBCONFIG is left untouched so the next run resumes it.
+
+    Args:
+        jobs (dict): Mapping of source name to the timestamp limit of its crawl.
+        debug (bool, optional): If True, enables debug mode for the scrapers and prints tracebacks. Defaults to False.
+        max_workers (int, optional): Maximum number of sources crawled at the same time. Defaults to
+            CRAWL_MAX_SOURCES.
+
+    Returns:
+        dict: Mapping of source name to its crawl report (status, elapsed seconds, new articles, error).
+    """
+    reports = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawl") as executor:
+        futures = {executor.submit(crawl_source, source, timestamp_limit, debug): source
+                   for source, timestamp_limit in jobs.items()}
+        for future in as_completed(futures):
+            report = future.result()
+            reports[report["source"]] = report
+            with print_lock:
+                if report["status"] == "done":
+                    print(f"[crawl_executor] ({len(reports)}/{len(jobs)}) {report['source']} finished in "
+                          f"{report['elapsed']:.1f}s with {report['new_articles']} new articles.")
+                else:
+                    print(f"[crawl_executor] ({len(reports)}/{len(jobs)}) {report['source']} failed after "
+                          f"{report['elapsed']:.1f}s: {report['error']}")
+    failed = [source for source, report in reports.items() if report["status"] != "done"]
+    total_articles = sum(report["new_articles"] for report in reports.values())
+    print(f"[crawl_executor] Crawled {len(reports) - len(failed)}/{len(jobs)} sources in "
+          f"{time.perf_counter() - start:.1f}s, {total_articles} new articles.")
+    if failed:
+        print(f"[crawl_executor] Failed sources: {', '.join(failed)}")
+    return reports
+
+
+def crawl_source(source, timestamp_limit, debug=False):
+    """
+    Crawl a single source, isolating any error it raises.
+
+    Args:
+        source (str): The name of the newspaper source.
+        timestamp_limit (datetime): The timestamp limit of the crawl.
+        debug (bool, optional): If True, enables debug mode for the scraper. Defaults to False.
+
+    Returns:
+        dict: The crawl report, with keys "source", "status" ("done" or "failed"), "elapsed", "new_articles"
+              and "error".
+    """
+    with print_lock:
+        print(f"[crawl_executor] Starting {source} (limit {timestamp_limit:%Y-%m-%d})...")
+    start = time.perf_counter()
+    articles_before = mongo_controller.db["USD_BOB_Parallel"].count_documents({"source": source})
+    status = "done"
+    error = None
+    try:
+        scraper_master(source=source, timestamp_limit=timestamp_limit, debug=debug)
+    except Exception as e:
+        status = "failed"
+        error = f"{type(e).__name__}: {e}"
+        if debug:
+            with print_lock:
+                traceback.print_exc()
+    articles_after = mongo_controller.db["USD_BOB_Parallel"].count_documents({"source": source})
+    return {
+        "source": source,
+        "status": status,
+        "elapsed": time.perf_counter() - start,
+        "new_articles": articles_after - articles_before,
+        "error": error
+    }
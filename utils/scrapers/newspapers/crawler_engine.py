@@ -0,0 +1,390 @@
+import re
+from datetime import datetime
+from functools import partial
+
+import requests
+from urllib3.exceptions import ProtocolError
+
+from config import DBCONFIG, HTTP_CACHE_ARTICLE_MAX_AGE
+from utils.mongo_controller import mongo_controller
+from utils.near_duplicates import save_article
+from utils.scrapers.http_client import fetch
+from utils.scrapers.newspapers.article_fetcher import fetch_articles
+from utils.scrapers.newspapers.feed_discovery import discover_from_feeds
+from utils.scrapers.newspapers.html_parser import make_soup
+from utils.scrapers.newspapers.page_archive import page_archive
+from utils.scrapers.newspapers.sources import NEWSPAPER_SOURCES
+
+"""
+This module contains the crawler engine shared by every newspaper source. The per-source layout (feeds, listing URL,
+pagination, selectors, date formats) lives in `sources.NEWSPAPER_SOURCES`.
+"""
+
+SPANISH_MONTHS = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6,
+    "julio": 7, "agosto": 8, "septiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12
+}
+
+
+def crawl_newspaper(source, timestamp_limit, debug):
+    """
+    Crawl the economy section of a newspaper, newest first, and store the new articles in MongoDB.
+
+    Sources with feeds are first discovered from them; when the feeds reach back to the timestamp limit no listing
+    page is read. Otherwise, listing pages are walked until an article older than the timestamp limit is found.
+    The bodies of the new articles of each batch are fetched concurrently and saved in order.
+
+    A checkpoint (next page, last URL, oldest date reached) is saved after every listing page, so an interrupted
+    crawl with the same timestamp limit resumes where it stopped. It is cleared when the crawl completes.
+
+    Args:
+        source (str): The name of the source, a key of NEWSPAPER_SOURCES.
+        timestamp_limit (datetime): The earliest date to scrape articles for.
+        debug (bool): If True, prints debug information during scraping.
+
+    Returns:
+        int: 0 when the timestamp limit has been reached.
+
+    Raises:
+        ConnectionError: If a listing page cannot be retrieved.
+        ValueError: If a listing page yields no articles before the timestamp limit is reached.
+    """
+    spec = NEWSPAPER_SOURCES[source]
+    checkpoint = load_checkpoint(source, timestamp_limit)
+    resume_before = None
+    if checkpoint is not None:
+        # Articles newer than the oldest one reached were all handled before the interruption
+        current_page = checkpoint["page"]
+        resume_before = checkpoint["oldest_date"]
+        print(f"[crawler_engine] Resuming {source} at page {current_page} "
+              f"(oldest article reached: {resume_before:%Y-%m-%d}).")
+    else:
+        feed_articles = discover_from_feeds(source, timestamp_limit)
+        if feed_articles:
+            if debug:
+                print("--------------------")
+                print(f"Feed discovery: {len(feed_articles)} articles")
+            if process_articles(source, feed_articles, timestamp_limit, debug, dated=True):
+                clear_checkpoint(source)
+                return 0
+            print(f"[crawler_engine] The feeds of {source} do not reach back to {timestamp_limit:%Y-%m-%d}, "
+                  f"falling back to the listing pages.")
+        current_page = spec["first_page"]
+    # Sources without dates in the listing need every article page to know where the limit is
+    dated_listing = not spec.get("date_in_article")
+    while True:
+        articles_page = spec["listing_url"].format(page=current_page)
+        if debug:
+            print("--------------------")
+            print(f"Articles Page: {articles_page}")
+        html = fetch_html(articles_page)
+        page_archive.write(source, "listing", articles_page, html, page=current_page)
+        articles = parse_listing(source, html, current_page)
+        if not articles:
+            # An empty page before the limit is far more likely a parser breakage or a transient empty response
+            # than the real end of the listing: keep the checkpoint, so the crawl resumes here next time
+            raise ValueError(f"[crawler_engine] No articles found on {articles_page} before reaching "
+                             f"{timestamp_limit:%Y-%m-%d}; the checkpoint is kept.")
+        if process_articles(source, articles, timestamp_limit, debug, dated=dated_listing,
+                            resume_before=resume_before):
+            clear_checkpoint(source)
+            return 0
+        current_page += spec["page_step"]
+        dates = [article["date"] for article in articles if article.get("date") is not None]
+        if dates:
+            resume_before = min(dates + ([resume_before] if resume_before else []))
+        save_checkpoint(source, {
+            "timestamp_limit": timestamp_limit,
+            "page": current_page,
+            "last_url": articles[-1]["url"],
+            "oldest_date": resume_before,
+            "updated_at": datetime.now()
+        })
+
+
+def load_checkpoint(source, timestamp_limit):
+    """
+    Get the crawl checkpoint of a source, if it belongs to a crawl with the same timestamp limit.
+
+    Checkpoints are kept in the "newspaper_crawl_checkpoints" setting of DBCONFIG, one per source. A checkpoint of
+    a crawl with a different limit (e.g. an interrupted nightly update) is ignored.
+
+    Args:
+        source (str): The name of the source.
+        timestamp_limit (datetime): The timestamp limit of the crawl about to start.
+
+    Returns:
+        dict or None: The checkpoint, with "page", "last_url" and "oldest_date", or None.
+    """
+    checkpoint = DBCONFIG.get_config(setting="newspaper_crawl_checkpoints").get(source)
+    if not checkpoint or checkpoint.get("timestamp_limit") != timestamp_limit or not checkpoint.get("oldest_date"):
+        return None
+    return checkpoint
+
+
+def save_checkpoint(source, checkpoint):
+    """
+    Persist the crawl checkpoint of a source, after a listing page has been fully handled.
+
+    Args:
+        source (str): The name of the source.
+        checkpoint (dict): The next page to read, the last URL handled, the oldest article date reached, and the
+            timestamp limit of the crawl.
+    """
+    DBCONFIG.update_config("newspaper_crawl_checkpoints", {source: checkpoint})
+
+
+def clear_checkpoint(source):
+    """
+    Remove the crawl checkpoint of a source once its crawl has completed.
+
+    Args:
+        source (str): The name of the source.
+    """
+    DBCONFIG.update_config("newspaper_crawl_checkpoints", {source: None})
+
+
+def process_articles(source, articles, timestamp_limit, debug, dated, resume_before=None):
+    """
+    Fetch and store the new articles of a batch (a listing page or a feed), newest first.
+
+    Args:
+        source (str): The name of the source.
+        articles (list): The articles of the batch, in listing order, as returned by `parse_listing`.
+        timestamp_limit (datetime): The earliest date to scrape articles for.
+        debug (bool): If True, prints debug information.
+        dated (bool): Whether the articles already carry their dates. Otherwise every article page is fetched and
+            the date is read from it.
+        resume_before (datetime, optional): When resuming an interrupted crawl, dated articles newer than this were
+            already handled and are skipped without any lookup. Defaults to None.
+
+    Returns:
+        bool: True if an article older than the timestamp limit was found.
+    """
+    candidates = []
+    reached_limit = False
+    for article in articles:
+        if debug:
+            print("---")
+            print(f"Article: {article}")
+        if not dated:
+            candidates.append(article)
+            continue
+        if article["date"] is None:
+            print(f"[crawler_engine] Unreadable date, skipping {article['url']}")
+            continue
+        if article["date"] < timestamp_limit:
+            reached_limit = True
+            break
+        if resume_before is not None and article["date"] > resume_before:
+            continue
+        if article_exists(source, article):
+            continue
+        candidates.append(article)
+    # Fetch the bodies concurrently, then handle them in listing order
+    details = fetch_articles(partial(scrape_article, source), [article["url"] for article in candidates])
+    for article, detail in zip(candidates, details):
+        if detail is None:
+            continue
+        article.update(detail)
+        if not dated:
+            if article["date"] < timestamp_limit:
+                reached_limit = True
+                break
+            if article_exists(source, article):
+                continue
+        if debug:
+            print(f"Complete Article: {article}")
+        save_article({
+            "timestamp": article["date"],
+            "source": source,
+            "title": article["title"],
+            "teaser": article["teaser"],
+            "url": article["url"],
+            "content": article["content"],
+            "first_stage_processed": False,
+            "second_stage_processed": None
+        })
+    return reached_limit
+
+
+def article_exists(source, article):
+    """
+    Check whether an article is already stored.
+
+    Articles are matched by URL, or by title and date for those stored before URLs were compared. Feeds and
+    listing pages may date the same article with different precision, so the date alone is not a reliable key.
+
+    Args:
+        source (str): The name of the source.
+        article (dict): The article, with its URL, title and date.
+
+    Returns:
+        bool: True if the article is already in the USD_BOB_Parallel collection.
+    """
+    exists = mongo_controller.query_data(_mode="one",
+                                         collection="USD_BOB_Parallel",
+                                         _filter={
+                                             "source": source,
+                                             "$or": [
+                                                 {"url": article["url"]},
+                                                 {"timestamp": article["date"], "title": article["title"]}
+                                             ]
+                                         })
+    return exists is not None
+
+
+def fetch_html(url, max_age=0):
+    """
+    Download a page through the shared HTTP client, which rate-limits and retries per host.
+
+    Args:
+        url (str): The URL of the page.
+        max_age (int, optional): Seconds a cached copy is served without revalidation. Defaults to 0.
+
+    Returns:
+        str: The HTML of the page.
+
+    Raises:
+        ConnectionError: If the page cannot be retrieved.
+    """
+    try:
+        response = fetch(url, max_age=max_age)
+    except (requests.exceptions.RequestException, ProtocolError) as e:
+        raise ConnectionError(f"Failed to retrieve {url}: {type(e).__name__}") from e
+    if response.status_code != 200:
+        raise ConnectionError(f"Failed to retrieve {url}. Status code: {response.status_code}")
+    return response.text
+
+
+def scrape_article(source, url):
+    """
+    Download and parse an article, skipping it if it cannot be retrieved or its layout is not recognised.
+
+    Args:
+        source (str): The name of the source.
+        url (str): The URL of the article.
+
+    Returns:
+        dict or None: The fields returned by `parse_article`, or None if the article was skipped.
+    """
+    try:
+        # Published articles rarely change, so recent cached copies are used as they are
+        html = fetch_html(url, max_age=HTTP_CACHE_ARTICLE_MAX_AGE)
+        page_archive.write(source, "article", url, html)
+        return parse_article(source, html)
+    except ConnectionError as e:
+        print(f"[crawler_engine] {e}. Skipping article...")
+    except (AttributeError, IndexError, KeyError, ValueError) as e:
+        print(f"[crawler_engine] Unrecognised layout in {url} ({type(e).__name__}: {e}). Skipping article...")
+    return None
+
+
+def parse_listing(source, html, page, parser=None):
+    """
+    Extract the articles of a listing page.
+
+    Args:
+        source (str): The name of the source.
+        html (str): The HTML of the listing page.
+        page (int): The page number, as used in the listing URL.
+        parser (str, optional): The BeautifulSoup tree builder. Defaults to the fast parser.
+
+    Returns:
+        list: Dicts with the "title", "url" and "teaser" of each article, and its "date" (datetime, or None if it
+              could not be parsed) unless the source dates its articles on the article page.
+    """
+    spec = NEWSPAPER_SOURCES[source]
+    soup = make_soup(html, parse_only=spec["listing_strainer"], parser=parser)
+    if spec.get("parse_listing"):
+        return spec["parse_listing"](soup, page)
+    articles_list = []
+    for item in soup.select(spec["item"]):
+        link = item.select_one(spec["link"])
+        title = item.select_one(spec["title"]) if spec.get("title") else link
+        article = {
+            "title": title.text.strip(),
+            "url": spec.get("url_prefix", "") + link["href"],
+            "teaser": None
+        }
+        if spec.get("teaser"):
+            teaser = item.select_one(spec["teaser"])
+            article["teaser"] = teaser.text.strip() if teaser else None
+        if not spec.get("date_in_article"):
+            date = article["url"] if spec["date"] == "url" else item.select_one(spec["date"]).text
+            article["date"] = parse_date(date, spec)
+        articles_list.append(article)
+    return articles_list
+
+
+def parse_article(source, html, parser=None):
+    """
+    Extract the content of an article page.
+
+    Args:
+        source (str): The name of the source.
+        html (str): The HTML of the article page.
+        parser (str, optional): The BeautifulSoup tree builder. Defaults to the fast parser.
+
+    Returns:
+        dict: The "content" of the article, plus its "teaser" and "date" for sources that publish them there.
+
+    Raises:
+        ValueError: If none of the paragraph selectors of the source match.
+    """
+    spec = NEWSPAPER_SOURCES[source]
+    soup = make_soup(html, parse_only=spec["article_strainer"], parser=parser)
+    if spec.get("parse_article"):
+        return spec["parse_article"](soup)
+    paragraphs = []
+    for selector in spec["paragraphs"]:
+        paragraphs = soup.select(selector)
+        if paragraphs:
+            break
+    if not paragraphs:
+        raise ValueError("article body not found")
+    article_text = ""
+    for paragraph in paragraphs:
+        article_text += paragraph.text.strip() + "\n"
+    return {"content": article_text.strip()}
+
+
+def parse_date(text, spec):
+    """
+    Parse a publication date with the date settings of a source spec.
+
+    Args:
+        text (str): The text holding the date (a listing element or the article URL).
+        spec (dict): The source spec.
+
+    Returns:
+        datetime or None: The date, or None if it does not match the spec.
+    """
+    if spec.get("date_pattern"):
+        match = re.search(spec["date_pattern"], text)
+        if not match:
+            return None
+        text = match.group(1) if match.groups() else match.group(0)
+    text = text.strip()
+    if spec.get("spanish_months"):
+        text = re.sub(r"[^\W\d_]+", replace_spanish_month, text)
+    for date_format in spec["date_formats"]:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    return None
+
+
+def replace_spanish_month(word):
+    """
+    Replace a Spanish month name by its zero-padded number, leaving any other word untouched.
+
+    Args:
+        word (re.Match): A word matched in a date text.
+
+    Returns:
+        str: The month number, or the word itself.
+    """
+    month = SPANISH_MONTHS.get(word.group(0).lower())
+    return f"{month:02d}" if month else word.group(0)
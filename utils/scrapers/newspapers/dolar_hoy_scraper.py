@@ -1,9 +1,9 @@
 from datetime import datetime
 
-import requests
 from bs4 import BeautifulSoup
 
 from utils.mongo_controller import mongo_controller
+from utils.scrapers.http_client import fetch
 
 
 def dolar_hoy_scraper(url):
@@ -20,7 +20,7 @@ def dolar_hoy_scraper(url):
     timestamp = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
 
     # Send an HTTP GET request to the URL
-    response = requests.get(url)
+    response = fetch(url)
 
     # Check if the request was successful
     if response.status_code == 200:
@@ -0,0 +1,279 @@
+import re
+import xml.etree.ElementTree as ElementTree
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+import pytz
+import requests
+from urllib3.exceptions import ProtocolError
+
+from config import FEED_MAX_SITEMAPS
+from utils.scrapers.http_client import fetch
+from utils.scrapers.newspapers.sources import NEWSPAPER_SOURCES
+
+"""
+This module discovers new newspaper articles from the feeds a site publishes (RSS 2.0, Atom, sitemaps and sitemap
+indexes), so a nightly crawl costs one or two requests per source instead of a walk through the listing pages.
+
+Dates are returned as naive La Paz times, like the dates read from the listing pages.
+"""
+
+la_paz_timezone = pytz.timezone('America/La_Paz')
+
+
+def discover_from_feeds(source, timestamp_limit):
+    """
+    List the articles of a source published in its feeds, newest first.
+
+    Args:
+        source (str): The name of the source, a key of NEWSPAPER_SOURCES.
+        timestamp_limit (datetime): The earliest date of interest; older sitemaps of a sitemap index are not read.
+
+    Returns:
+        list or None: Dicts with the "title", "url", "date" and "teaser" of each article, or None if the source has
+            no feed or none of its feeds could be read.
+    """
+    spec = NEWSPAPER_SOURCES[source]
+    feeds = spec.get("feeds")
+    if not feeds:
+        return None
+    url_pattern = re.compile(spec["feed_url_pattern"]) if spec.get("feed_url_pattern") else None
+    articles = {}
+    read_any = False
+    for feed_url in feeds:
+        entries = read_feed(feed_url, timestamp_limit)
+        if entries is None:
+            continue
+        read_any = True
+        for entry in entries:
+            if url_pattern and not url_pattern.search(entry["url"]):
+                continue
+            articles.setdefault(entry["url"], entry)
+    if not read_any:
+        return None
+    dated = [article for article in articles.values() if article["date"] is not None]
+    return sorted(dated, key=lambda article: article["date"], reverse=True)
+
+
+def read_feed(feed_url, timestamp_limit, depth=0):
+    """
+    Download and parse a feed, following the recent sitemaps of a sitemap index.
+
+    Args:
+        feed_url (str): The URL of the feed.
+        timestamp_limit (datetime): The earliest date of interest.
+        depth (int, optional): Nesting level of sitemap indexes already followed. Defaults to 0.
+
+    Returns:
+        list or None: The entries of the feed, or None if it could not be downloaded or parsed.
+    """
+    try:
+        response = fetch(feed_url)
+    except (requests.exceptions.RequestException, ProtocolError) as e:
+        print(f"[feed_discovery] Failed to retrieve {feed_url}: {e}")
+        return None
+    if response.status_code != 200:
+        print(f"[feed_discovery] Failed to retrieve {feed_url}. Status code: {response.status_code}")
+        return None
+    try:
+        root = ElementTree.fromstring(response.content)
+    except ElementTree.ParseError as e:
+        print(f"[feed_discovery] Failed to parse {feed_url}: {e}")
+        return None
+    tag = local_name(root.tag)
+    if tag == "rss":
+        return parse_rss(root)
+    if tag == "feed":
+        return parse_atom(root)
+    if tag == "urlset":
+        return parse_sitemap(root)
+    if tag == "sitemapindex" and depth == 0:
+        entries = []
+        for sitemap_url in recent_sitemaps(root, timestamp_limit):
+            entries.extend(read_feed(sitemap_url, timestamp_limit, depth=1) or [])
+        return entries
+    print(f"[feed_discovery] Unsupported feed format in {feed_url}: <{tag}>")
+    return None
+
+
+def recent_sitemaps(root, timestamp_limit):
+    """
+    Select the sitemaps of a sitemap index modified since the timestamp limit, most recent first.
+
+    Args:
+        root (xml.etree.ElementTree.Element): The <sitemapindex> element.
+        timestamp_limit (datetime): The earliest date of interest.
+
+    Returns:
+        list: Up to FEED_MAX_SITEMAPS sitemap URLs. Sitemaps without lastmod are kept, after the dated ones.
+    """
+    sitemaps = []
+    for sitemap in root:
+        url = child_text(sitemap, "loc")
+        if not url:
+            continue
+        modified = parse_feed_date(child_text(sitemap, "lastmod"))
+        if modified is not None and modified < timestamp_limit:
+            continue
+        sitemaps.append((modified or datetime.min, url))
+    sitemaps.sort(reverse=True)
+    return [url for _, url in sitemaps[:FEED_MAX_SITEMAPS]]
+
+
+def parse_rss(root):
+    """
+    Extract the entries of an RSS 2.0 feed.
+
+    Args:
+        root (xml.etree.ElementTree.Element): The <rss> element.
+
+    Returns:
+        list: The feed entries.
+    """
+    entries = []
+    for item in root.iter():
+        if local_name(item.tag) != "item":
+            continue
+        url = child_text(item, "link")
+        if not url:
+            continue
+        entries.append({
+            "title": child_text(item, "title") or "",
+            "url": url,
+            "date": parse_feed_date(child_text(item, "pubDate") or child_text(item, "date")),
+            "teaser": strip_tags(child_text(item, "description"))
+        })
+    return entries
+
+
+def parse_atom(root):
+    """
+    Extract the entries of an Atom feed.
+
+    Args:
+        root (xml.etree.ElementTree.Element): The <feed> element.
+
+    Returns:
+        list: The feed entries.
+    """
+    entries = []
+    for entry in root:
+        if local_name(entry.tag) != "entry":
+            continue
+        url = None
+        for child in entry:
+            if local_name(child.tag) == "link" and child.get("rel", "alternate") == "alternate":
+                url = child.get("href")
+                break
+        if not url:
+            continue
+        entries.append({
+            "title": child_text(entry, "title") or "",
+            "url": url,
+            "date": parse_feed_date(child_text(entry, "published") or child_text(entry, "updated")),
+            "teaser": strip_tags(child_text(entry, "summary"))
+        })
+    return entries
+
+
+def parse_sitemap(root):
+    """
+    Extract the entries of a sitemap, reading the Google News extension for titles and dates when present.
+
+    Args:
+        root (xml.etree.ElementTree.Element): The <urlset> element.
+
+    Returns:
+        list: The sitemap entries.
+    """
+    entries = []
+    for url_element in root:
+        url = child_text(url_element, "loc")
+        if not url:
+            continue
+        title = None
+        date = None
+        for child in url_element.iter():
+            if local_name(child.tag) == "title" and child.text:
+                title = child.text.strip()
+            elif local_name(child.tag) == "publication_date":
+                date = parse_feed_date(child.text)
+        entries.append({
+            "title": title or "",
+            "url": url,
+            "date": date or parse_feed_date(child_text(url_element, "lastmod")),
+            "teaser": None
+        })
+    return entries
+
+
+def parse_feed_date(text):
+    """
+    Parse an RFC 822 (RSS) or ISO 8601 (Atom, sitemaps) date.
+
+    Args:
+        text (str or None): The date text.
+
+    Returns:
+        datetime or None: The date as a naive La Paz time, or None if it cannot be parsed.
+    """
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        date = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            date = parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            return None
+    if date.tzinfo is not None:
+        date = date.astimezone(la_paz_timezone).replace(tzinfo=None)
+    return date
+
+
+def local_name(tag):
+    """
+    Strip the XML namespace of a tag.
+
+    Args:
+        tag (str): The tag, possibly in "{namespace}name" form.
+
+    Returns:
+        str: The tag name.
+    """
+    return tag.rsplit("}", 1)[-1]
+
+
+def child_text(element, name):
+    """
+    Get the stripped text of the first direct child with the given local name.
+
+    Args:
+        element (xml.etree.ElementTree.Element): The parent element.
+        name (str): The local name of the child.
+
+    Returns:
+        str or None: The text, or None if there is no such child or it is empty.
+    """
+    for child in element:
+        if local_name(child.tag) == name and child.text and child.text.strip():
+            return child.text.strip()
+    return None
+
+
+def strip_tags(text):
+    """
+    Remove the HTML tags of a feed summary.
+
+    Args:
+        text (str or None): The summary.
+
+    Returns:
+        str or None: The plain text, or None if it is empty.
+    """
+    if not text:
+        return None
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text or None
@@ -0,0 +1,29 @@
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    FAST_PARSER = "lxml"
+except ImportError:  # Fall back to the standard library parser, which also supports partial parsing
+    FAST_PARSER = "html.parser"
+
+# Parser used to build the reference output in the parser benchmark
+REFERENCE_PARSER = "html5lib"
+
+
+def make_soup(html, parse_only=None, parser=None):
+    """
+    Parse an HTML document, building only the parts of the tree the scraper needs.
+
+    Args:
+        html (str): The HTML document.
+        parse_only (bs4.SoupStrainer, optional): Only the elements it matches, and their descendants, are built.
+            Defaults to None (full tree).
+        parser (str, optional): The BeautifulSoup tree builder. Defaults to FAST_PARSER.
+
+    Returns:
+        bs4.BeautifulSoup: The parsed document.
+    """
+    parser = parser or FAST_PARSER
+    if parser == "html5lib":  # html5lib always builds the full tree
+        parse_only = None
+    return BeautifulSoup(html, parser, parse_only=parse_only)
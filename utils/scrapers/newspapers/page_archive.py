@@ -0,0 +1,315 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+from tqdm import tqdm
+
+from config import PAGE_ARCHIVE_DIR, PAGE_ARCHIVE_MAX_BYTES
+from utils.mongo_controller import mongo_controller
+from utils.near_duplicates import save_article, simhash_fields
+
+"""
+This module contains the archive of the newspaper pages fetched by the crawler, and the offline re-extraction that
+replays the parsers over it.
+
+Pages are appended to rolling WARC-like files (PAGE_ARCHIVE_DIR/pages-<date>-<n>.warc.gz), one gzip member per
+record, so any record can be read back on its own from its offset. Each record has WARC/1.1 style headers
+(WARC-Type, WARC-Target-URI, WARC-Date, WARC-Record-ID, WARC-Payload-Digest, Content-Type, Content-Length) plus the
+source, page kind ("listing" or "article") and page number, followed by the HTML. Every record is also appended to
+PAGE_ARCHIVE_DIR/index.jsonl with its URL, file, offset and length. A page whose content is unchanged since it was
+last archived is not written again.
+"""
+
+INDEX_FILE = "index.jsonl"
+
+
+class PageArchive:
+    def __init__(self, archive_dir=PAGE_ARCHIVE_DIR, max_bytes=PAGE_ARCHIVE_MAX_BYTES):
+        """
+        Initialize the archive. Files are created on first write.
+
+        Args:
+            archive_dir (Path, optional): The archive directory. Defaults to PAGE_ARCHIVE_DIR.
+            max_bytes (int, optional): Size at which a new archive file is started. Defaults to
+                PAGE_ARCHIVE_MAX_BYTES.
+        """
+        self.archive_dir = archive_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.current_file = None
+        self.latest_hashes = None  # URL -> digest of its last archived record, loaded on first write
+
+    def write(self, source, kind, url, html, page=None):
+        """
+        Append a fetched page to the archive, unless the same content is already the latest record of its URL.
+
+        Args:
+            source (str): The name of the newspaper source.
+            kind (str): "listing" or "article".
+            url (str): The URL of the page.
+            html (str): The HTML of the page.
+            page (int, optional): The page number, for listing pages. Defaults to None.
+
+        Returns:
+            dict or None: The index entry of the new record, or None if the content was already archived.
+        """
+        payload = html.encode("utf-8")
+        digest = hashlib.sha256(payload).hexdigest()
+        fetched_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        headers = [
+            "WARC/1.1",
+            "WARC-Type: response",
+            f"WARC-Target-URI: {url}",
+            f"WARC-Date: {fetched_at.isoformat(timespec='seconds')}Z",
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+            f"WARC-Payload-Digest: sha256:{digest}",
+            f"X-Source: {source}",
+            f"X-Page-Kind: {kind}",
+            f"X-Page-Number: {'' if page is None else page}",
+            "Content-Type: text/html; charset=utf-8",
+            f"Content-Length: {len(payload)}"
+        ]
+        record = gzip.compress(("\r\n".join(headers) + "\r\n\r\n").encode("utf-8") + payload + b"\r\n\r\n")
+        with self.lock:
+            if self.latest_hashes is None:
+                self.latest_hashes = {entry["url"]: entry["digest"] for entry in read_index(self.archive_dir)}
+            if self.latest_hashes.get(url) == digest:
+                return None
+            archive_path = self._writable_file(len(record), fetched_at)
+            with open(archive_path, "ab") as archive_file:
+                offset = archive_file.tell()
+                archive_file.write(record)
+            entry = {
+                "url": url,
+                "source": source,
+                "kind": kind,
+                "page": page,
+                "file": archive_path.name,
+                "offset": offset,
+                "length": len(record),
+                "digest": digest,
+                "fetched_at": fetched_at.isoformat()
+            }
+            with open(self.archive_dir / INDEX_FILE, "a", encoding="utf-8") as index_file:
+                index_file.write(json.dumps(entry) + "\n")
+            self.latest_hashes[url] = digest
+        return entry
+
+    def _writable_file(self, record_size, fetched_at):
+        """
+        Get the archive file the next record goes to, rolling over to a new one per day or when it is full.
+
+        Must be called with the lock held.
+
+        Args:
+            record_size (int): Compressed size of the next record.
+            fetched_at (datetime): Fetch time of the next record.
+
+        Returns:
+            Path: The archive file.
+        """
+        day = f"{fetched_at:%Y%m%d}"
+        current = self.current_file
+        if current is not None and current.name.startswith(f"pages-{day}-") and \
+                current.stat().st_size + record_size <= self.max_bytes:
+            return current
+        os.makedirs(self.archive_dir, exist_ok=True)
+        number = 0
+        while True:
+            candidate = self.archive_dir / f"pages-{day}-{number:03d}.warc.gz"
+            if not candidate.exists() or candidate.stat().st_size + record_size <= self.max_bytes:
+                self.current_file = candidate
+                return candidate
+            number += 1
+
+
+def read_index(archive_dir=PAGE_ARCHIVE_DIR):
+    """
+    Read the archive index, keeping every record of the listing pages and only the latest record of each article
+    page.
+
+    Listing pages change over time (the same page number lists new articles every day), so each of their snapshots
+    is kept, deduplicated by URL and fetch time. Article pages are collapsed to their latest record.
+
+    Args:
+        archive_dir (Path, optional): The archive directory. Defaults to PAGE_ARCHIVE_DIR.
+
+    Returns:
+        list: The index entries, in the order they were archived.
+    """
+    entries = {}
+    try:
+        with open(archive_dir / INDEX_FILE, "r", encoding="utf-8") as index_file:
+            for line in index_file:
+                if line.strip():
+                    entry = json.loads(line)
+                    key = (entry["url"], entry["fetched_at"]) if entry["kind"] == "listing" else entry["url"]
+                    entries.pop(key, None)
+                    entries[key] = entry
+    except FileNotFoundError:
+        pass
+    return list(entries.values())
+
+
+def read_record(entry, archive_dir=PAGE_ARCHIVE_DIR):
+    """
+    Read the HTML of an archived page from its index entry.
+
+    Args:
+        entry (dict): The index entry.
+        archive_dir (Path, optional): The archive directory. Defaults to PAGE_ARCHIVE_DIR.
+
+    Returns:
+        str: The HTML of the page.
+    """
+    with open(archive_dir / entry["file"], "rb") as archive_file:
+        archive_file.seek(entry["offset"])
+        record = gzip.decompress(archive_file.read(entry["length"]))
+    _, payload = record.split(b"\r\n\r\n", 1)
+    return payload[:-4].decode("utf-8")
+
+
+def reextract_entry(entry):
+    """
+    Re-run the parser of an archived page. Runs in a worker process.
+
+    Args:
+        entry (dict): The index entry.
+
+    Returns:
+        tuple: The entry and its parsed result (list of articles for listings, dict for articles), or the entry and
+            the error message if the parser failed.
+    """
+    # Imported here because the crawler engine itself writes to the archive
+    from utils.scrapers.newspapers.crawler_engine import parse_listing, parse_article
+    try:
+        html = read_record(entry)
+        if entry["kind"] == "listing":
+            return entry, parse_listing(entry["source"], html, entry["page"])
+        return entry, parse_article(entry["source"], html)
+    except (AttributeError, IndexError, KeyError, ValueError, TypeError) as e:
+        return entry, f"{type(e).__name__}: {e}"
+
+
+def normalize_whitespace(text):
+    """
+    Collapse the whitespace of a text, so contents stored by older scrapers (e.g. with a trailing newline) compare
+    equal to the current parser output.
+
+    Args:
+        text (str or None): The text.
+
+    Returns:
+        str: The text with single spaces ("" for None).
+    """
+    return " ".join((text or "").split())
+
+
+def reextract_archive(sources=None, apply=False, workers=None):
+    """
+    Re-run the current parsers over the archived pages in parallel, without any network traffic.
+
+    Listing pages provide the title and date of each article (the earliest snapshot listing it wins, with missing
+    fields filled in from the later ones); article pages provide its content. Contents are
+    compared with whitespace normalized. The planned changes are always reported first (dry run). With `apply`, and
+    after confirmation, stored articles whose re-extracted content differs are updated and sent back to the LLM
+    stages, and archived articles missing from the database are inserted. Articles already reviewed
+    (`human_approved` set) are never reset: they are listed for a manual re-review instead, so their labels survive.
+
+    Args:
+        sources (list, optional): The sources to re-extract. Defaults to all archived sources.
+        apply (bool, optional): If True, write the results to the database. Defaults to False (report only).
+        workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        dict: Per source, the number of pages parsed and failed, and of articles updated, left for review and
+            inserted (planned ones if nothing was applied).
+    """
+    from utils.scrapers.newspapers.crawler_engine import article_exists
+
+    entries = [entry for entry in read_index() if sources is None or entry["source"] in sources]
+    print(f"\n[page_archive] Re-extracting {len(entries)} archived pages...")
+    report = {}
+    listed = {}
+    details = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(reextract_entry, entries, chunksize=16)
+        for entry, result in tqdm(results, total=len(entries), unit="page"):
+            counts = report.setdefault(entry["source"], {"parsed": 0, "failed": 0, "updated": 0, "review": 0,
+                                                         "inserted": 0})
+            if isinstance(result, str):
+                counts["failed"] += 1
+                continue
+            counts["parsed"] += 1
+            if entry["kind"] == "listing":
+                for article in result:
+                    known = listed.setdefault(article["url"], article)
+                    known.update({key: value for key, value in article.items() if known.get(key) is None})
+            else:
+                details[entry["url"]] = (entry["source"], result)
+
+    updates = []
+    reviews = []
+    inserts = []
+    for url, (source, detail) in tqdm(details.items(), unit="article", desc="Comparing"):
+        stored = mongo_controller.query_data(_mode="one", collection="USD_BOB_Parallel",
+                                             _filter={"source": source, "url": url})
+        if stored is not None:
+            if normalize_whitespace(stored.get("content")) == normalize_whitespace(detail["content"]):
+                continue
+            if stored.get("human_approved") is not None:
+                reviews.append((source, stored["_id"], url))
+                report[source]["review"] += 1
+                continue
+            update = {key: value for key, value in detail.items() if key in ("content", "teaser")}
+            update.update(simhash_fields(detail["content"]))
+            update.update({"first_stage_processed": False, "second_stage_processed": None})
+            updates.append((stored["_id"], update))
+            report[source]["updated"] += 1
+            continue
+        article = {**listed.get(url, {}), **detail, "url": url}
+        if article.get("date") is None or not article.get("title") or article_exists(source, article):
+            continue
+        inserts.append({
+            "timestamp": article["date"],
+            "source": source,
+            "title": article["title"],
+            "teaser": article.get("teaser"),
+            "url": url,
+            "content": article["content"],
+            "first_stage_processed": False,
+            "second_stage_processed": None
+        })
+        report[source]["inserted"] += 1
+
+    print(f"\n[page_archive] {'Source':<14}{'Parsed':>8}{'Failed':>8}{'Updated':>9}{'Review':>8}{'Inserted':>10}")
+    for source, counts in sorted(report.items()):
+        print(f"[page_archive] {source:<14}{counts['parsed']:>8}{counts['failed']:>8}{counts['updated']:>9}"
+              f"{counts['review']:>8}{counts['inserted']:>10}")
+    for source, _id, url in reviews:
+        print(f"[page_archive] Reviewed article #{_id} ({source}) changed, re-review it manually: {url}")
+    print(f"\n[page_archive] Dry run: {len(updates)} articles to update, {len(reviews)} reviewed articles to "
+          f"re-review manually, {len(inserts)} articles to insert.")
+    if not apply or not (updates or inserts):
+        return report
+    if input("[page_archive] Apply these changes? (y/n): ").lower() != "y":
+        print("[page_archive] Nothing applied.")
+        return report
+    for _id, update in tqdm(updates, unit="article", desc="Updating"):
+        mongo_controller.db["USD_BOB_Parallel"].update_one({"_id": _id}, {"$set": update})
+    for article in tqdm(inserts, unit="article", desc="Inserting"):
+        save_article(article)
+    print(f"[page_archive] Updated {len(updates)} articles and inserted {len(inserts)}.")
+    return report
+
+
+page_archive = PageArchive()
+
+
+if __name__ == "__main__":
+    reextract_archive(apply=True)
@@ -0,0 +1,104 @@
+import re
+import time
+
+from config import SNAPSHOTS_DIR
+from utils.scrapers.newspapers.crawler_engine import parse_listing, parse_article
+from utils.scrapers.newspapers.html_parser import FAST_PARSER, REFERENCE_PARSER
+from utils.scrapers.newspapers.sources import NEWSPAPER_SOURCES
+
+"""
+This module replays the saved HTML snapshots of every newspaper source through the crawler engine's parse
+functions, once with the reference parser (html5lib, full tree) and once with the fast parser (partial tree), and
+checks that both extract the same data.
+"""
+
+SNAPSHOT_PATTERN = re.compile(r"_(art_page|article)_(\d+)\.html$")
+
+
+def replay_snapshot(source, html, snapshot_type, number, parser):
+    """
+    Parse a snapshot with the given parser and measure how long it takes.
+
+    Args:
+        source (str): The name of the snapshot's source.
+        html (str): The HTML of the snapshot.
+        snapshot_type (str): "art_page" for an article listing page or "article" for an article page.
+        number (int): The number in the snapshot filename (the page number for listing pages).
+        parser (str): The BeautifulSoup tree builder.
+
+    Returns:
+        tuple: The parsed result and the elapsed seconds.
+    """
+    start = time.perf_counter()
+    if snapshot_type == "art_page":
+        result = parse_listing(source, html, number, parser=parser)
+    else:
+        result = parse_article(source, html, parser=parser)
+    return result, time.perf_counter() - start
+
+
+def benchmark_parsers(sources=None):
+    """
+    Compare the reference and fast parsers over the saved snapshots and print a summary table.
+
+    Args:
+        sources (list, optional): The sources to benchmark. Defaults to every source with a snapshot folder.
+
+    Returns:
+        dict: Per source, the number of snapshots, the mean milliseconds per page with each parser (over the snapshots
+            both parsers read), the list of snapshots the fast parser failed on and the list of snapshots whose
+            extracted data differ between parsers.
+    """
+    if sources is None:
+        sources = sorted(folder.name for folder in SNAPSHOTS_DIR.iterdir() if folder.is_dir())
+    results = {}
+    for source in sources:
+        if source not in NEWSPAPER_SOURCES:
+            continue
+        snapshots = sorted((SNAPSHOTS_DIR / source).glob("*.html"))
+        report = {"snapshots": 0, "timed": 0, "reference_ms": 0.0, "fast_ms": 0.0, "failures": [], "mismatches": []}
+        for snapshot in snapshots:
+            match = SNAPSHOT_PATTERN.search(snapshot.name)
+            if not match:
+                continue
+            with open(snapshot, "r", encoding="utf-8") as file:
+                html = file.read()
+            snapshot_type, number = match.group(1), int(match.group(2))
+            try:
+                reference, reference_time = replay_snapshot(source, html, snapshot_type, number, REFERENCE_PARSER)
+            except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+                # The page layout has changed since the snapshot was taken
+                continue
+            report["snapshots"] += 1
+            try:
+                fast, fast_time = replay_snapshot(source, html, snapshot_type, number, FAST_PARSER)
+            except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+                report["failures"].append(snapshot.name)
+                continue
+            report["timed"] += 1
+            report["reference_ms"] += reference_time * 1000
+            report["fast_ms"] += fast_time * 1000
+            if fast != reference:
+                report["mismatches"].append(snapshot.name)
+        if report["timed"]:
+            report["reference_ms"] /= report["timed"]
+            report["fast_ms"] /= report["timed"]
+        if report["snapshots"]:
+            results[source] = report
+
+    print(f"\n[parser_benchmark] {'Source':<14}{'Pages':>7}{REFERENCE_PARSER + ' (ms)':>16}"
+          f"{FAST_PARSER + ' (ms)':>18}{'Speed-up':>10}{'Failures':>10}{'Mismatches':>12}")
+    for source, report in results.items():
+        speed_up = f"{report['reference_ms'] / report['fast_ms']:.1f}x" if report["fast_ms"] > 0 else "n/a"
+        print(f"[parser_benchmark] {source:<14}{report['snapshots']:>7}{report['reference_ms']:>16.2f}"
+              f"{report['fast_ms']:>18.2f}{speed_up:>10}{len(report['failures']):>10}{len(report['mismatches']):>12}")
+    for source, report in results.items():
+        for snapshot in report["failures"]:
+            print(f"[parser_benchmark] The fast parser failed on: {source}/{snapshot}")
+        for snapshot in report["mismatches"]:
+            print(f"[parser_benchmark] Output differs between parsers: {source}/{snapshot}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_parsers()
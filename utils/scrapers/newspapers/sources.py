@@ -0,0 +1,338 @@
+import re
+from datetime import datetime
+
+from bs4 import SoupStrainer
+
+from config import EL_DEBER_URL, EL_DIARIO_URL, LOS_TIEMPOS_URL, RED_UNO_URL, ECONOMY_URL, AHORADIGITAL_URL, \
+    OXIGENO_URL, OPINION_URL, FIDES_URL, ERBOL_URL, BRUJULA_URL
+
+"""
+This module contains the specs of the newspaper sources crawled by `crawler_engine`.
+
+Each spec is a dict with the following keys:
+    - feeds (optional): URLs of RSS/Atom feeds, sitemaps or sitemap indexes listing the newest articles, read before
+      the listing pages (see `feed_discovery`).
+    - feed_url_pattern (optional): regex the article URLs found in the feeds must match (e.g. the economy section).
+    - listing_url: URL template of the economy section listing, with a "{page}" placeholder.
+    - first_page, page_step: pagination of the listing ("{page}" takes first_page, first_page + page_step, ...).
+    - listing_strainer, article_strainer: SoupStrainers of the containers the parsers read, so only they are built.
+    - item: CSS selector of each article in the listing.
+    - link: CSS selector, relative to the item, of the <a> holding the article URL (and title, unless "title" is set).
+    - title (optional): CSS selector, relative to the item, of the article title.
+    - url_prefix (optional): prepended to relative article URLs.
+    - teaser (optional): CSS selector, relative to the item, of the article teaser.
+    - date: CSS selector, relative to the item, of the publication date, or "url" to read it from the article URL.
+    - date_pattern (optional): regex extracting the date from the text (its first group, if it has any).
+    - date_formats: strptime formats tried in order.
+    - spanish_months (optional): if True, Spanish month names are replaced by their number before parsing.
+    - date_in_article (optional): if True, the listing has no dates and the article parser provides them.
+    - paragraphs: CSS selectors of the article paragraphs, tried in order until one matches.
+    - parse_listing, parse_article (optional): hooks for layouts the selectors cannot express. They take the soup
+      (and the page number, for listings) and return the same structures as the generic parsers.
+"""
+
+
+def parse_el_deber_listing(soup, page):
+    """
+    Extracts the articles of an El Deber listing page, whose cards come in two nesting layouts.
+
+    Args:
+        soup (bs4.BeautifulSoup): The parsed listing page.
+        page (int): The page number (unused).
+
+    Returns:
+        list: Dicts with the title, url, date and teaser of each article.
+    """
+    articles_container = soup.find('div', class_='view-content').find_all('div', class_="mt-3", recursive=False)
+    articles_list = []
+    for article in articles_container:
+        try:
+            article_data = article.find('div').find_all('div', recursive=False)[1].find('div').find_all('div',
+                                                                                                        recursive=False)
+        except IndexError:
+            article_data = article.find('div').find('div').find('div').find_all('div', recursive=False)
+        article_date = article_data[1].find('div').text.strip()
+        try:
+            article_date = datetime.strptime(article_date, "%Y-%m-%d %H:%M")
+        except ValueError:
+            article_date = datetime.strptime(article_date, "%d/%m/%Y - %H:%M")
+        try:
+            article_teaser = article_data[3].find('p').text
+        except AttributeError:
+            article_teaser = None
+        articles_list.append({
+            "title": article_data[2].find('a').find('h2').text.strip(),
+            "url": EL_DEBER_URL + article_data[2].find('a')['href'],
+            "date": article_date,
+            "teaser": article_teaser
+        })
+    return articles_list
+
+
+def parse_el_deber_article(soup):
+    """
+    Extracts the body of an El Deber article, skipping embedded widgets and empty paragraphs.
+
+    Args:
+        soup (bs4.BeautifulSoup): The parsed article page.
+
+    Returns:
+        dict: The article content.
+    """
+    article_text = ""
+    article = soup.find('div', class_='cuerpo-full').find('div').find_all('p', recursive=False)
+    for paragraph in article:
+        if paragraph.find('div') or paragraph.text.strip() == "":
+            continue
+        article_text += paragraph.text + "\n"
+    return {"content": article_text.strip()}
+
+
+def parse_el_diario_listing(soup, page):
+    """
+    Extracts the articles of an El Diario listing page. The first page also has a highlighted section.
+
+    Args:
+        soup (bs4.BeautifulSoup): The parsed listing page.
+        page (int): The page number.
+
+    Returns:
+        list: Dicts with the title, url, date and teaser of each article.
+    """
+    articles_to_examine = []
+    articles_list = []
+    date_pattern = r"https://www\.eldiario\.net/portal/(\d{4}/\d{2}/\d{2})/"
+    general_articles_container = soup.select_one('div.tdc-zone#tdi_44').find('div').find_all('div', recursive=False)
+
+    if page == 1:
+        # Newest articles section (highlighted)
+        newest_articles_container = general_articles_container[0].find('div', class_='wpb_wrapper')
+        newest_articles_container = newest_articles_container.find_all('div', recursive=False)[2].find('div')
+        newest_articles_container = newest_articles_container.find_all('div', recursive=False)
+        # NS Article 1
+        first_article_info = newest_articles_container[0].find('div', class_='td-module-meta-info').find('div')
+        articles_to_examine.append(first_article_info)
+        # NS Articles 2-5
+        next_articles = newest_articles_container[1].find_all('div', recursive=False)
+        for article in next_articles:
+            articles_to_examine.append(article.find('div', class_='td-module-meta-info').find('div'))
+
+    # Older articles section
+    older_articles_container = general_articles_container[1].find('div', class_='wpb_wrapper')
+    older_articles_container = older_articles_container.find('div', class_='tdi_58').find('div', id='tdi_58')
+    older_articles_container = older_articles_container.find_all('div', recursive=False)
+    for article in older_articles_container:
+        articles_to_examine.append(article.find('div').find('div', class_='td-module-meta-info').find('h3'))
+
+    for article in articles_to_examine:
+        url = article.find('a')['href']
+        date = re.search(date_pattern, url).group(1)
+        articles_list.append({
+            "title": article.find('a').text.replace("  ", " "),
+            "url": url,
+            "date": datetime.strptime(date, "%Y/%m/%d"),
+            "teaser": None
+        })
+    return articles_list
+
+
+def parse_el_diario_article(soup):
+    """
+    Extracts the teaser and body of an El Diario article.
+
+    Args:
+        soup (bs4.BeautifulSoup): The parsed article page.
+
+    Returns:
+        dict: The article teaser and content.
+    """
+    article_text = ""
+    article_container = soup.find('div', id='tdi_51').find('div', class_='tdi_54')
+    article_container = article_container.find('div', class_='wpb_wrapper')
+    try:
+        article_teaser = article_container.find('div', class_='tdb_single_subtitle').find('p').text.strip(">").strip()
+    except AttributeError:
+        article_teaser = None
+    article_body = article_container.find('div', class_='tdb_single_content').find('div').find_all('p',
+                                                                                                   recursive=False)
+    for paragraph in article_body:
+        article_text += paragraph.text + "\n"
+    return {"teaser": article_teaser, "content": article_text.strip()}
+
+
+def parse_red_uno_article(soup):
+    """
+    Extracts the teaser, publication date and body of a Red Uno article. The listing pages carry no dates.
+
+    Args:
+        soup (bs4.BeautifulSoup): The parsed article page.
+
+    Returns:
+        dict: The article teaser, date and content.
+
+    Raises:
+        ValueError: If the date format does not match the expected patterns.
+    """
+    article_text = ""
+    header = soup.find('div', class_='grid-encabezado')
+    article_date = header.find('p', class_='fecha').text.strip()
+    try:
+        article_date = datetime.strptime(article_date, "%d/%m/%Y %I:%M %p")
+    except ValueError:
+        article_date = datetime.strptime(article_date, "%d/%m/%Y %H:%M")
+    article_body = soup.find('div', class_='body__cuerpo').find_all('p', recursive=False)
+    for paragraph in article_body:
+        article_text += paragraph.text + "\n"
+    return {
+        "teaser": header.find('p', class_='intro').text,
+        "date": article_date,
+        "content": article_text.strip()
+    }
+
+
+NEWSPAPER_SOURCES = {
+    "el_deber": {
+        "listing_url": EL_DEBER_URL + "/economia/{page}",
+        "first_page": 1,
+        "page_step": 1,
+        "listing_strainer": SoupStrainer('div', class_='view-content'),
+        "parse_listing": parse_el_deber_listing,
+        "article_strainer": SoupStrainer('div', class_='cuerpo-full'),
+        "parse_article": parse_el_deber_article
+    },
+    "el_diario": {
+        "feeds": [EL_DIARIO_URL + "/portal/category/secciones/economia/feed/"],
+        "listing_url": EL_DIARIO_URL + "/portal/category/secciones/economia/page/{page}",
+        "first_page": 1,
+        "page_step": 1,
+        "listing_strainer": SoupStrainer('div', id='tdi_44'),
+        "parse_listing": parse_el_diario_listing,
+        "article_strainer": SoupStrainer('div', id='tdi_51'),
+        "parse_article": parse_el_diario_article
+    },
+    "los_tiempos": {
+        "listing_url": LOS_TIEMPOS_URL + "/hemeroteca/seccion/actualidad-1/seccion/economia-26149"
+                                         "?contenido=&sort_by=field_noticia_fecha&page={page}",
+        "first_page": 0,
+        "page_step": 1,
+        "listing_strainer": SoupStrainer('div', id='content'),
+        "item": "div.region-three-25-50-25-second > div > div:nth-of-type(3) div.view-content div.views-row",
+        "link": "div.views-field-title a",
+        "url_prefix": LOS_TIEMPOS_URL,
+        "date": "span.date-display-single",
+        "date_formats": ["%d/%m/%Y"],
+        "article_strainer": SoupStrainer('div', class_='node-content'),
+        "paragraphs": ["div.node-content div.body div.field-item > p"]
+    },
+    "red_uno": {
+        "listing_url": RED_UNO_URL + "/j/economia/{page}",
+        "first_page": 0,
+        "page_step": 12,
+        "listing_strainer": SoupStrainer('div', class_='titulo'),
+        "item": "div.titulo",
+        "link": "a",
+        "title": "h2",
+        "url_prefix": RED_UNO_URL,
+        "date_in_article": True,
+        "article_strainer": SoupStrainer('div', class_=['grid-encabezado', 'body__cuerpo']),
+        "parse_article": parse_red_uno_article
+    },
+    "economy": {
+        "listing_url": ECONOMY_URL + "/blog/section/economia/?page={page}",
+        "first_page": 1,
+        "page_step": 1,
+        "listing_strainer": SoupStrainer('div', class_='archive-contents'),
+        "item": "div.archive-contents div.row div.archive-item",
+        "link": "article div.article-data h2.title a",
+        "url_prefix": ECONOMY_URL,
+        "date": "article div.article-data div.content-info span.date-container",
+        "date_formats": ["%d/%m/%y"],
+        "article_strainer": SoupStrainer('div', class_=['content-data', 'video-data']),
+        # Articles with video content use a different container
+        "paragraphs": ["div.content-data div.body p", "div.video-data div.body p"]
+    },
+    "ahoradigital": {
+        "feeds": [AHORADIGITAL_URL + "/category/economia/feed/"],
+        "listing_url": AHORADIGITAL_URL + "/category/economia/page/{page}",
+        "first_page": 1,
+        "page_step": 1,
+        "listing_strainer": SoupStrainer('div', class_='jeg_main_content'),
+        "item": "div.jeg_main_content article.jeg_post",
+        "link": "h3.jeg_post_title a",
+        "date": "div.jeg_post_meta a",
+        "date_formats": ["%Y/%m/%d"],
+        "article_strainer": SoupStrainer('div', class_='content-inner'),
+        "paragraphs": ["div.content-inner p"]
+    },
+    "oxigeno": {
+        "listing_url": OXIGENO_URL + "/politica?page={page}",
+        "first_page": 0,
+        "page_step": 1,
+        "listing_strainer": SoupStrainer('div', class_='node-noticia'),
+        "item": "div.node-noticia",
+        "link": "div.field-name-title a",
+        "url_prefix": OXIGENO_URL,
+        "teaser": "div.field-name-body",
+        "date": "div.field-name-published-on > div > div",
+        "date_formats": ["%d/%m/%Y - %H:%M"],
+        "article_strainer": SoupStrainer('div', class_='field-name-body'),
+        "paragraphs": ["div.field-name-body p"]
+    },
+    "opinion": {
+        "listing_url": OPINION_URL + "/blog/section/pais/?page={page}",
+        "first_page": 1,
+        "page_step": 1,
+        "listing_strainer": SoupStrainer('div', class_='archive-contents'),
+        "item": "div.archive-contents article.content",
+        "link": "div.article-data a",
+        "url_prefix": OPINION_URL,
+        "date": "url",
+        "date_pattern": r"/(\d{8})\d*\.html",
+        "date_formats": ["%Y%m%d"],
+        "article_strainer": SoupStrainer('div', class_='content-body'),
+        "paragraphs": ["div.content-body div.body p"]
+    },
+    "fides": {
+        "listing_url": FIDES_URL + "/economia/?page={page}",
+        "first_page": 1,
+        "page_step": 1,
+        "listing_strainer": SoupStrainer('div', class_='nws-item'),
+        "item": "div.nws-item",
+        "link": "div.qtitle a",
+        "url_prefix": FIDES_URL,
+        "date": "div.qdate",
+        "date_pattern": r"\d{1,2} de \w+, \d{4} - \d{2}:\d{2}",
+        "date_formats": ["%d de %m, %Y - %H:%M"],
+        "spanish_months": True,
+        "article_strainer": SoupStrainer('div', class_='qtexto'),
+        "paragraphs": ["div.qtexto p"]
+    },
+    "erbol": {
+        "listing_url": ERBOL_URL + "/economia?page={page}",
+        "first_page": 0,
+        "page_step": 1,
+        "listing_strainer": SoupStrainer('div', class_='view-content'),
+        "item": "div.view-content > div.views-row",
+        "link": "div.views-field-title a",
+        "url_prefix": ERBOL_URL,
+        "date": "div.views-field-created span",
+        "date_pattern": r"\b\d{1,2} de \w+ del \d{4}\b",
+        "date_formats": ["%d de %m del %Y"],
+        "spanish_months": True,
+        "article_strainer": SoupStrainer('div', class_='field-name-body'),
+        "paragraphs": ["div.field-name-body > div > div > p"]
+    },
+    "brujula": {
+        "listing_url": BRUJULA_URL + "/economia/p={page}",
+        "first_page": 1,
+        "page_step": 1,
+        "listing_strainer": SoupStrainer('ul', class_='otras-not'),
+        "item": "ul.otras-not li",
+        "link": "a:nth-of-type(2)",
+        "date": "url",
+        "date_pattern": r"/(\d{4}/\d{2}/\d{2})/",
+        "date_formats": ["%Y/%m/%d"],
+        "article_strainer": SoupStrainer('div', class_='contIn'),
+        "paragraphs": ["div.contIn p"]
+    }
+}
@@ -0,0 +1,179 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from config import RATE_LIMIT_INITIAL, RATE_LIMIT_MIN, RATE_LIMIT_MAX, RATE_LIMIT_BURST, RATE_LIMIT_INCREASE, \
+    RETRY_BASE_DELAY, RETRY_MAX_DELAY
+
+"""
+This module contains the per-host rate limiter shared by every fetcher.
+
+Each host has a token bucket refilled at an adaptive rate (additive increase, multiplicative decrease): every
+successful response raises the rate by RATE_LIMIT_INCREASE requests per second, up to RATE_LIMIT_MAX, and every
+429 or 5xx response halves it, down to RATE_LIMIT_MIN. A Retry-After header, or an exponential backoff with full
+jitter when there is none, pauses the whole host, so concurrent fetchers do not keep hitting a struggling server.
+"""
+
+
+class HostBucket:
+    def __init__(self, rate=RATE_LIMIT_INITIAL, burst=RATE_LIMIT_BURST):
+        """
+        Initialize the token bucket of a host.
+
+        Args:
+            rate (float, optional): Initial refill rate, in requests per second. Defaults to RATE_LIMIT_INITIAL.
+            burst (int, optional): Bucket capacity. Defaults to RATE_LIMIT_BURST.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token, or compute how long to wait for the next one.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds to wait before trying again.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def success(self):
+        """
+        Record a successful response: the rate grows additively and the failure streak resets.
+        """
+        with self.lock:
+            self.rate = min(RATE_LIMIT_MAX, self.rate + RATE_LIMIT_INCREASE)
+            self.failures = 0
+
+    def failure(self, retry_after=None):
+        """
+        Record a throttled or failed response: the rate is halved and the host is paused.
+
+        Args:
+            retry_after (float, optional): Seconds requested by the server's Retry-After header. Defaults to None,
+                in which case an exponential backoff with full jitter is used.
+
+        Returns:
+            float: The pause applied to the host, in seconds.
+        """
+        with self.lock:
+            self.rate = max(RATE_LIMIT_MIN, self.rate / 2)
+            self.failures += 1
+            if retry_after is not None:
+                delay = min(retry_after, RETRY_MAX_DELAY)
+            else:
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** self.failures))
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+            self.tokens = 0.0
+            return delay
+
+
+class RateLimiter:
+    def __init__(self):
+        """
+        Initialize the limiter. Host buckets are created on first use.
+        """
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url):
+        """
+        Get the token bucket of the URL's host.
+
+        Args:
+            url (str): The URL about to be requested.
+
+        Returns:
+            HostBucket: The bucket of the host.
+        """
+        host = urlsplit(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = HostBucket()
+            return bucket
+
+    def acquire(self, url):
+        """
+        Block until the URL's host allows one more request. Only the computed wait is slept.
+
+        Args:
+            url (str): The URL about to be requested.
+        """
+        bucket = self.bucket(url)
+        while True:
+            wait = bucket.reserve()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def record(self, url, status_code=None, retry_after=None):
+        """
+        Adapt the rate of the URL's host to the outcome of a request.
+
+        Args:
+            url (str): The requested URL.
+            status_code (int, optional): The response status code. Defaults to None (no response: connection error).
+            retry_after (str, optional): The Retry-After header of the response, if any. Defaults to None.
+
+        Returns:
+            float: The pause applied to the host, in seconds (0 after a successful request).
+        """
+        bucket = self.bucket(url)
+        if status_code is not None and status_code != 429 and status_code < 500:
+            bucket.success()
+            return 0.0
+        return bucket.failure(parse_retry_after(retry_after))
+
+    def rates(self):
+        """
+        Get the current rate of every host, for monitoring.
+
+        Returns:
+            dict: Requests per second, per host.
+        """
+        with self.lock:
+            return {host: round(bucket.rate, 2) for host, bucket in self.buckets.items()}
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header, given either in seconds or as an HTTP date.
+
+    Args:
+        value (str or None): The header value.
+
+    Returns:
+        float or None: The seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+rate_limiter = RateLimiter()
@@ -7,8 +7,9 @@ from datetime import datetime, timedelta
 import requests
 
 from config import BASE_DIR, DATA_DIR, SNAPSHOTS_DIR, GRAPHS_DIR, LIQUIDITY_DEPTH_DIR, \
-    TWENTY_FOUR_HOURS_PRICE_DIR, ONE_WEEK_PRICE_DIR, TWO_WEEKS_PRICE_DIR, ALL_TIME_PRICE_DIR, BI_HOUR_PRICE_DIR, CMV_DIR
-from config import RECORD_INTERVAL
+    TWENTY_FOUR_HOURS_PRICE_DIR, ONE_WEEK_PRICE_DIR, TWO_WEEKS_PRICE_DIR, ALL_TIME_PRICE_DIR, BI_HOUR_PRICE_DIR, CMV_DIR, \
+    HTTP_CACHE_DIR, MODELS_DIR
+from config import RECORD_INTERVAL, OLLAMA_BASE_URL
 
 """
 This module contains various functions, including functions to check if certain services are running.
@@ -24,7 +25,7 @@ def check_folder_structure():
     """
     required_dirs = [DATA_DIR, SNAPSHOTS_DIR, GRAPHS_DIR, LIQUIDITY_DEPTH_DIR,
                      ONE_WEEK_PRICE_DIR, TWO_WEEKS_PRICE_DIR, TWENTY_FOUR_HOURS_PRICE_DIR, BI_HOUR_PRICE_DIR,
-                     ALL_TIME_PRICE_DIR, CMV_DIR]
+                     ALL_TIME_PRICE_DIR, CMV_DIR, HTTP_CACHE_DIR, MODELS_DIR]
     for directory in required_dirs:
         if not os.path.exists(directory):
             os.makedirs(directory)
@@ -60,7 +61,7 @@ def sleep_until_next_iteration():
 
 def check_ollama():
     """
-    Check if the Ollama service is running on localhost:11434.
+    Check if the Ollama service is running at OLLAMA_BASE_URL.
 
     Sends a GET request to the Ollama service endpoint.
     Returns 0 if the service is running (HTTP 200), otherwise returns 1.
@@ -69,7 +70,7 @@ def check_ollama():
         int: 0 if Ollama is running, 1 if not or if a connection error occurs.
     """
     try:
-        response = requests.get("http://localhost:11434")
+        response = requests.get(OLLAMA_BASE_URL)
         if response.status_code == 200:
             return 0
         else:
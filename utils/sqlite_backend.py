@@ -0,0 +1,509 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+"""
+This module contains an embedded SQLite storage backend that mimics the subset of the pymongo API used by the
+MongoController and DBConfig classes, so the rest of the code base can run without a local mongod.
+
+Every collection is stored as a table with an indexed `_id` and `timestamp` column plus the full document as JSON.
+Filters are translated to SQL, so range scans on `timestamp` use the index. Only the query operators used in this
+repository are supported ($gt, $gte, $lt, $lte, $ne, $in, $nin, $exists, $and, $or); array element matching is not.
+"""
+
+COMPARISON_OPERATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+def normalize_datetime(value):
+    """
+    Convert a datetime to a naive UTC ISO string with fixed width, so it sorts lexicographically.
+
+    Timezone-aware datetimes are converted to UTC first, as pymongo does when it encodes them.
+
+    Args:
+        value (datetime): The datetime to convert.
+
+    Returns:
+        str: The ISO formatted string.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def encode_value(value):
+    """
+    Recursively convert a value into a JSON-safe structure.
+
+    Datetimes are tagged as {"$date": iso}, ObjectIds become strings, numpy scalars become Python scalars and NaN
+    becomes null (SQLite's JSON functions reject NaN).
+
+    Args:
+        value (Any): The value to convert.
+
+    Returns:
+        Any: The JSON-safe value.
+    """
+    if isinstance(value, dict):
+        return {str(key): encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    if isinstance(value, datetime):
+        return {"$date": normalize_datetime(value)}
+    if isinstance(value, ObjectId):
+        return str(value)
+    if hasattr(value, "tolist") and not isinstance(value, (str, bytes)):  # numpy scalars and arrays
+        return encode_value(value.tolist())
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def decode_hook(obj):
+    """
+    JSON object hook that turns {"$date": iso} back into a datetime.
+    """
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.strptime(obj["$date"], "%Y-%m-%dT%H:%M:%S.%f")
+    return obj
+
+
+def get_path(document, key):
+    """
+    Get a (possibly dotted) field from a document, returning None if it is missing.
+    """
+    value = document
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def set_path(document, key, value):
+    """
+    Set a (possibly dotted) field in a document, creating intermediate sub-documents.
+    """
+    parts = key.split(".")
+    for part in parts[:-1]:
+        document = document.setdefault(part, {})
+    document[parts[-1]] = value
+
+
+def unset_path(document, key):
+    """
+    Remove a (possibly dotted) field from a document if it exists.
+    """
+    parts = key.split(".")
+    for part in parts[:-1]:
+        document = document.get(part)
+        if not isinstance(document, dict):
+            return
+    document.pop(parts[-1], None)
+
+
+def apply_projection(document, projection):
+    """
+    Apply a pymongo-style inclusion or exclusion projection to a decoded document.
+
+    Args:
+        document (dict): The document.
+        projection (dict or None): The projection.
+
+    Returns:
+        dict: The projected document.
+    """
+    if not projection:
+        return document
+    include_id = bool(projection.get("_id", 1))
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    if fields and all(fields.values()):  # Inclusion projection
+        projected = {}
+        for key in fields:
+            value = get_path(document, key)
+            if value is not None or key in document:
+                set_path(projected, key, value)
+    else:  # Exclusion projection
+        projected = dict(document)
+        for key in fields:
+            unset_path(projected, key)
+    if include_id and "_id" in document:
+        projected["_id"] = document["_id"]
+    else:
+        projected.pop("_id", None)
+    return projected
+
+
+class InsertResult:
+    """
+    Minimal stand-in for pymongo's InsertOneResult / InsertManyResult.
+    """
+
+    def __init__(self, inserted_id=None, inserted_ids=None):
+        self.inserted_id = inserted_id
+        self.inserted_ids = inserted_ids
+
+
+class UpdateResult:
+    """
+    Minimal stand-in for pymongo's UpdateResult / DeleteResult.
+    """
+
+    def __init__(self, matched_count=0, modified_count=0, upserted_id=None, deleted_count=0):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+        self.deleted_count = deleted_count
+
+
+class SQLiteCursor:
+    """
+    Lazy cursor over a SQLite collection, supporting the chaining used by the controller (sort, limit, batch_size).
+    """
+
+    def __init__(self, collection, _filter, projection):
+        self.collection = collection
+        self._filter = _filter or {}
+        self.projection = projection
+        self._sort = []
+        self._limit = 0
+        self._batch_size = 1000
+
+    def sort(self, key, direction=None):
+        """
+        Set the sort order, accepting the same argument forms as pymongo (key and direction, list of pairs, dict).
+        """
+        if isinstance(key, dict):
+            self._sort = list(key.items())
+        elif isinstance(key, (list, tuple)):
+            self._sort = list(key)
+        else:
+            self._sort = [(key, direction if direction is not None else 1)]
+        return self
+
+    def limit(self, limit):
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size):
+        self._batch_size = batch_size
+        return self
+
+    def __iter__(self):
+        where_sql, params = self.collection.compile_filter(self._filter)
+        sql = f'SELECT document FROM "{self.collection.name}" WHERE {where_sql}'
+        if self._sort:
+            order = []
+            for key, direction in self._sort:
+                expression, _ = self.collection.field_expression(key)
+                order.append(f"{expression} {'DESC' if direction == -1 else 'ASC'}")
+            sql += " ORDER BY " + ", ".join(order)
+        if self._limit:
+            sql += f" LIMIT {int(self._limit)}"
+        with self.collection.database.lock:
+            cursor = self.collection.database.connection.execute(sql, params)
+        while True:
+            with self.collection.database.lock:
+                rows = cursor.fetchmany(self._batch_size)
+            if not rows:
+                break
+            for (document,) in rows:
+                yield apply_projection(json.loads(document, object_hook=decode_hook), self.projection)
+
+
+class SQLiteCollection:
+    """
+    A collection stored as a SQLite table, exposing the subset of pymongo.collection.Collection used in this project.
+    """
+
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+
+    @staticmethod
+    def field_expression(key, value=None):
+        """
+        Get the SQL expression for a field, and the parameter encoder for values compared against it.
+
+        `_id` and `timestamp` map to their indexed columns. Other fields are read with json_extract, reaching into
+        the {"$date": iso} tag when the compared value is a datetime.
+
+        Args:
+            key (str): The (possibly dotted) field name.
+            value (Any, optional): A value that will be compared against the field.
+
+        Returns:
+            tuple: The SQL expression and a function that encodes a value for comparison.
+        """
+        if key == "_id":
+            return "_id", lambda v: str(v) if v is not None else None
+        if key == "timestamp":
+            return "timestamp", lambda v: normalize_datetime(v) if isinstance(v, datetime) else v
+        path = "$." + ".".join(f'"{part}"' for part in key.split("."))
+        if isinstance(value, datetime):
+            return f"json_extract(document, '{path}.\"$date\"')", normalize_datetime
+        return f"json_extract(document, '{path}')", lambda v: encode_value(v)
+
+    def compile_filter(self, _filter):
+        """
+        Translate a pymongo filter into a SQL WHERE clause.
+
+        Args:
+            _filter (dict): The filter.
+
+        Returns:
+            tuple: The WHERE clause and its parameters.
+
+        Raises:
+            ValueError: If the filter uses an unsupported operator.
+        """
+        clauses = []
+        params = []
+        for key, condition in (_filter or {}).items():
+            if key in ("$and", "$or"):
+                sub_clauses = []
+                for sub_filter in condition:
+                    sub_sql, sub_params = self.compile_filter(sub_filter)
+                    sub_clauses.append(f"({sub_sql})")
+                    params.extend(sub_params)
+                joiner = " AND " if key == "$and" else " OR "
+                clauses.append("(" + joiner.join(sub_clauses) + ")")
+                continue
+            if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+                operators = condition
+            else:
+                operators = {"$eq": condition}
+            for op, value in operators.items():
+                sample = value[0] if op in ("$in", "$nin") and value else value
+                expression, encode = self.field_expression(key, sample)
+                if op == "$eq":
+                    if value is None:
+                        clauses.append(f"{expression} IS NULL")
+                    else:
+                        clauses.append(f"{expression} = ?")
+                        params.append(self._scalar(encode(value)))
+                elif op == "$ne":
+                    if value is None:
+                        clauses.append(f"{expression} IS NOT NULL")
+                    else:
+                        clauses.append(f"({expression} IS NULL OR {expression} != ?)")
+                        params.append(self._scalar(encode(value)))
+                elif op in COMPARISON_OPERATORS:
+                    clauses.append(f"{expression} {COMPARISON_OPERATORS[op]} ?")
+                    params.append(self._scalar(encode(value)))
+                elif op in ("$in", "$nin"):
+                    values = [v for v in value if v is not None]
+                    parts = []
+                    if values:
+                        parts.append(f"{expression} IN ({', '.join('?' for _ in values)})")
+                        params.extend(self._scalar(encode(v)) for v in values)
+                    if len(values) != len(value):
+                        parts.append(f"{expression} IS NULL")
+                    sql = "(" + " OR ".join(parts) + ")" if parts else "0"
+                    clauses.append(sql if op == "$in" else f"NOT {sql}")
+                elif op == "$exists":
+                    if key in ("_id", "timestamp"):
+                        clauses.append(f"{expression} IS {'NOT ' if value else ''}NULL")
+                    else:
+                        path = "$." + ".".join(f'"{part}"' for part in key.split("."))
+                        clauses.append(f"json_type(document, '{path}') IS {'NOT ' if value else ''}NULL")
+                else:
+                    raise ValueError(f"[sqlite_backend] Unsupported query operator: {op}")
+        return (" AND ".join(clauses) if clauses else "1"), params
+
+    @staticmethod
+    def _scalar(value):
+        """
+        Encode compound values (lists, sub-documents) as the compact JSON text json_extract returns for them.
+        """
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, separators=(",", ":"))
+        return value
+
+    def _row(self, document):
+        """
+        Prepare a document for storage, assigning an _id if needed.
+        """
+        document = encode_value(document)
+        if document.get("_id") is None:
+            document["_id"] = str(ObjectId())
+        timestamp = document.get("timestamp")
+        if isinstance(timestamp, dict):
+            timestamp = timestamp.get("$date")
+        return document["_id"], timestamp, json.dumps(document, allow_nan=False)
+
+    def find(self, _filter=None, projection=None):
+        return SQLiteCursor(self, _filter, projection)
+
+    def find_one(self, _filter=None, projection=None):
+        for document in self.find(_filter, projection).limit(1):
+            return document
+        return None
+
+    def count_documents(self, _filter):
+        where_sql, params = self.compile_filter(_filter)
+        with self.database.lock:
+            return self.database.connection.execute(
+                f'SELECT COUNT(*) FROM "{self.name}" WHERE {where_sql}', params).fetchone()[0]
+
+    def insert_one(self, document):
+        return InsertResult(inserted_id=self.insert_many([document]).inserted_ids[0])
+
+    def insert_many(self, documents, ordered=True):
+        rows = [self._row(document) for document in documents]
+        with self.database.lock, self.database.connection:
+            self.database.connection.executemany(
+                f'INSERT INTO "{self.name}" (_id, timestamp, document) VALUES (?, ?, ?)', rows)
+        for document, row in zip(documents, rows):
+            if isinstance(document, dict) and "_id" not in document:
+                document["_id"] = row[0]  # pymongo also sets the _id on the inserted document
+        return InsertResult(inserted_ids=[row[0] for row in rows])
+
+    def _write(self, documents):
+        rows = [self._row(document) for document in documents]
+        with self.database.lock, self.database.connection:
+            self.database.connection.executemany(
+                f'INSERT OR REPLACE INTO "{self.name}" (_id, timestamp, document) VALUES (?, ?, ?)', rows)
+
+    def _updated_document(self, _filter, update, upsert):
+        """
+        Apply a $set/$unset update to the document matching a filter, without writing it.
+
+        Returns:
+            tuple: The updated document (None if nothing matched and `upsert` is False) and whether it is new.
+
+        Raises:
+            ValueError: If the update uses an operator other than $set and $unset.
+        """
+        unsupported = set(update) - {"$set", "$unset"}
+        if unsupported:
+            raise ValueError(f"[sqlite_backend] Unsupported update operators: {', '.join(sorted(unsupported))}")
+        document = self.find_one(_filter)
+        upserted = document is None
+        if upserted:
+            if not upsert:
+                return None, False
+            document = {key: value for key, value in _filter.items()
+                        if not key.startswith("$") and not isinstance(value, dict)}
+            document.setdefault("_id", str(ObjectId()))
+        for key, value in update.get("$set", {}).items():
+            set_path(document, key, value)
+        for key in update.get("$unset", {}):
+            unset_path(document, key)
+        return document, upserted
+
+    def update_one(self, _filter, update, upsert=False):
+        with self.database.lock:
+            document, upserted = self._updated_document(_filter, update, upsert)
+            if document is None:
+                return UpdateResult()
+            self._write([document])
+        if upserted:
+            return UpdateResult(upserted_id=document.get("_id"))
+        return UpdateResult(matched_count=1, modified_count=1)
+
+    def bulk_update(self, operations):
+        """
+        Apply several updates in a single transaction. Filters are matched against the documents stored before
+        the batch.
+
+        Args:
+            operations (list): (filter, update, upsert) tuples, as built by `MongoController.update_data_batch`.
+
+        Returns:
+            UpdateResult: The number of matched and modified documents; `upserted_id` is the last upserted _id.
+        """
+        documents = []
+        matched = 0
+        upserted_id = None
+        with self.database.lock:
+            for _filter, update, upsert in operations:
+                document, upserted = self._updated_document(_filter, update, upsert)
+                if document is None:
+                    continue
+                if upserted:
+                    upserted_id = document.get("_id")
+                else:
+                    matched += 1
+                documents.append(document)
+            self._write(documents)
+        return UpdateResult(matched_count=matched, modified_count=matched, upserted_id=upserted_id)
+
+    def replace_one(self, _filter, replacement, upsert=False):
+        with self.database.lock:
+            document = self.find_one(_filter, {"_id": 1})
+            if document is None and not upsert:
+                return UpdateResult()
+            replacement = dict(replacement)
+            if document is not None:
+                replacement["_id"] = document["_id"]
+            elif "_id" in _filter:
+                replacement["_id"] = _filter["_id"]
+            self._write([replacement])
+        return UpdateResult(matched_count=int(document is not None), modified_count=int(document is not None))
+
+    def delete_one(self, _filter):
+        document = self.find_one(_filter, {"_id": 1})
+        if document is None:
+            return UpdateResult()
+        with self.database.lock, self.database.connection:
+            self.database.connection.execute(f'DELETE FROM "{self.name}" WHERE _id = ?', (document["_id"],))
+        return UpdateResult(deleted_count=1)
+
+    def delete_many(self, _filter):
+        where_sql, params = self.compile_filter(_filter)
+        with self.database.lock, self.database.connection:
+            deleted = self.database.connection.execute(f'DELETE FROM "{self.name}" WHERE {where_sql}', params)
+        return UpdateResult(deleted_count=deleted.rowcount)
+
+
+class SQLiteDatabase:
+    """
+    A SQLite file holding one table per collection, exposing the subset of pymongo.database.Database used here.
+    """
+
+    def __init__(self, path):
+        """
+        Open (or create) the SQLite database at the given path.
+
+        Args:
+            path (str or Path): The path of the database file.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.collection_names = set(self.list_collection_names())
+
+    def list_collection_names(self):
+        with self.lock:
+            rows = self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        return [row[0] for row in rows]
+
+    def create_collection(self, name, **kwargs):
+        """
+        Create the table backing a collection. Time-series options are accepted and ignored.
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{name}" (_id TEXT PRIMARY KEY, timestamp TEXT, document TEXT NOT NULL)')
+            self.connection.execute(f'CREATE INDEX IF NOT EXISTS "{name}_timestamp" ON "{name}" (timestamp)')
+        self.collection_names.add(name)
+        return SQLiteCollection(self, name)
+
+    def drop_collection(self, name):
+        with self.lock, self.connection:
+            self.connection.execute(f'DROP TABLE IF EXISTS "{name}"')
+        self.collection_names.discard(name)
+
+    def __getitem__(self, name):
+        if name not in self.collection_names:
+            self.create_collection(name)
+        return SQLiteCollection(self, name)
@@ -0,0 +1,159 @@
+import time
+from datetime import datetime, timedelta
+
+from tqdm import tqdm
+
+from utils.mongo_controller import MongoController, COLLECTION_TYPES, TIMESERIES_OPTIONS
+
+"""
+This module contains the tools to move the database between the MongoDB and the embedded SQLite storage backends,
+and a benchmark that replays the read workload of the nightly jobs on both of them.
+"""
+
+
+def migrate_storage(source_backend="mongo", target_backend="sqlite", collections=None, batch_size=5000):
+    """
+    Copy every document of the given collections from one storage backend to the other.
+
+    The target collections are dropped and recreated first, with the options of the source collection
+    (`collection_options`), so the migration can be re-run safely and time-series collections keep their buckets.
+    Documents are streamed in batches, so memory use stays bounded regardless of collection size.
+
+    Args:
+        source_backend (str, optional): The backend to read from. Defaults to "mongo".
+        target_backend (str, optional): The backend to write to. Defaults to "sqlite".
+        collections (list, optional): Names of the collections to migrate. Defaults to all user collections.
+        batch_size (int, optional): Number of documents read and written per batch. Defaults to 5000.
+
+    Returns:
+        dict: The number of documents copied per collection.
+    """
+    source = MongoController(backend=source_backend)
+    target = MongoController(backend=target_backend)
+    if collections is None:
+        collections = [name for name in source.db.list_collection_names() if not name.startswith("system.")]
+    copied = {}
+    for collection in collections:
+        total = source.db[collection].count_documents({})
+        print(f"\n[storage_migration] Migrating {collection} ({total} documents)...")
+        target.db.drop_collection(collection)
+        target.db.create_collection(collection, **collection_options(source, collection))
+        batch = []
+        copied[collection] = 0
+        for document in tqdm(source.db[collection].find().batch_size(batch_size), total=total, unit="doc"):
+            batch.append(document)
+            if len(batch) == batch_size:
+                target.db[collection].insert_many(batch)
+                copied[collection] += len(batch)
+                batch = []
+        if batch:
+            target.db[collection].insert_many(batch)
+            copied[collection] += len(batch)
+        if target.db[collection].count_documents({}) != total:
+            print(f"[storage_migration] Warning: {collection} count mismatch after migration.")
+    print(f"\n[storage_migration] Migrated {sum(copied.values())} documents in {len(copied)} collections.")
+    return copied
+
+
+def collection_options(controller, collection):
+    """
+    Get the creation options of a collection (time-series layout and expiry), to recreate it on another backend.
+
+    The SQLite backend keeps no options, so the time-series layout of the collections created by MongoController
+    is used for it.
+
+    Args:
+        controller (MongoController): The controller holding the collection.
+        collection (str): The name of the collection.
+
+    Returns:
+        dict: The `timeseries` and `expireAfterSeconds` options of the collection, if any.
+    """
+    if controller.backend == "sqlite":
+        return {"timeseries": dict(TIMESERIES_OPTIONS)} if COLLECTION_TYPES.get(collection) == "timeseries" else {}
+    options = controller.db[collection].options()
+    result = {key: options[key] for key in ("timeseries", "expireAfterSeconds") if key in options}
+    if "timeseries" in result and "granularity" in result["timeseries"]:
+        # Bucket spans are derived from the granularity and cannot be passed along with it
+        result["timeseries"] = {key: value for key, value in result["timeseries"].items()
+                                if key not in ("bucketMaxSpanSeconds", "bucketRoundingSeconds")}
+    return result
+
+
+def nightly_read_workload(controller, days=30):
+    """
+    Replay the reads performed by the nightly jobs against a controller.
+
+    Args:
+        controller (MongoController): The controller to query.
+        days (int, optional): Number of most recent days covered by the daily rollup. Defaults to 30.
+
+    Returns:
+        dict: Elapsed seconds per job.
+    """
+    timings = {}
+    end_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # Daily rollups: one range query per day and collection, as in calculate_daily_averages
+    start = time.perf_counter()
+    for day in range(days):
+        day_start = end_date - timedelta(days=day)
+        day_filter = {"timestamp": {"$gte": day_start, "$lt": day_start + timedelta(days=1)}}
+        for collection in ["USDT_BOB_Binance", "USDT_ARS_Binance", "USDT_BOB_Other"]:
+            controller.query_data(_mode="all", collection=collection, _filter=day_filter, sort=1)
+        controller.query_data(_mode="all", collection="USD_BOB_Parallel",
+                              _filter={**day_filter, "human_approved": True}, sort=1)
+        controller.query_data(_mode="one", collection="Daily_Averages", _filter={"timestamp": day_start})
+    timings["daily_rollups"] = time.perf_counter() - start
+
+    # Curve smoothing: a full read of the daily averages, as in compute_bob_parallel_curve
+    start = time.perf_counter()
+    controller.query_data(_mode="all", collection="Daily_Averages")
+    timings["curve_smoothing"] = time.perf_counter() - start
+
+    # Period averages and exports: full reads of the aggregated collections
+    start = time.perf_counter()
+    for collection in ["Daily_Averages", "Monthly_Averages", "Quarterly_Averages"]:
+        controller.query_data(_mode="all", collection=collection, sort=1)
+    timings["exports"] = time.perf_counter() - start
+
+    # Long-range scan: four years of tick volumes, as in compute_rel_vol
+    start = time.perf_counter()
+    for chunk in controller.query_data(_mode="all", collection="USDT_BOB_Binance",
+                                       _filter={"timestamp": {"$gte": end_date - timedelta(weeks=208)}},
+                                       _datatype="chunks", dtypes={"sell_volume": "float64"}):
+        chunk["sell_volume"].sum()
+    timings["long_range_scan"] = time.perf_counter() - start
+    return timings
+
+
+def benchmark_storage_backends(days=30, repeats=3):
+    """
+    Compare the nightly read workload on the MongoDB and SQLite backends and print a summary table.
+
+    Both backends should hold the same data (see migrate_storage). The best of `repeats` runs is reported per job.
+
+    Args:
+        days (int, optional): Number of most recent days covered by the daily rollup. Defaults to 30.
+        repeats (int, optional): Number of runs per backend. Defaults to 3.
+
+    Returns:
+        dict: Best elapsed seconds per job, per backend.
+    """
+    results = {}
+    for backend in ["mongo", "sqlite"]:
+        controller = MongoController(backend=backend)
+        runs = [nightly_read_workload(controller, days=days) for _ in range(repeats)]
+        results[backend] = {job: min(run[job] for run in runs) for job in runs[0]}
+    print(f"\n[storage_migration] {'Job':<18}{'MongoDB (s)':>14}{'SQLite (s)':>14}{'Speed-up':>10}")
+    for job in results["mongo"]:
+        mongo_time = results["mongo"][job]
+        sqlite_time = results["sqlite"][job]
+        speed_up = mongo_time / sqlite_time if sqlite_time > 0 else float("inf")
+        print(f"[storage_migration] {job:<18}{mongo_time:>14.3f}{sqlite_time:>14.3f}{speed_up:>9.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    migrate_storage()
+    benchmark_storage_backends()